@@ -1,8 +1,9 @@
 # catalog/admin.py
 """Регистрация моделей в админ-панели."""
+
 from django.contrib import admin
 
-from .models import Category, ContactInfo, Product
+from .models import Category, ContactInfo, ForbiddenWord, Product
 
 
 @admin.register(ContactInfo)
@@ -41,3 +42,12 @@ class ProductAdmin(admin.ModelAdmin):
         return f"{obj.price} ₽"
 
     formatted_price.short_description = "Цена"
+
+
+@admin.register(ForbiddenWord)
+class ForbiddenWordAdmin(admin.ModelAdmin):
+    """Словарь модерации (дополняет встроенный список FORBIDDEN_WORDS)."""
+
+    list_display = ("word", "is_active")
+    list_editable = ("is_active",)
+    search_fields = ("word",)
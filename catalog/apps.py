@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "catalog"
+
+    def ready(self) -> None:
+        """Подключаем обработчики сигналов (инвалидация кеша)."""
+        from catalog import signals  # noqa: F401
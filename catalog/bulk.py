@@ -0,0 +1,219 @@
+"""
+Массовая запись товаров: пакетная выдача slug, кеш категорий в памяти и вставка
+через bulk_create (или COPY на PostgreSQL). Используется командами
+import_products и seed_products.
+
+bulk_create/COPY обходят save() и сигналы, поэтому после загрузки
+finish() разом обновляет производные данные: фасеты, поисковый индекс, кеши категорий.
+Так же устроена полная очистка каталога (flush_catalog).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import secrets
+from contextlib import contextmanager
+from hashlib import md5
+from typing import Iterable
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from catalog.cache import bump_generation, category_scope, category_tag, purge_surrogate_keys
+from catalog.facets import rebuild_facets
+from catalog.models import Category, Product
+from catalog.search import index_products, reset_index
+
+SLUG_MAX_LENGTH = Product._meta.get_field("slug").max_length
+# Колонки для COPY (остальные — NULL по умолчанию: owner, image, search_vector)
+COPY_COLUMNS = (
+    "category_id",
+    "title",
+    "slug",
+    "price",
+    "description",
+    "is_published",
+    "status",
+    "created_at",
+    "updated_at",
+    "image_variants",
+)
+
+
+def base_slug(text: str, max_length: int = SLUG_MAX_LENGTH - 8) -> str:
+    """slug из текста (кириллица сохраняется); пустой — короткий md5."""
+    slug = slugify(text, allow_unicode=True)[:max_length].strip("-")
+    return slug or md5(text.encode("utf-8")).hexdigest()[:8]
+
+
+class SlugAllocator:
+    """
+    Выдаёт уникальные slug пакетами: один запрос slug__in на пакет
+    (плюс редкий повтор для разрешения коллизий) вместо запроса на строку.
+    """
+
+    def __init__(self, model=Product) -> None:
+        self.model = model
+
+    def _taken(self, slugs: Iterable[str]) -> set[str]:
+        return set(
+            self.model._default_manager.filter(slug__in=set(slugs)).values_list("slug", flat=True)
+        )
+
+    def allocate(self, texts: list[str]) -> list[str]:
+        result = [base_slug(text) for text in texts]
+        taken = self._taken(result)
+        while True:
+            seen: set[str] = set()
+            retry = []
+            for i, slug in enumerate(result):
+                if slug in taken or slug in seen:
+                    retry.append(i)
+                else:
+                    seen.add(slug)
+            if not retry:
+                return result
+            for i in retry:
+                result[i] = f"{base_slug(texts[i])}-{secrets.token_hex(3)}"
+            taken = self._taken(result[i] for i in retry)
+
+
+class CategoryResolver:
+    """Имя категории -> id через словарь в памяти; отсутствующие создаются один раз."""
+
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = dict(Category.objects.values_list("name", "pk"))
+
+    def resolve(self, name: str) -> int:
+        name = name.strip()
+        pk = self._ids.get(name)
+        if pk is None:
+            slug = base_slug(name)
+            if Category.objects.filter(slug=slug).exists():
+                slug = f"{slug}-{md5(name.encode('utf-8')).hexdigest()[:6]}"
+            pk = Category.objects.get_or_create(name=name, defaults={"slug": slug})[0].pk
+            self._ids[name] = pk
+        return pk
+
+
+@contextmanager
+def explicit_timestamps(model=Product):
+    """
+    Временно отключает auto_now/auto_now_add, чтобы bulk_create сохранил заданные даты.
+    Меняет поля модели на уровне процесса — только для management-команд.
+    """
+    fields = [
+        f
+        for f in model._meta.concrete_fields
+        if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    try:
+        for f in fields:
+            f.auto_now = f.auto_now_add = False
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class ProductBulkWriter:
+    """
+    Пишет товары пакетами. На PostgreSQL по умолчанию — COPY FROM STDIN,
+    иначе bulk_create. Каждый пакет — отдельная транзакция.
+    """
+
+    def __init__(self, batch_size: int = 5000, use_copy: bool | None = None) -> None:
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == "postgresql" if use_copy is None else use_copy
+        self.written = 0
+        self.categories: set[int] = set()
+
+    def write(self, products: list[Product]) -> int:
+        if not products:
+            return 0
+        now = timezone.now()
+        for product in products:
+            product.created_at = product.created_at or now
+            product.updated_at = product.updated_at or now
+            self.categories.add(product.category_id)
+
+        with transaction.atomic():
+            if self.use_copy:
+                self._copy(products)
+            else:
+                with explicit_timestamps():
+                    Product.objects.bulk_create(products, batch_size=self.batch_size)
+        self.written += len(products)
+        return len(products)
+
+    @staticmethod
+    def _copy(products: list[Product]) -> None:
+        # QUOTE_ALL: пустая строка в CSV-режиме COPY без кавычек была бы NULL
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for p in products:
+            writer.writerow(
+                [
+                    p.category_id,
+                    p.title,
+                    p.slug,
+                    p.price,
+                    p.description,
+                    "t" if p.is_published else "f",
+                    p.status,
+                    p.created_at.isoformat(),
+                    p.updated_at.isoformat(),
+                    json.dumps(p.image_variants or {}),
+                ]
+            )
+        buffer.seek(0)
+
+        qn = connection.ops.quote_name
+        sql = (
+            f"COPY {qn(Product._meta.db_table)} ({', '.join(qn(c) for c in COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def finish(self) -> None:
+        """Обновляет данные, которые обычно поддерживают save() и сигналы."""
+        if not self.written:
+            return
+        rebuild_facets()
+        if connection.vendor == "postgresql":
+            index_products(Product.objects.filter(search_vector__isnull=True))
+        else:
+            reset_index()
+        slugs = Category.objects.filter(pk__in=self.categories).values_list("slug", flat=True)
+        bump_generation(*(category_scope(slug) for slug in slugs))
+
+
+def flush_catalog() -> None:
+    """
+    Удаляет все товары и категории одним TRUNCATE (PostgreSQL) или DELETE на таблицу, без
+    сигналов: Model.delete() на каждый товар пересчитывал бы фасеты и сбрасывал кеши построчно.
+    Ссылок на товары и категории из других таблиц нет, поэтому каскад не нужен.
+    Производные данные обновляются один раз.
+    """
+    categories = list(Category.objects.values_list("pk", "slug"))
+    tables = [connection.ops.quote_name(model._meta.db_table) for model in (Product, Category)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"TRUNCATE {', '.join(tables)}")
+        else:
+            for table in tables:
+                cursor.execute(f"DELETE FROM {table}")
+    rebuild_facets()
+    reset_index()
+    bump_generation(*(category_scope(slug) for _, slug in categories))
+    purge_surrogate_keys(*(category_tag(pk) for pk, _ in categories))  # и страницы их товаров
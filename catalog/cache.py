@@ -0,0 +1,147 @@
+"""
+Версионированные ключи кеша каталога.
+
+Для каждой области (например, категории) хранится счётчик поколения.
+Ключ данных включает номер поколения, поэтому инвалидация — это один incr:
+старые записи перестают читаться и вытесняются сами по TTL.
+
+Закешированные целиком страницы помечаются тегами (Surrogate-Key). У каждого тега
+тоже есть поколение: страница хранится вместе с поколениями своих тегов и при чтении
+считается устаревшей, если хоть одно из них сменилось. Сброс тега — один атомарный incr,
+без списков ключей, которые пришлось бы дописывать и читать целиком.
+"""
+
+from __future__ import annotations
+
+import time
+from functools import wraps
+from hashlib import md5
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_cache_key, learn_cache_key, patch_response_headers
+
+# Данные защищены поколением, поэтому TTL можно держать большим
+CATEGORY_PRODUCTS_TIMEOUT = 60 * 60 * 24
+
+
+def _generation_key(scope: str) -> str:
+    return f"catalog_gen_{scope}"
+
+
+def _fresh_generation() -> int:
+    """
+    Начальное значение счётчика — текущее время в мс.
+    Если счётчик вытеснили из кеша, новый не совпадёт ни с одним старым поколением.
+    """
+    return time.time_ns() // 1_000_000
+
+
+def get_generation(scope: str) -> int:
+    """Текущее поколение области (создаётся при первом обращении)."""
+    key = _generation_key(scope)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _fresh_generation(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(*scopes: str) -> None:
+    """Инвалидирует все ключи перечисленных областей."""
+    for scope in scopes:
+        key = _generation_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:  # счётчика ещё нет — заводим новое поколение
+            cache.set(key, _fresh_generation(), None)
+
+
+def category_scope(slug: str) -> str:
+    """Область кеша товаров категории."""
+    return f"category_{slug}"
+
+
+def category_products_key(slug: str, variant: str = "") -> str:
+    """
+    Ключ списка товаров категории с учётом поколения.
+    variant — строка фильтров листинга (у каждой комбинации своя запись).
+    """
+    key = f"category_products_{slug}_v{get_generation(category_scope(slug))}"
+    if variant:
+        key = f"{key}_{md5(variant.encode('utf-8')).hexdigest()[:12]}"
+    return key
+
+
+# ==============================================================
+# Surrogate-Key: точечный сброс закешированных страниц
+# ==============================================================
+SURROGATE_HEADER = "Surrogate-Key"
+
+
+def product_tag(pk: int) -> str:
+    return f"product-{pk}"
+
+
+def category_tag(pk: int) -> str:
+    return f"category-{pk}"
+
+
+def _tag_scope(tag: str) -> str:
+    return f"tag_{tag}"
+
+
+def tag_generations(tags: list[str]) -> dict[str, int]:
+    """Текущие поколения тегов — сохраняются вместе с ответом."""
+    return {tag: get_generation(_tag_scope(tag)) for tag in tags}
+
+
+def _is_current(generations: dict[str, int]) -> bool:
+    """Ни один тег ответа не сбрасывался (вытесненный счётчик тоже считается сбросом)."""
+    keys = {_generation_key(_tag_scope(tag)): generation for tag, generation in generations.items()}
+    return cache.get_many(list(keys)) == keys
+
+
+def purge_surrogate_keys(*tags: str) -> None:
+    """Делает устаревшими все ответы, помеченные любым из тегов."""
+    bump_generation(*(_tag_scope(tag) for tag in tags))
+
+
+def cache_page_tagged(timeout: int):
+    """
+    Аналог @cache_page, который хранит ответ вместе с поколениями тегов
+    из заголовка Surrogate-Key (его выставляет сама view).
+    Тот же заголовок уходит клиенту — фронтовой прокси может сбрасывать по нему.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            cache_key = get_cache_key(request, None, "GET", cache=cache)
+            if cache_key is not None:
+                cached = cache.get(cache_key)
+                if isinstance(cached, tuple) and _is_current(cached[1]):
+                    return cached[0]
+
+            response = view(request, *args, **kwargs)
+            tags = response.get(SURROGATE_HEADER, "").split()
+            if (
+                response.status_code != 200
+                or response.streaming
+                or response.cookies
+                or "private" in response.get("Cache-Control", "")
+                or not tags
+            ):
+                return response
+
+            patch_response_headers(response, timeout)
+            cache_key = learn_cache_key(request, response, timeout, None, cache=cache)
+            cache.set(cache_key, (response, tag_generations(tags)), timeout)
+            return response
+
+        return wrapper
+
+    return decorator
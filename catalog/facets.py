@@ -0,0 +1,257 @@
+"""
+Фасетная фильтрация каталога.
+
+Счётчики фасетов (товаров по категориям, статусам и ценовым корзинам) хранятся
+в таблице ProductFacet и поддерживаются инкрементально сигналами Product,
+поэтому страница получает их одним обращением к кешу, без GROUP BY на запрос.
+Статусы и цены считаются и по всему каталогу, и внутри каждой категории
+(измерения «status:<id>», «price:<id>») — страница категории показывает свои счётчики.
+Кеш фасетов версионирован поколением области FACETS_SCOPE (см. catalog/cache.py).
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, F, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Cast, Concat
+
+from catalog.cache import bump_generation, get_generation
+from catalog.models import Category, Product, ProductFacet
+
+FACETS_SCOPE = "facets"
+FACETS_TIMEOUT = 60 * 60 * 24
+
+# Границы ценовых корзин гистограммы (последняя корзина открыта сверху)
+PRICE_BUCKETS: tuple[int, ...] = (0, 100, 500, 1000, 5000, 10000, 50000)
+
+CATEGORY = "category"
+STATUS = "status"
+PRICE = "price"
+
+
+def price_bucket(price) -> str:
+    """Метка корзины для цены: «100-500», последняя — «50000+»."""
+    price = Decimal(price or 0)
+    for low, high in zip(PRICE_BUCKETS, PRICE_BUCKETS[1:]):
+        if price < high:
+            return f"{low}-{high}"
+    return f"{PRICE_BUCKETS[-1]}+"
+
+
+def scoped(dimension: str, category_id: int) -> str:
+    """Измерение внутри категории: «status:12», «price:12»."""
+    return f"{dimension}:{category_id}"
+
+
+def facet_values(category_id: int, status: str, price) -> list[tuple[str, str]]:
+    """
+    Пары (измерение, значение), в которые попадает опубликованный товар: по каталогу и по категории.
+    """
+    bucket = price_bucket(price)
+    return [
+        (CATEGORY, str(category_id)),
+        (STATUS, status),
+        (PRICE, bucket),
+        (scoped(STATUS, category_id), status),
+        (scoped(PRICE, category_id), bucket),
+    ]
+
+
+def invalidate_facets() -> None:
+    """Сбрасывает все закешированные фасеты (каталога и категорий) одним incr поколения."""
+    bump_generation(FACETS_SCOPE)
+
+
+# ==============================================================
+# Инкрементальное обновление и полная перестройка
+# ==============================================================
+def apply_facet_changes(old: list[tuple[str, str]], new: list[tuple[str, str]]) -> None:
+    """Вычитает старые значения товара, прибавляет новые и сбрасывает кеш фасетов."""
+    deltas = Counter(new)
+    deltas.subtract(old)
+    changed = False
+    for (dimension, value), delta in deltas.items():
+        if not delta:
+            continue
+        changed = True
+        rows = ProductFacet.objects.filter(dimension=dimension, value=value)
+        if rows.update(count=F("count") + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                ProductFacet.objects.create(dimension=dimension, value=value, count=delta)
+        except IntegrityError:  # строку успели создать параллельно
+            rows.update(count=F("count") + delta)
+    if changed:
+        invalidate_facets()
+
+
+@transaction.atomic
+def rebuild_facets() -> int:
+    """Пересчитывает все счётчики с нуля (после массовых загрузок). Возвращает число строк."""
+    counts: Counter = Counter()
+    published = Product.objects.filter(is_published=True).values_list(
+        "category_id", "status", "price"
+    )
+    for category_id, status, price in published.iterator(chunk_size=5000):
+        counts.update(facet_values(category_id, status, price))
+
+    ProductFacet.objects.all().delete()
+    ProductFacet.objects.bulk_create(
+        [
+            ProductFacet(dimension=dimension, value=value, count=count)
+            for (dimension, value), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+    invalidate_facets()
+    return len(counts)
+
+
+def ensure_facets() -> bool:
+    """
+    Заполняет таблицу, если она пуста или без счётчиков по категориям (первый запуск
+    после миграции). Вызывается после migrate, а не из запроса страницы. True — пересчитано.
+    """
+    has_scoped = ProductFacet.objects.filter(dimension__startswith=f"{STATUS}:").exists()
+    if has_scoped or not Product.objects.filter(is_published=True).exists():
+        return False
+    rebuild_facets()
+    return True
+
+
+# ==============================================================
+# Чтение фасетов
+# ==============================================================
+def _load_facets(category_slug: str = "") -> dict:
+    if category_slug:
+        # id категории подставляется подзапросом — счётчики читаются тем же одним запросом
+        category_pk = Cast(
+            Subquery(Category.objects.filter(slug=category_slug).values("pk")[:1]), CharField()
+        )
+        dimensions = (
+            Q(dimension=CATEGORY)
+            | Q(dimension=Concat(Value(f"{STATUS}:"), category_pk))
+            | Q(dimension=Concat(Value(f"{PRICE}:"), category_pk))
+        )
+    else:
+        dimensions = Q(dimension__in=(CATEGORY, STATUS, PRICE))
+    rows = ProductFacet.objects.filter(dimensions, count__gt=0).values_list(
+        "dimension", "value", "count"
+    )
+
+    by_dimension: dict[str, dict[str, int]] = {CATEGORY: {}, STATUS: {}, PRICE: {}}
+    for dimension, value, count in rows:
+        by_dimension[dimension.split(":", 1)[0]][value] = count
+
+    category_ids = [int(pk) for pk in by_dimension[CATEGORY]]
+    categories = Category.objects.filter(pk__in=category_ids).values_list("pk", "slug", "name")
+    status_labels = dict(Product.STATUS_CHOICES)
+    bounds = list(zip(PRICE_BUCKETS, [*PRICE_BUCKETS[1:], None]))
+
+    return {
+        "categories": [
+            {"slug": slug, "name": name, "count": by_dimension[CATEGORY][str(pk)]}
+            for pk, slug, name in categories
+        ],
+        "statuses": [
+            {
+                "value": value,
+                "label": status_labels.get(value, value),
+                "count": by_dimension[STATUS][value],
+            }
+            for value in status_labels
+            if value in by_dimension[STATUS]
+        ],
+        "prices": [
+            {
+                "min": low,
+                "max": high,
+                "label": price_bucket(low),
+                "count": by_dimension[PRICE][price_bucket(low)],
+            }
+            for low, high in bounds
+            if price_bucket(low) in by_dimension[PRICE]
+        ],
+    }
+
+
+def get_facets(category_slug: str = "") -> dict:
+    """
+    Фасеты для шаблонов: категории, статусы и ценовые корзины со счётчиками.
+    category_slug — статусы и цены только внутри этой категории
+    (список категорий — по всему каталогу).
+    """
+    key = f"catalog_facets_v{get_generation(FACETS_SCOPE)}_{category_slug}"
+    return cache.get_or_set(key, lambda: _load_facets(category_slug), FACETS_TIMEOUT)
+
+
+# ==============================================================
+# Фильтры из GET-параметров
+# ==============================================================
+@dataclass
+class ProductFilters:
+    """Фильтры листинга: категория, статус и диапазон цены."""
+
+    category: str = ""
+    status: str = ""
+    price_min: Decimal | None = None
+    price_max: Decimal | None = None
+    params: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.params)
+
+    @property
+    def querystring(self) -> str:
+        """Параметры фильтров для ссылок пагинации."""
+        return urlencode(self.params)
+
+
+def _decimal(value: str | None) -> Decimal | None:
+    """
+    Конечное число или None: nan, Infinity и sNaN Decimal разбирает, но в фильтр цены они не
+    годятся.
+    """
+    try:
+        number = Decimal(value) if value else None
+    except (InvalidOperation, ValueError):
+        return None
+    return number if number is not None and number.is_finite() else None
+
+
+def parse_filters(data) -> ProductFilters:
+    """Разбирает ?category=&status=&price_min=&price_max= (некорректные значения игнорируются)."""
+    filters = ProductFilters(
+        category=(data.get("category") or "").strip(),
+        status=data.get("status") or "",
+        price_min=_decimal(data.get("price_min")),
+        price_max=_decimal(data.get("price_max")),
+    )
+    if filters.status not in dict(Product.STATUS_CHOICES):
+        filters.status = ""
+    for name in ("category", "status", "price_min", "price_max"):
+        value = getattr(filters, name)
+        if value not in ("", None):
+            filters.params[name] = str(value)
+    return filters
+
+
+def apply_filters(qs: QuerySet, filters: ProductFilters) -> QuerySet:
+    """Накладывает фильтры на queryset товаров."""
+    if filters.category:
+        qs = qs.filter(category__slug=filters.category)
+    if filters.status:
+        qs = qs.filter(status=filters.status)
+    if filters.price_min is not None:
+        qs = qs.filter(price__gte=filters.price_min)
+    if filters.price_max is not None:
+        qs = qs.filter(price__lt=filters.price_max)
+    return qs
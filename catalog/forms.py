@@ -1,32 +1,22 @@
 # catalog/forms.py
 """Формы приложения catalog."""
-from typing import Iterable
 
 from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Product
-
-# Запрещённые слова
-FORBIDDEN_WORDS: tuple[str, ...] = (
-    "казино",
-    "криптовалюта",
-    "крипта",
-    "биржа",
-    "дешево",
-    "бесплатно",
-    "обман",
-    "полиция",
-    "радар",
+from .moderation import (  # noqa: F401 (FORBIDDEN_WORDS — совместимость)
+    FORBIDDEN_WORDS,
+    Automaton,
+    get_matcher,
 )
 
 
-def _check_forbidden(value: str, words: Iterable[str]) -> None:
-    """Проверяет текст на запрещённые слова (без учёта регистра)."""
-    low = (value or "").lower()
-    for w in words:
-        if w in low:
-            raise ValidationError(f"Запрещённое слово: «{w}». Уберите его из текста.")
+def _check_forbidden(value: str, matcher: Automaton | None = None) -> None:
+    """Проверяет текст на запрещённые слова (без учёта регистра) за один проход автомата."""
+    match = (matcher or get_matcher()).first(value)
+    if match is not None:
+        raise ValidationError(f"Запрещённое слово: «{match.word}». Уберите его из текста.")
 
 
 class ContactForm(forms.Form):
@@ -65,13 +55,13 @@ class ProductForm(forms.ModelForm):
     def clean_title(self) -> str:
         """Запрещённые слова в названии."""
         value: str = self.cleaned_data.get("title", "")
-        _check_forbidden(value, FORBIDDEN_WORDS)
+        _check_forbidden(value)
         return value
 
     def clean_description(self) -> str:
         """Запрещённые слова в описании."""
         value: str = self.cleaned_data.get("description", "")
-        _check_forbidden(value, FORBIDDEN_WORDS)
+        _check_forbidden(value)
         return value
 
     def clean_price(self):
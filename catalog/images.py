@@ -0,0 +1,140 @@
+"""
+Варианты изображений товара: уменьшенные JPEG и WebP для карточек и детальной страницы.
+
+После сохранения товара с новым изображением генерация ставится в фоновый пул
+потоков (после коммита транзакции), запрос загрузки не ждёт Pillow.
+Готовые пути пишутся в Product.image_variants, шаблоны строят по ним srcset.
+Файлы вариантов лежат в products/variants/<id товара>/ и названы по хешу полного пути
+исходника: одинаковые имена загрузок (photo.jpg и photo.png) не затирают чужие варианты,
+а варианты прежнего изображения удаляются после замены.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from catalog.cache import bump_generation, category_scope, product_tag, purge_surrogate_keys
+from catalog.models import Product
+
+logger = logging.getLogger(__name__)
+
+# имя варианта: (ширина, формат Pillow, качество)
+VARIANTS: dict[str, tuple[int, str, int]] = {
+    "card": (400, "JPEG", 80),
+    "detail": (1200, "JPEG", 85),
+    "card_webp": (400, "WEBP", 80),
+    "detail_webp": (1200, "WEBP", 80),
+}
+VARIANTS_DIR = "products/variants"
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "IMAGE_VARIANT_WORKERS", 2),
+    thread_name_prefix="image-variants",
+)
+
+
+def variant_name(product_id: int, source: str, variant: str) -> str:
+    """
+    Путь файла варианта в хранилище: products/variants/<id>/<имя>-<хеш пути>_<вариант>.<ext>.
+    """
+    _, fmt, _ = VARIANTS[variant]
+    ext = "webp" if fmt == "WEBP" else "jpg"
+    digest = hashlib.blake2b(source.encode(), digest_size=6).hexdigest()
+    return f"{VARIANTS_DIR}/{product_id}/{PurePosixPath(source).stem}-{digest}_{variant}.{ext}"
+
+
+def _delete_files(names) -> None:
+    for name in names:
+        if name and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def _render(image: Image.Image, width: int, fmt: str, quality: int) -> bytes:
+    """Уменьшает копию изображения до ширины width и перекодирует."""
+    copy = image.copy()
+    copy.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    if fmt == "JPEG":
+        copy.save(buffer, fmt, quality=quality, optimize=True, progressive=True)
+    else:
+        copy.save(buffer, fmt, quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def _open_rgb(name: str) -> Image.Image:
+    """Открывает исходник с учётом EXIF-ориентации; прозрачность — на белый фон."""
+    with default_storage.open(name, "rb") as fh:
+        image = ImageOps.exif_transpose(Image.open(fh))
+        image.load()
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def generate_variants(product_id: int) -> dict[str, str]:
+    """Строит все варианты изображения товара и сохраняет пути в image_variants."""
+    try:
+        row = (
+            Product.objects.filter(pk=product_id)
+            .values_list("image", "category__slug", "image_variants")
+            .first()
+        )
+        if not row or not row[0]:
+            return {}
+        source, category_slug, previous = row
+        image = _open_rgb(source)
+
+        variants: dict[str, str] = {"source": source}
+        for variant, (width, fmt, quality) in VARIANTS.items():
+            name = variant_name(product_id, source, variant)
+            _delete_files([name])
+            variants[variant] = default_storage.save(
+                name, ContentFile(_render(image, width, fmt, quality))
+            )
+        created = {name for key, name in variants.items() if key != "source"}
+
+        # update() вместо save(): не запускаем сигналы повторно; изображение могли успеть заменить
+        if not Product.objects.filter(pk=product_id, image=source).update(image_variants=variants):
+            _delete_files(created)  # варианты устаревшего изображения никому не нужны
+            return {}
+        purge_surrogate_keys(product_tag(product_id))
+        bump_generation(category_scope(category_slug))
+        _delete_files(
+            name
+            for key, name in (previous or {}).items()
+            if key != "source" and name not in created
+        )
+        return variants
+    except Exception:
+        logger.exception("Не удалось построить варианты изображения товара %s", product_id)
+        return {}
+    finally:
+        if not getattr(settings, "IMAGE_VARIANTS_SYNC", False):
+            connections.close_all()  # поток пула не должен держать соединения с БД
+
+
+def schedule_variants(product: Product) -> None:
+    """
+    Ставит генерацию вариантов в очередь, если изображение новое.
+    IMAGE_VARIANTS_SYNC=True — выполнить сразу (тесты, management-команды).
+    """
+    source = product.image.name if product.image else ""
+    if not source or (product.image_variants or {}).get("source") == source:
+        return
+    if getattr(settings, "IMAGE_VARIANTS_SYNC", False):
+        transaction.on_commit(lambda: generate_variants(product.pk))
+    else:
+        transaction.on_commit(lambda: _executor.submit(generate_variants, product.pk))
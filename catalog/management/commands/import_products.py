@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Iterator
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.bulk import CategoryResolver, ProductBulkWriter, SlugAllocator
+from catalog.models import Product
+
+TRUE_VALUES = {"1", "true", "yes", "да", "t"}
+STATUSES = dict(Product.STATUS_CHOICES)
+PRICE_FIELD = Product._meta.get_field("price")
+# Наибольшая цена, которая помещается в DecimalField(max_digits, decimal_places)
+MAX_PRICE = Decimal(10) ** (PRICE_FIELD.max_digits - PRICE_FIELD.decimal_places) - Decimal("0.01")
+
+
+def read_rows(path: Path, fmt: str) -> Iterator[dict]:
+    """Построчное чтение CSV (с заголовком) или JSONL — файл целиком в память не загружается."""
+    with path.open(encoding="utf-8-sig", newline="") as fh:
+        if fmt == "csv":
+            yield from csv.DictReader(fh)
+        else:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        row = None
+                    # не объект ([1, 2], 5) — строка отклоняется
+                    yield row if isinstance(row, dict) else {}
+
+
+class Command(BaseCommand):
+    """
+    Потоковый импорт товаров из CSV/JSONL.
+    Поля: title, category, price, description, is_published, status, slug (необязательно).
+    """
+
+    help = "Импортирует товары из CSV/JSONL пакетами (bulk_create, на PostgreSQL — COPY)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу .csv или .jsonl")
+        parser.add_argument(
+            "--format", choices=("csv", "jsonl"), help="Формат (по умолчанию — по расширению)"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Строк в пакете вставки")
+        parser.add_argument(
+            "--no-copy", action="store_true", help="Не использовать COPY даже на PostgreSQL"
+        )
+        parser.add_argument(
+            "--default-category", default="", help="Категория для строк без category"
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=50000, help="Печатать прогресс каждые N строк"
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"Файл не найден: {path}")
+        fmt = options["format"] or (
+            "jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "csv"
+        )
+        batch_size = options["batch_size"]
+
+        categories = CategoryResolver()
+        slugs = SlugAllocator()
+        writer = ProductBulkWriter(
+            batch_size=batch_size, use_copy=False if options["no_copy"] else None
+        )
+        default_category = options["default_category"]
+
+        started = time.monotonic()
+        seen = rejected = 0
+        next_report = options["progress_every"]
+        batch: list[Product] = []
+        explicit_slugs: list[str] = []
+
+        for row in read_rows(path, fmt):
+            seen += 1
+            product = self._build(row, categories, default_category)
+            if product is None:
+                rejected += 1
+            else:
+                batch.append(product)
+                explicit_slugs.append((row.get("slug") or "").strip())
+            if len(batch) >= batch_size:
+                self._flush(batch, explicit_slugs, slugs, writer)
+                batch, explicit_slugs = [], []
+            if seen >= next_report:
+                self._report(seen, writer.written, rejected, started)
+                next_report += options["progress_every"]
+
+        self._flush(batch, explicit_slugs, slugs, writer)
+        writer.finish()
+        self._report(seen, writer.written, rejected, started, final=True)
+
+    @staticmethod
+    def _build(row: dict, categories: CategoryResolver, default_category: str) -> Product | None:
+        """Строка файла -> несохранённый Product; None — строка отклонена."""
+        title = str(row.get("title") or "").strip()
+        category = str(row.get("category") or default_category).strip()
+        if not title or not category:
+            return None
+        try:
+            price = Decimal(str(row.get("price") or 0))
+            if not price.is_finite() or not 0 <= price <= MAX_PRICE:
+                return None
+            price = price.quantize(Decimal("0.01"))
+        except InvalidOperation:
+            return None
+        status = str(row.get("status") or "draft")
+        published = row.get("is_published", True)
+        if isinstance(published, str):
+            published = published.strip().lower() in TRUE_VALUES
+        return Product(
+            title=title[:200],
+            category_id=categories.resolve(category[:150]),
+            price=price,
+            description=str(row.get("description") or ""),
+            is_published=bool(published),
+            status=status if status in STATUSES else "draft",
+        )
+
+    @staticmethod
+    def _flush(batch, explicit_slugs, slugs: SlugAllocator, writer: ProductBulkWriter) -> None:
+        """Пакетно выдаёт slug (явные из файла тоже проверяются на уникальность) и пишет пакет."""
+        if not batch:
+            return
+        sources = [explicit or product.title for product, explicit in zip(batch, explicit_slugs)]
+        for product, slug in zip(batch, slugs.allocate(sources)):
+            product.slug = slug
+        writer.write(batch)
+
+    def _report(
+        self, seen: int, written: int, rejected: int, started: float, final: bool = False
+    ) -> None:
+        elapsed = max(time.monotonic() - started, 1e-6)
+        line = (
+            f"Строк: {seen}, записано: {written}, отклонено: {rejected}, "
+            f"{seen / elapsed:,.0f} строк/с"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ Готово. {line}") if final else line)
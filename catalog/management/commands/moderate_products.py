@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog.cache import bump_generation, category_scope, product_tag, purge_surrogate_keys
+from catalog.facets import rebuild_facets
+from catalog.models import Category, Product
+from catalog.moderation import get_matcher
+from catalog.search import reset_index
+
+
+class Command(BaseCommand):
+    """
+    Потоковая проверка всех товаров по списку запрещённых слов.
+    Нарушители пакетно снимаются с публикации (status=unpublished).
+    """
+
+    help = "Проверяет товары на запрещённые слова и снимает нарушителей с публикации"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=2000, help="Размер пакета чтения/обновления"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Только отчёт, без изменений в БД"
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        matcher = get_matcher()
+
+        rows = Product.objects.filter(is_published=True).values_list(
+            "pk", "title", "description", "category_id"
+        )
+        checked = flagged = 0
+        batch: list[int] = []
+        categories: set[int] = set()
+
+        for pk, title, description, category_id in rows.iterator(chunk_size=batch_size):
+            checked += 1
+            matches = matcher.find_all(title) + matcher.find_all(description)
+            if not matches:
+                continue
+            flagged += 1
+            batch.append(pk)
+            categories.add(category_id)
+            if options["verbosity"] > 1:
+                found = ", ".join(f"{m.word}@{m.start}" for m in matches)
+                self.stdout.write(f"#{pk} «{title}»: {found}")
+            if len(batch) >= batch_size:
+                self._flag(batch, dry_run)
+                batch = []
+        self._flag(batch, dry_run)
+
+        if flagged and not dry_run:
+            # update() обходит сигналы — обновляем производные данные разом
+            rebuild_facets()
+            reset_index()
+            slugs = Category.objects.filter(pk__in=categories).values_list("slug", flat=True)
+            bump_generation(*(category_scope(slug) for slug in slugs))
+
+        action = "найдено" if dry_run else "снято с публикации"
+        self.stdout.write(self.style.SUCCESS(f"Проверено товаров: {checked}, {action}: {flagged}."))
+
+    @staticmethod
+    def _flag(pks: list[int], dry_run: bool) -> None:
+        """Снимает пакет товаров с публикации одним UPDATE."""
+        if not pks or dry_run:
+            return
+        with transaction.atomic():
+            Product.objects.filter(pk__in=pks).update(is_published=False, status="unpublished")
+        purge_surrogate_keys(*(product_tag(pk) for pk in pks))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from catalog.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    """Полный пересчёт счётчиков фасетов каталога (после массовой загрузки или для сверки)."""
+
+    help = "Пересчитывает таблицу ProductFacet по опубликованным товарам"
+
+    def handle(self, *args, **options):
+        rows = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f"Фасеты пересчитаны: {rows} значений."))
@@ -1,14 +1,21 @@
 # catalog/management/commands/seed_products.py
 from __future__ import annotations
 
+import math
+import random
+import secrets
+import time
+from datetime import datetime, timezone
 from decimal import Decimal
 from hashlib import md5
+from multiprocessing import Pool
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils.text import slugify
 
+from catalog.bulk import CategoryResolver, ProductBulkWriter, base_slug, flush_catalog
 from catalog.models import Category, Product
 
 # путь к папке с изображениями
@@ -29,17 +36,93 @@ def make_unique_slug(text: str, used: set[str]) -> str:
     return slug
 
 
+# === Словари для синтетического каталога (режим --products) ===
+CATEGORY_NAMES = (
+    "Смартфоны", "Ноутбуки", "Наушники", "Планшеты", "Телевизоры", "Умные часы", "Фотоаппараты",
+    "Игровые консоли", "Мониторы", "Клавиатуры", "Пылесосы", "Кофемашины", "Колонки", "Роутеры",
+)  # fmt: skip
+BRANDS = (
+    "Apple", "Samsung", "Xiaomi", "Sony", "ASUS", "Lenovo", "Huawei", "Bosch", "Philips", "LG",
+    "Honor", "Acer",
+)  # fmt: skip
+NOUNS = (
+    "Смартфон", "Ноутбук", "Наушники", "Планшет", "Телевизор", "Часы", "Камера", "Монитор",
+    "Колонка", "Роутер",
+)  # fmt: skip
+ADJECTIVES = (
+    "беспроводные", "игровой", "компактный", "профессиональный", "ультратонкий", "умный",
+    "портативный",
+)  # fmt: skip
+SUFFIXES = ("Pro", "Max", "Lite", "Ultra", "Mini", "Plus", "SE", "")
+FEATURES = (
+    "быстрая зарядка", "шумоподавление", "OLED-экран", "защита от воды", "металлический корпус",
+    "долгая автономность", "поддержка 5G", "Wi-Fi 6", "подсветка клавиш", "стереодинамики",
+)  # fmt: skip
+
+
+def _generate_chunk(spec: tuple) -> list[tuple]:
+    """
+    Генерирует часть синтетического каталога (выполняется в отдельном процессе).
+    Возвращает кортежи (title, slug, price, description, created_at_ts, category_index) — без ORM.
+    """
+    start, count, seed, categories, days, now_ts, slug_token = spec
+    rnd = random.Random(seed * 1_000_003 + start)
+    rows = []
+    for i in range(start, start + count):
+        brand = rnd.choice(BRANDS)
+        title = f"{rnd.choice(NOUNS)} {brand} {rnd.choice(SUFFIXES)} {rnd.randint(1, 99)}".replace(
+            "  ", " "
+        )
+        if rnd.random() < 0.3:
+            title = f"{rnd.choice(ADJECTIVES).capitalize()} {title}"
+        description = (
+            f"{title}: {', '.join(rnd.sample(FEATURES, 3))}. Гарантия {rnd.randint(1, 3)} г."
+        )
+        # цены — логнормальное распределение (много дешёвых товаров, длинный хвост дорогих)
+        price = min(max(math.exp(rnd.gauss(8.0, 1.2)), 10), 9_999_999)
+        price = Decimal(f"{int(price)}.{rnd.choice(('00', '90', '99'))}")
+        # даты смещены к недавним: квадрат равномерной величины
+        created_at = now_ts - (rnd.random() ** 2) * days * 86400
+        slug = f"{base_slug(title, 180)}-{slug_token}{i}"
+        rows.append((title, slug, str(price), description, created_at, rnd.randrange(categories)))
+    return rows
+
+
 class Command(BaseCommand):
-    """Команда для очистки и наполнения БД тестовыми категориями и продуктами."""
+    """
+    Команда для очистки и наполнения БД тестовыми категориями и продуктами.
+    С --products N — масштабный синтетический каталог для нагрузочных замеров.
+    """
+
+    help = (
+        "Очищает таблицы Category и Product, "
+        "добавляет тестовые записи с фото, если найдены в media/products."
+    )
 
-    help = "Очищает таблицы Category и Product, " "добавляет тестовые записи с фото, если найдены в media/products."
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products", "--count", type=int, default=0, help="Сгенерировать N товаров"
+        )
+        parser.add_argument(
+            "--categories", type=int, default=20, help="Число категорий (режим --products)"
+        )
+        parser.add_argument("--workers", type=int, default=1, help="Процессов-генераторов")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Строк в пакете вставки")
+        parser.add_argument("--days", type=int, default=365, help="Разброс created_at в днях")
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Seed генератора (воспроизводимость)"
+        )
+        parser.add_argument(
+            "--no-flush", action="store_true", help="Не очищать таблицы перед генерацией"
+        )
 
     def handle(self, *args, **options):
-        with transaction.atomic():
-            self.stdout.write("🗑 Очищаем таблицы...")
-            Product.objects.all().delete()
-            Category.objects.all().delete()
+        if options["products"]:
+            return self._seed_scale(options)
 
+        self.stdout.write("🗑 Очищаем таблицы...")
+        flush_catalog()
+        with transaction.atomic():
             # === Категории ===
             categories_data = [
                 ("Смартфоны", "Категория смартфонов"),
@@ -94,5 +177,90 @@ class Command(BaseCommand):
                     )
                 )
 
-            Product.objects.bulk_create(products)
+            # bulk_create минует сигналы — фасеты и кеши обновит finish()
+            writer = ProductBulkWriter(use_copy=False)
+            writer.write(products)
+            writer.finish()
             self.stdout.write(self.style.SUCCESS("✅ Готово! Тестовые данные и фото загружены."))
+
+    def _seed_scale(self, options) -> None:
+        """Параллельная генерация N товаров и пакетная вставка (bulk_create / COPY)."""
+        total, batch_size, workers = (
+            options["products"],
+            options["batch_size"],
+            max(1, options["workers"]),
+        )
+        started = time.monotonic()
+
+        if not options["no_flush"]:
+            self.stdout.write("🗑 Очищаем таблицы...")
+            flush_catalog()
+
+        names = [
+            CATEGORY_NAMES[i] if i < len(CATEGORY_NAMES) else f"Категория {i + 1}"
+            for i in range(options["categories"])
+        ]
+        resolver = CategoryResolver()
+        category_ids = [resolver.resolve(name) for name in names]
+
+        # при --no-flush в slug добавляется метка запуска, чтобы не пересечься с прошлыми данными
+        slug_token = f"{secrets.token_hex(2)}-" if options["no_flush"] else ""
+        now_ts = datetime.now(timezone.utc).timestamp()
+        specs = [
+            (
+                start,
+                min(batch_size, total - start),
+                options["seed"],
+                len(names),
+                options["days"],
+                now_ts,
+                slug_token,
+            )
+            for start in range(0, total, batch_size)
+        ]
+
+        writer = ProductBulkWriter(batch_size=batch_size)
+        if workers == 1:
+            chunks = map(_generate_chunk, specs)
+            self._write_chunks(chunks, writer, category_ids, total, started)
+        else:
+            with Pool(workers) as pool:
+                # окнами по 2×workers пакетов — готовые, но не записанные пакеты не копятся в памяти
+                window = workers * 2
+                for offset in range(0, len(specs), window):
+                    chunks = pool.imap(_generate_chunk, specs[offset : offset + window])
+                    self._write_chunks(chunks, writer, category_ids, total, started)
+        writer.finish()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Готово! Товаров: {writer.written}, категорий: {len(names)}, "
+                f"{elapsed:.1f} с ({writer.written / elapsed:,.0f} строк/с)."
+            )
+        )
+
+    def _write_chunks(
+        self, chunks, writer: ProductBulkWriter, category_ids: list[int], total: int, started
+    ) -> None:
+        for rows in chunks:
+            writer.write(
+                [
+                    Product(
+                        title=title,
+                        slug=slug,
+                        price=Decimal(price),
+                        description=description,
+                        category_id=category_ids[category_index],
+                        is_published=True,
+                        status="published",
+                        created_at=datetime.fromtimestamp(created_at, tz=timezone.utc),
+                        updated_at=datetime.fromtimestamp(created_at, tz=timezone.utc),
+                    )
+                    for title, slug, price, description, created_at, category_index in rows
+                ]
+            )
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f"  {writer.written}/{total} ({writer.written / elapsed:,.0f} строк/с)"
+            )
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.11 on 2026-10-18 13:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0003_product_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFacet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(max_length=20, verbose_name="Измерение"),
+                ),
+                ("value", models.CharField(max_length=64, verbose_name="Значение")),
+                ("count", models.IntegerField(default=0, verbose_name="Количество")),
+            ],
+            options={
+                "verbose_name": "Счётчик фасета",
+                "verbose_name_plural": "Счётчики фасетов",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "value"), name="facet_dimension_value_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
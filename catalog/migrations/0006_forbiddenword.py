@@ -0,0 +1,40 @@
+# Generated by Django 5.1.11 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0005_product_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ForbiddenWord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "word",
+                    models.CharField(max_length=100, unique=True, verbose_name="Слово"),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, verbose_name="Активно"),
+                ),
+            ],
+            options={
+                "verbose_name": "Запрещённое слово",
+                "verbose_name_plural": "Запрещённые слова",
+                "ordering": ("word",),
+            },
+        ),
+    ]
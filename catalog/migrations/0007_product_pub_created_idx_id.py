@@ -0,0 +1,26 @@
+# Generated by Django 5.1.11 on 2026-10-18 14:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0006_forbiddenword"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="prod_pub_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["is_published", "-created_at", "-id"],
+                name="prod_pub_created_idx",
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # catalog/models.py
 from __future__ import annotations
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.urls import reverse
@@ -86,6 +87,10 @@ class Product(models.Model):
     )
     description = models.TextField("Описание", blank=True, default="")
     image = models.ImageField("Изображение", upload_to="products/", blank=True, null=True)
+    # Уменьшенные копии изображения (заполняются фоново, см. catalog/images.py)
+    image_variants = models.JSONField(
+        "Варианты изображения", default=dict, blank=True, editable=False
+    )
     is_published = models.BooleanField("Опубликовано", default=True)
     created_at = models.DateTimeField("Создано", auto_now_add=True)
     updated_at = models.DateTimeField("Обновлено", auto_now=True)
@@ -113,6 +118,9 @@ class Product(models.Model):
         blank=True,
     )
 
+    # Поисковый вектор (PostgreSQL, GIN-индекс prod_search_gin создаётся миграцией 0003)
+    search_vector = SearchVectorField("Поисковый вектор", null=True, blank=True, editable=False)
+
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
@@ -123,7 +131,11 @@ class Product(models.Model):
             ("can_unpublish_product", "Может отменять публикацию продукта"),
         ]
         indexes = [
-            models.Index(fields=("is_published", "-created_at"), name="prod_pub_created_idx"),
+            # -id — второй ключ курсорной пагинации (created_at, id): граница курсора идёт по
+            # индексу
+            models.Index(
+                fields=("is_published", "-created_at", "-id"), name="prod_pub_created_idx"
+            ),
             models.Index(fields=("category", "is_published"), name="prod_cat_pub_idx"),
         ]
 
@@ -131,15 +143,42 @@ class Product(models.Model):
         """Имя товара в админке/шаблонах."""
         return self.title
 
+    # Поля, от которых зависит поисковый индекс (tsvector или индекс в памяти)
+    SEARCH_FIELDS = ("title", "description", "is_published")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._indexed = instance._search_values()
+        return instance
+
+    def _search_values(self) -> tuple | None:
+        """Значения SEARCH_FIELDS; None — какое-то из них не загружено (only/defer)."""
+        loaded = self.__dict__
+        if any(name not in loaded for name in self.SEARCH_FIELDS):
+            return None
+        return tuple(loaded[name] for name in self.SEARCH_FIELDS)
+
     def save(self, *args, **kwargs) -> None:
         """
         Автогенерация слага при отсутствии.
         Поддержка кириллицы через allow_unicode=True.
+        После сохранения обновляется поисковый индекс товара — только если изменились
+        название, описание или публикация.
         """
         if not self.slug:
             self.slug = slugify(self.title, allow_unicode=True)
         super().save(*args, **kwargs)
 
+        current = self._search_values()
+        if current is not None and current == getattr(self, "_indexed", None):
+            return
+
+        from catalog.search import index_products  # импорт внутри: search импортирует модели
+
+        index_products(type(self).objects.filter(pk=self.pk))
+        self._indexed = current
+
     def get_absolute_url(self) -> str:
         """
         URL детальной страницы товара.
@@ -154,3 +193,48 @@ class Product(models.Model):
         """
         text = (self.description or "").strip()
         return (text[:100] + "…") if len(text) > 100 else text
+
+
+class ProductFacet(models.Model):
+    """
+    Предрассчитанный счётчик фасета (опубликованных товаров по категории, статусу, ценовой корзине).
+    Поддерживается инкрементально сигналами Product, см. catalog/facets.py.
+    """
+
+    dimension = models.CharField("Измерение", max_length=20)
+    value = models.CharField("Значение", max_length=64)
+    count = models.IntegerField("Количество", default=0)
+
+    class Meta:
+        verbose_name = "Счётчик фасета"
+        verbose_name_plural = "Счётчики фасетов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("dimension", "value"), name="facet_dimension_value_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension}={self.value}: {self.count}"
+
+
+class ForbiddenWord(models.Model):
+    """
+    Запрещённое слово для модерации товаров (дополняет встроенный список).
+    """
+
+    word = models.CharField("Слово", max_length=100, unique=True)
+    is_active = models.BooleanField("Активно", default=True)
+
+    class Meta:
+        verbose_name = "Запрещённое слово"
+        verbose_name_plural = "Запрещённые слова"
+        ordering = ("word",)
+
+    def __str__(self) -> str:
+        return self.word
+
+    def save(self, *args, **kwargs) -> None:
+        """Слова храним в нижнем регистре — поиск без учёта регистра."""
+        self.word = self.word.strip().lower()
+        super().save(*args, **kwargs)
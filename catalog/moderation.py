@@ -0,0 +1,141 @@
+"""
+Модерация текста по списку запрещённых слов.
+
+Список компилируется один раз в автомат Ахо — Корасик: проверка текста идёт
+за один проход независимо от числа слов. Источники слов: встроенный список,
+файл FORBIDDEN_WORDS_FILE (по слову в строке) и таблица ForbiddenWord.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from django.conf import settings
+
+from catalog.cache import bump_generation, get_generation
+from catalog.models import ForbiddenWord
+
+# Встроенный список запрещённых слов
+FORBIDDEN_WORDS: tuple[str, ...] = (
+    "казино",
+    "криптовалюта",
+    "крипта",
+    "биржа",
+    "дешево",
+    "бесплатно",
+    "обман",
+    "полиция",
+    "радар",
+)
+
+WORDS_SCOPE = "forbidden_words"
+
+
+@dataclass(frozen=True)
+class Match:
+    """Найденное слово и его позиция в тексте [start, end)."""
+
+    word: str
+    start: int
+    end: int
+
+
+class Automaton:
+    """Автомат Ахо — Корасик для поиска всех вхождений набора слов (без учёта регистра)."""
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+        self.words = tuple(sorted({w.strip().lower() for w in words if w and w.strip()}))
+        for word in self.words:
+            self._insert(word)
+        self._build_links()
+
+    def _insert(self, word: str) -> None:
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += (word,)
+
+    def _build_links(self) -> None:
+        """Суффиксные ссылки обходом в ширину; выходы наследуются по ссылкам."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(ch, 0)
+                # у детей корня ссылка на корень
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> list[Match]:
+        """Все вхождения слов в текст (включая перекрывающиеся), по позиции конца."""
+        matches = []
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate((text or "").lower()):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for word in out[state]:
+                matches.append(Match(word, i + 1 - len(word), i + 1))
+        return matches
+
+    def first(self, text: str) -> Match | None:
+        """Первое найденное слово или None."""
+        matches = self.find_all(text)
+        return matches[0] if matches else None
+
+
+def load_words() -> set[str]:
+    """
+    Объединённый список: встроенный + файл FORBIDDEN_WORDS_FILE + активные записи ForbiddenWord.
+    """
+    words = set(FORBIDDEN_WORDS)
+    path = getattr(settings, "FORBIDDEN_WORDS_FILE", "")
+    if path and Path(path).is_file():
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        words.update(line.strip() for line in lines if line.strip() and not line.startswith("#"))
+    words.update(ForbiddenWord.objects.filter(is_active=True).values_list("word", flat=True))
+    return words
+
+
+_lock = threading.Lock()
+_compiled: tuple[int, Automaton] | None = None
+
+
+def get_matcher() -> Automaton:
+    """
+    Скомпилированный автомат текущего списка слов.
+    Пересобирается, только когда сменилось поколение списка (правка ForbiddenWord в любом процессе).
+    """
+    global _compiled
+    generation = get_generation(WORDS_SCOPE)
+    compiled = _compiled
+    if compiled is None or compiled[0] != generation:
+        with _lock:
+            if _compiled is None or _compiled[0] != generation:
+                _compiled = (generation, Automaton(load_words()))
+            compiled = _compiled
+    return compiled[1]
+
+
+def invalidate_matcher() -> None:
+    """Помечает список слов изменённым во всех процессах."""
+    bump_generation(WORDS_SCOPE)
@@ -0,0 +1,131 @@
+"""Курсорная (keyset) пагинация для лент, упорядоченных по дате (товары, попытки рассылок)."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterator
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Model, Q, QuerySet
+
+# Направления перехода, зашитые в курсор
+FORWARD = "n"
+BACKWARD = "p"
+
+
+def encode_cursor(direction: str, created_at: datetime, pk: int) -> str:
+    """Упаковывает позицию (дата, id) в непрозрачный url-safe токен."""
+    raw = f"{direction}|{created_at.isoformat()}|{pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None) -> tuple[str, datetime, int] | None:
+    """
+    Распаковывает токен курсора.
+    Битый или подделанный токен — None (показываем первую страницу).
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, created_at, pk = base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        if direction not in (FORWARD, BACKWARD):
+            return None
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+@dataclass
+class KeysetPage:
+    """
+    Страница курсорной пагинации.
+    Повторяет нужную шаблонам часть интерфейса django.core.paginator.Page.
+    """
+
+    object_list: list[Any]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    total_estimate: int | None = field(default=None)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.prev_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+def paginate_keyset(
+    qs: QuerySet, cursor: str | None, per_page: int, field: str = "created_at"
+) -> KeysetPage:
+    """
+    Возвращает страницу qs, упорядоченного по (-field, -id), начиная с курсора.
+
+    Вместо OFFSET используется условие (field, id) < (x, y). Оно записано как
+    field <= x AND (field < x OR id < y): первая часть — граница диапазона индекса
+    по (field, id) (для товаров — prod_pub_created_idx (is_published, -created_at, -id)),
+    поэтому сканирование начинается с позиции курсора и стоимость страницы не зависит
+    от глубины. COUNT(*) не выполняется.
+    """
+    position = decode_cursor(cursor)
+
+    if position is None:
+        rows = list(qs.order_by(f"-{field}", "-id")[: per_page + 1])
+        has_more, rows = len(rows) > per_page, rows[:per_page]
+        has_next, has_prev = has_more, False
+    else:
+        direction, value, pk = position
+        if direction == FORWARD:
+            after = Q(**{f"{field}__lte": value}) & (Q(**{f"{field}__lt": value}) | Q(id__lt=pk))
+            rows = list(qs.filter(after).order_by(f"-{field}", "-id")[: per_page + 1])
+            has_more, rows = len(rows) > per_page, rows[:per_page]
+            has_next, has_prev = has_more, True
+        else:
+            before = Q(**{f"{field}__gte": value}) & (Q(**{f"{field}__gt": value}) | Q(id__gt=pk))
+            rows = list(qs.filter(before).order_by(field, "id")[: per_page + 1])
+            has_more, rows = len(rows) > per_page, rows[:per_page]
+            rows.reverse()
+            has_next, has_prev = True, has_more
+
+    page = KeysetPage(object_list=rows)
+    if rows:
+        if has_next:
+            page.next_cursor = encode_cursor(FORWARD, getattr(rows[-1], field), rows[-1].pk)
+        if has_prev:
+            page.prev_cursor = encode_cursor(BACKWARD, getattr(rows[0], field), rows[0].pk)
+    return page
+
+
+def estimate_count(qs: QuerySet | type[Model], timeout: int = 60 * 5) -> int:
+    """
+    Приблизительное число строк выборки (или всей таблицы модели).
+    PostgreSQL — оценка планировщика из EXPLAIN, без выполнения запроса;
+    остальные СУБД — точный COUNT(*), закешированный на timeout секунд.
+    """
+    if not isinstance(qs, QuerySet):
+        qs = qs._default_manager.all()
+    qs = qs.order_by()
+    if connection.vendor == "postgresql":
+        # psycopg отдаёт {"Plan": ...}, без обёртки-списка
+        plan = json.loads(qs.explain(format="json"))
+        if isinstance(plan, list):
+            plan = plan[0]
+        return int(plan["Plan"]["Plan Rows"])
+    sql, params = qs.query.sql_with_params()
+    key = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+    return cache.get_or_set(f"estimate_count_{qs.model._meta.db_table}_{key}", qs.count, timeout)
@@ -0,0 +1,297 @@
+"""
+Полнотекстовый поиск по товарам.
+
+PostgreSQL — колонка Product.search_vector (tsvector, конфигурация 'russian')
+с GIN-индексом prod_search_gin, ранжирование через ts_rank.
+SQLite и прочие СУБД — инвертированный индекс в памяти процесса
+со стеммером Snowball для русского языка и TF-IDF ранжированием. Этот фолбэк —
+для разработки и одного процесса: правки товаров видит только процесс, который их
+сохранил, остальные воркеры увидят их лишь после перезапуска (reset_index).
+В продакшене с несколькими воркерами поиск работает на PostgreSQL.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, QuerySet
+
+from catalog.models import Product
+
+SEARCH_CONFIG = "russian"
+# Вес совпадения в названии относительно описания (аналог весов A/B в tsvector)
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ==============================================================
+# Стеммер Snowball (русский)
+# ==============================================================
+_VOWELS = frozenset("аеиоуыэюя")
+
+_PERFECTIVE_GERUND_1 = ("вшись", "вши", "в")
+_PERFECTIVE_GERUND_2 = ("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+_ADJECTIVE = (
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий", "ый", "ой",
+    "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)  # fmt: skip
+_PARTICIPLE_1 = ("ем", "нн", "вш", "ющ", "щ")
+_PARTICIPLE_2 = ("ивш", "ывш", "ующ")
+_REFLEXIVE = ("ся", "сь")
+_VERB_1 = (
+    "ете", "йте", "ешь", "нно", "ла", "на", "ли", "ем", "ло", "но", "ет", "ют", "ны", "ть", "й",
+    "л", "н",
+)  # fmt: skip
+_VERB_2 = (
+    "ейте", "уйте", "ила", "ыла", "ена", "ите", "или", "ыли", "ило", "ыло", "ено", "ует", "уют",
+    "ены", "ить", "ыть", "ишь", "ей", "уй", "ил", "ыл", "им", "ым", "ен", "ят", "ит", "ыт", "ую",
+    "ю",
+)  # fmt: skip
+_NOUN = (
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи", "ии", "ей",
+    "ой", "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия", "ья", "а", "е", "и", "й",
+    "о", "у", "ы", "ь", "ю", "я",
+)  # fmt: skip
+_DERIVATIONAL = ("ость", "ост")
+
+
+def _regions(word: str) -> tuple[int, int]:
+    """Начало областей RV и R2 (индексы в слове)."""
+    rv = len(word)
+    for i, ch in enumerate(word):
+        if ch in _VOWELS:
+            rv = i + 1
+            break
+
+    def next_region(start: int) -> int:
+        for i in range(start + 1, len(word)):
+            if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = next_region(0)
+    return rv, next_region(r1)
+
+
+def _strip(word: str, rv: int, group1: tuple[str, ...], group2: tuple[str, ...] = ()) -> str | None:
+    """
+    Снимает самое длинное окончание из group1/group2 внутри RV.
+    Окончания group1 допустимы только после «а»/«я». None — ничего не снято.
+    """
+    best, in_group1 = "", False
+    for ending in group1:
+        if len(ending) > len(best) and word.endswith(ending) and len(word) - len(ending) >= rv:
+            best, in_group1 = ending, True
+    for ending in group2:
+        if len(ending) > len(best) and word.endswith(ending) and len(word) - len(ending) >= rv:
+            best, in_group1 = ending, False
+    if not best:
+        return None
+    stem = word[: -len(best)]
+    if in_group1 and not (len(stem) > rv and stem[-1] in "ая"):
+        return None
+    return stem
+
+
+def stem_ru(word: str) -> str:
+    """Основа русского слова по алгоритму Snowball."""
+    word = word.replace("ё", "е")
+    rv, r2 = _regions(word)
+    if rv >= len(word):
+        return word
+
+    # Шаг 1: деепричастие, иначе возвратность + прилагательное/глагол/существительное
+    stem = _strip(word, rv, _PERFECTIVE_GERUND_1, _PERFECTIVE_GERUND_2)
+    if stem is None:
+        word = _strip(word, rv, (), _REFLEXIVE) or word
+        stem = _strip(word, rv, (), _ADJECTIVE)
+        if stem is not None:
+            stem = _strip(stem, rv, _PARTICIPLE_1, _PARTICIPLE_2) or stem
+        else:
+            stem = _strip(word, rv, _VERB_1, _VERB_2)
+            if stem is None:
+                stem = _strip(word, rv, (), _NOUN)
+    word = stem if stem is not None else word
+
+    # Шаг 2: конечная «и»
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3: словообразовательные суффиксы в R2
+    for ending in _DERIVATIONAL:
+        if word.endswith(ending) and len(word) - len(ending) >= max(r2, rv):
+            word = word[: -len(ending)]
+            break
+
+    # Шаг 4: превосходная степень, «нн», мягкий знак
+    superlative = next(
+        (e for e in ("ейше", "ейш") if word.endswith(e) and len(word) - len(e) >= rv), ""
+    )
+    if superlative:
+        word = word[: -len(superlative)]
+    if word.endswith("нн") and len(word) - 2 >= rv:
+        word = word[:-1]
+    elif not superlative and word.endswith("ь") and len(word) - 1 >= rv:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Разбивает текст на нормализованные термы (кириллица — через стеммер)."""
+    terms = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        if any("а" <= ch <= "я" or ch == "ё" for ch in token):
+            token = stem_ru(token)
+        terms.append(token)
+    return terms
+
+
+# ==============================================================
+# Инвертированный индекс (фолбэк для SQLite)
+# ==============================================================
+class InvertedIndex:
+    """
+    Индекс терм -> {id товара: взвешенная частота}.
+    Строится лениво при первом поиске, дальше обновляется из Product.save этого процесса
+    (только один процесс — см. описание модуля).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_terms: dict[int, set[str]] = {}
+        self.built = False
+
+    def _remove(self, pk: int) -> None:
+        for term in self._doc_terms.pop(pk, ()):
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.pop(pk, None)
+                if not docs:
+                    del self._postings[term]
+
+    def _add(self, pk: int, title: str, description: str) -> None:
+        self._remove(pk)
+        weights: dict[str, float] = defaultdict(float)
+        for term in tokenize(title):
+            weights[term] += TITLE_WEIGHT
+        for term in tokenize(description):
+            weights[term] += DESCRIPTION_WEIGHT
+        for term, weight in weights.items():
+            self._postings[term][pk] = weight
+        self._doc_terms[pk] = set(weights)
+
+    def build(self) -> None:
+        """Полная перестройка по опубликованным товарам."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            rows = Product.objects.filter(is_published=True).values_list(
+                "pk", "title", "description"
+            )
+            for pk, title, description in rows.iterator(chunk_size=2000):
+                self._add(pk, title, description)
+            self.built = True
+
+    def update(self, rows) -> None:
+        """Обновляет записи (pk, title, description, is_published), если индекс уже построен."""
+        if not self.built:
+            return
+        with self._lock:
+            for pk, title, description, is_published in rows:
+                if is_published:
+                    self._add(pk, title, description)
+                else:
+                    self._remove(pk)
+
+    def reset(self) -> None:
+        """Сбрасывает индекс — он будет построен заново при следующем поиске."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self.built = False
+
+    def search(self, query: str, limit: int) -> list[tuple[int, float]]:
+        """Товары, содержащие все термы запроса, по убыванию TF-IDF."""
+        if not self.built:
+            self.build()
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            total = len(self._doc_terms)
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            scores = {
+                pk: sum(docs[pk] * math.log(1 + total / len(docs)) for docs in postings)
+                for pk in candidates
+            }
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+
+
+_index = InvertedIndex()
+
+
+# ==============================================================
+# Публичный API
+# ==============================================================
+def product_search_vector() -> SearchVector:
+    """Выражение tsvector: название (вес A) + описание (вес B)."""
+    return SearchVector("title", weight="A", config=SEARCH_CONFIG) + SearchVector(
+        "description", weight="B", config=SEARCH_CONFIG
+    )
+
+
+def index_products(qs: QuerySet) -> None:
+    """
+    Обновляет поисковый индекс для товаров из qs.
+    Вызывается из Product.save и после массовых загрузок.
+    """
+    if connection.vendor == "postgresql":
+        qs.update(search_vector=product_search_vector())
+    else:
+        _index.update(qs.values_list("pk", "title", "description", "is_published"))
+
+
+def reset_index() -> None:
+    """Полная переиндексация: PG — пересчёт tsvector, иначе — сброс индекса в памяти."""
+    if connection.vendor == "postgresql":
+        index_products(Product.objects.all())
+    else:
+        _index.reset()
+
+
+def search_products(query: str, limit: int = 48) -> list[Product]:
+    """Опубликованные товары по запросу, отсортированные по релевантности (атрибут rank)."""
+    query = (query or "").strip()
+    if not query:
+        return []
+    qs = Product.objects.filter(is_published=True).select_related("category")
+
+    if connection.vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return list(
+            qs.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-created_at")[:limit]
+        )
+
+    ranked = _index.search(query, limit)
+    products = qs.in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, score in ranked:
+        product = products.get(pk)
+        if product is not None:
+            product.rank = score
+            results.append(product)
+    return results
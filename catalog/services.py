@@ -8,5 +8,5 @@ def get_products_by_category(slug: str):
     try:
         category = Category.objects.get(slug=slug)
     except Category.DoesNotExist:
-        return []
+        return Product.objects.none()
     return Product.objects.filter(category=category, is_published=True)
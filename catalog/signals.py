@@ -0,0 +1,106 @@
+"""Обработчики сигналов каталога: инвалидация кешей при изменении товаров и категорий."""
+
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from catalog.cache import (
+    bump_generation,
+    category_scope,
+    category_tag,
+    product_tag,
+    purge_surrogate_keys,
+)
+from catalog.facets import apply_facet_changes, ensure_facets, facet_values, invalidate_facets
+from catalog.images import schedule_variants
+from catalog.models import Category, ForbiddenWord, Product
+from catalog.moderation import invalidate_matcher
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_state(sender, instance: Product, **kwargs) -> None:
+    """
+    Запоминает прежние категорию, статус, цену и публикацию товара:
+    при переносе сбрасываются обе категории, фасеты пересчитываются по разнице.
+    """
+    instance._previous_state = None
+    if not instance._state.adding and instance.pk:
+        instance._previous_state = (
+            Product.objects.filter(pk=instance.pk)
+            .values_list("category_id", "status", "price", "is_published")
+            .first()
+        )
+
+
+def _published_facets(category_id, status, price, is_published) -> list[tuple[str, str]]:
+    return facet_values(category_id, status, price) if is_published else []
+
+
+@receiver(post_save, sender=Product)
+def update_product_facets(sender, instance: Product, **kwargs) -> None:
+    """Инкрементально обновляет счётчики фасетов."""
+    previous = getattr(instance, "_previous_state", None)
+    old = _published_facets(*previous) if previous else []
+    new = _published_facets(
+        instance.category_id, instance.status, instance.price, instance.is_published
+    )
+    apply_facet_changes(old, new)
+
+
+@receiver(post_migrate)
+def fill_facets_after_migrate(sender, **kwargs) -> None:
+    """Первый запуск после миграции: таблица фасетов пересчитывается здесь, а не в GET-запросе."""
+    if sender.name == "catalog":
+        ensure_facets()
+
+
+@receiver(post_save, sender=Product)
+def build_image_variants(sender, instance: Product, **kwargs) -> None:
+    """Новое изображение — фоновая генерация уменьшенных копий."""
+    schedule_variants(instance)
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_facets(sender, instance: Product, **kwargs) -> None:
+    """Вычитает удалённый товар из счётчиков фасетов."""
+    old = _published_facets(
+        instance.category_id, instance.status, instance.price, instance.is_published
+    )
+    apply_facet_changes(old, [])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_caches(sender, instance: Product, **kwargs) -> None:
+    """Сбрасывает поколение категорий, в которых товар был или стал, и страницу товара."""
+    previous = getattr(instance, "_previous_state", None)
+    category_ids = {instance.category_id, previous[0] if previous else None} - {None}
+    slugs = Category.objects.filter(pk__in=category_ids).values_list("slug", flat=True)
+    bump_generation(*(category_scope(slug) for slug in slugs))
+    purge_surrogate_keys(product_tag(instance.pk))
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance: Category, **kwargs) -> None:
+    """Запоминает прежний slug категории (на случай переименования)."""
+    instance._previous_slug = None
+    if not instance._state.adding and instance.pk:
+        instance._previous_slug = (
+            Category.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance: Category, **kwargs) -> None:
+    """Сбрасывает поколение категории по текущему и прежнему slug и страницы её товаров."""
+    slugs = {instance.slug, getattr(instance, "_previous_slug", None)} - {None, ""}
+    bump_generation(*(category_scope(slug) for slug in slugs))
+    purge_surrogate_keys(category_tag(instance.pk))
+    invalidate_facets()  # в фасетах показываются название и slug категории
+
+
+@receiver(post_save, sender=ForbiddenWord)
+@receiver(post_delete, sender=ForbiddenWord)
+def refresh_forbidden_words(sender, instance: ForbiddenWord, **kwargs) -> None:
+    """Список слов изменился — автомат модерации пересоберётся при следующей проверке."""
+    invalidate_matcher()
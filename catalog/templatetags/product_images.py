@@ -0,0 +1,52 @@
+"""Template-теги для адаптивных изображений товаров (srcset + WebP + lazy loading)."""
+
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+# размер слота картинки в вёрстке для атрибута sizes
+SIZES = {
+    "card": "(min-width: 992px) 25vw, (min-width: 768px) 50vw, 100vw",
+    "detail": "(min-width: 768px) 50vw, 100vw",
+}
+
+
+@register.simple_tag
+def product_picture(product, size: str = "card", css_class: str = "", lazy: bool = True):
+    """
+    <picture> с WebP-источником и JPEG-фолбэком из Product.image_variants.
+    Пока варианты не построены — исходное изображение.
+    Пример: {% product_picture p "card" css_class="card-img-top" %}
+    """
+    if not product.image:
+        return ""
+    loading = "lazy" if lazy else "eager"
+    variants = product.image_variants or {}
+    if variants.get("source") != product.image.name:
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" loading="{}" decoding="async">',
+            product.image.url,
+            css_class,
+            product.title,
+            loading,
+        )
+
+    url = default_storage.url
+    return format_html(
+        '<picture><source type="image/webp" srcset="{} 400w, {} 1200w" sizes="{}">'
+        '<img src="{}" srcset="{} 400w, {} 1200w" sizes="{}" '
+        'class="{}" alt="{}" loading="{}" decoding="async">'
+        "</picture>",
+        url(variants["card_webp"]),
+        url(variants["detail_webp"]),
+        SIZES[size],
+        url(variants[size]),
+        url(variants["card"]),
+        url(variants["detail"]),
+        SIZES[size],
+        css_class,
+        product.title,
+        loading,
+    )
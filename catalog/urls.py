@@ -1,5 +1,6 @@
 # catalog/urls.py
 """URL-маршруты приложения catalog."""
+
 from django.urls import path
 
 from . import views
@@ -10,9 +11,14 @@ urlpatterns = [
     path("", views.home_view, name="home"),  # /
     path("home/", views.home_view, name="home_alias"),  # /home/
     path("contacts/", views.contacts_view, name="contacts"),  # /contacts/
+    path("search/", views.search_view, name="search"),  # /search/?q=...
     path("product/create/", views.product_create_view, name="product_create"),  # /новая форма/
-    path("product/<int:pk>/", views.product_detail_view, name="product_detail"),  # /детальная страница товара/
-    path("product/<int:pk>/edit/", views.product_update_view, name="product_update"),  # добавляем update
-    path("product/<int:pk>/delete/", views.product_delete_view, name="product_delete"),  # добавляем delete
-    path("category/<slug:slug>/", views.category_products_view, name="category_products"),
+    # /детальная страница товара/
+    path("product/<int:pk>/", views.product_detail_view, name="product_detail"),
+    # добавляем update
+    path("product/<int:pk>/edit/", views.product_update_view, name="product_update"),
+    # добавляем delete
+    path("product/<int:pk>/delete/", views.product_delete_view, name="product_delete"),
+    # slug может быть кириллическим (slugify allow_unicode)
+    path("category/<str:slug>/", views.category_products_view, name="category_products"),
 ]
@@ -7,8 +7,18 @@ from django.core.cache import cache
 from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 
+from catalog.cache import (
+    CATEGORY_PRODUCTS_TIMEOUT,
+    SURROGATE_HEADER,
+    cache_page_tagged,
+    category_products_key,
+    category_tag,
+    product_tag,
+)
+from catalog.facets import apply_filters, get_facets, parse_filters
+from catalog.pagination import estimate_count, paginate_keyset
+from catalog.search import search_products
 from catalog.services import get_products_by_category
 
 from .forms import ContactForm, ProductForm
@@ -16,23 +26,38 @@ from .models import ContactInfo, Product
 
 logger = logging.getLogger(__name__)
 
+PRODUCTS_PER_PAGE = 8
+
 
 # ==============================================================
 # Главная страница с товарами + статистика рассылок
 # ==============================================================
 def home_view(request: HttpRequest) -> HttpResponse:
     """
-    Главная страница магазина с пагинацией и статистикой рассылок.
+    Главная страница магазина с пагинацией, фасетными фильтрами и статистикой рассылок.
+    По умолчанию — курсорная пагинация (?cursor=...), старые ссылки ?page=N
+    обслуживаются классическим Paginator.
     Данные рассылок кешируются на 30 секунд.
     """
     # --- товары ---
-    qs = Product.objects.select_related("category").order_by("-created_at")
-    paginator = Paginator(qs, 8)
-    page_number = request.GET.get("page", 1)
-    try:
-        page_obj = paginator.page(page_number)
-    except (PageNotAnInteger, EmptyPage):
-        page_obj = paginator.page(1)
+    filters = parse_filters(request.GET)
+    # owner нужен шаблону в каждой карточке (кнопка удаления) — без select_related это N+1
+    qs = apply_filters(
+        Product.objects.filter(is_published=True).select_related("category", "owner"), filters
+    )
+    if "page" in request.GET:
+        paginator = Paginator(qs.order_by("-created_at", "-id"), PRODUCTS_PER_PAGE)
+        try:
+            page_obj = paginator.page(request.GET.get("page", 1))
+        except (PageNotAnInteger, EmptyPage):
+            page_obj = paginator.page(1)
+        total_products = paginator.count
+    else:
+        paginator = None
+        page_obj = paginate_keyset(qs, request.GET.get("cursor"), PRODUCTS_PER_PAGE)
+        total_products = (
+            None if filters.active else estimate_count(Product.objects.filter(is_published=True))
+        )
 
     # --- статистика рассылок ---
     cache_key = "home_stats_v1"
@@ -69,6 +94,9 @@ def home_view(request: HttpRequest) -> HttpResponse:
         "page_obj": page_obj,
         "paginator": paginator,
         "is_paginated": page_obj.has_other_pages(),
+        "total_products": total_products,
+        "filters": filters,
+        "facets": get_facets(filters.category),
         **data,
         "is_manager": is_manager,  # 👈 теперь шаблон может просто проверить {% if is_manager %}
     }
@@ -79,15 +107,21 @@ def home_view(request: HttpRequest) -> HttpResponse:
 # ==============================================================
 # 🧩 Детальная страница товара (кеш Redis / LocMem)
 # ==============================================================
-@cache_page(60 * 15)
+@cache_page_tagged(60 * 15)
 def product_detail_view(request: HttpRequest, pk: int) -> HttpResponse:
-    """Детальная страница товара (кешируется на 15 минут)."""
-    product = get_object_or_404(Product.objects.select_related("category"), pk=pk)
-    return render(
+    """
+    Детальная страница товара (кешируется на 15 минут).
+    Ответ помечается Surrogate-Key товара и категории — при их изменении
+    сигналы удаляют именно эти записи кеша.
+    """
+    product = get_object_or_404(Product.objects.select_related("category", "owner"), pk=pk)
+    response = render(
         request,
         "catalog/product_detail.html",
         {"title": product.title, "product": product},
     )
+    response[SURROGATE_HEADER] = f"{product_tag(product.pk)} {category_tag(product.category_id)}"
+    return response
 
 
 # ==============================================================
@@ -136,7 +170,9 @@ def product_delete_view(request: HttpRequest, pk: int) -> HttpResponse:
     product = get_object_or_404(Product, pk=pk)
 
     # Проверка прав
-    if request.user != getattr(product, "owner", None) and not request.user.has_perm("catalog.delete_product"):
+    if request.user != getattr(product, "owner", None) and not request.user.has_perm(
+        "catalog.delete_product"
+    ):
         return HttpResponseForbidden("У вас нет прав на удаление этого товара.")
 
     if request.method == "POST":
@@ -156,22 +192,42 @@ def product_delete_view(request: HttpRequest, pk: int) -> HttpResponse:
 def category_products_view(request, slug: str):
     """
     Отображение всех товаров выбранной категории.
-    Используется низкоуровневое кеширование.
+    Используется низкоуровневое кеширование с версионированным ключом:
+    сигналы Product/Category сбрасывают поколение, поэтому TTL большой.
+    Фильтры по статусу и цене входят в ключ кеша.
     """
-    cache_key = f"category_products_{slug}"
+    filters = parse_filters(request.GET)
+    filters.category = ""  # категория задана адресом страницы
+    filters.params.pop("category", None)
+
+    cache_key = category_products_key(slug, filters.querystring)
     products = cache.get(cache_key)
 
     if products is None:
-        products = list(get_products_by_category(slug))
-        cache.set(cache_key, products, 60 * 10)  # кеш 10 мин
+        products = list(apply_filters(get_products_by_category(slug), filters))
+        cache.set(cache_key, products, CATEGORY_PRODUCTS_TIMEOUT)
 
     context = {
         "title": f"Товары категории: {slug}",
         "products": products,
+        "filters": filters,
+        "facets": get_facets(slug),
+        "current_category": slug,
     }
     return render(request, "catalog/category_products.html", context)
 
 
+def search_view(request: HttpRequest) -> HttpResponse:
+    """Полнотекстовый поиск по опубликованным товарам (результаты по релевантности)."""
+    query = request.GET.get("q", "").strip()[:200]
+    products = search_products(query) if query else []
+    return render(
+        request,
+        "catalog/search.html",
+        {"title": f"Поиск: {query}" if query else "Поиск", "query": query, "products": products},
+    )
+
+
 def contacts_view(request: HttpRequest) -> HttpResponse:
     """Контакты и форма обратной связи."""
     success = False
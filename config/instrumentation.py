@@ -0,0 +1,187 @@
+"""
+Инструментирование SQL по запросам.
+
+Каждый курсор всех подключений оборачивается через connection.execute_wrapper:
+для запроса считаются число SQL, суммарное время в БД, дубли (тот же SQL с теми же
+параметрами) и самый медленный запрос. Одинаковый по форме SQL, повторённый
+SQL_N_PLUS_ONE_THRESHOLD раз и больше, помечается как подозрение на N+1
+(типичный случай — обращение к связанному объекту в цикле шаблона).
+
+Итог уходит в заголовок Server-Timing и в скользящий отчёт в памяти процесса
+(последние SQL_INSTRUMENTATION_REPORT_SIZE запросов), который показывает
+staff-страница /__sql__/. Включается настройкой SQL_INSTRUMENTATION.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Форма запроса без значений: литералы и списки IN (...) заменяются на %s."""
+    sql = _STRING.sub("%s", sql)
+    sql = _NUMBER.sub("%s", sql)
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+@dataclass
+class QueryStats:
+    """Статистика SQL одного HTTP-запроса (или любого участка кода)."""
+
+    count: int = 0
+    duration: float = 0.0  # секунды
+    slowest_sql: str = ""
+    slowest_duration: float = 0.0
+    exact: Counter = field(default_factory=Counter)
+    shapes: Counter = field(default_factory=Counter)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest_duration:
+                self.slowest_duration, self.slowest_sql = elapsed, sql
+            self.exact[(sql, repr(params))] += 1
+            self.shapes[normalize_sql(sql)] += 1
+
+    @property
+    def duplicates(self) -> int:
+        """Сколько запросов повторили уже выполненный (тот же SQL и параметры)."""
+        return sum(n - 1 for n in self.exact.values() if n > 1)
+
+    def n_plus_one(self, threshold: int | None = None) -> dict[str, int]:
+        """Формы SQL, выполненные threshold раз и больше."""
+        threshold = threshold or getattr(settings, "SQL_N_PLUS_ONE_THRESHOLD", 5)
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+@contextmanager
+def capture_queries():
+    """Считает SQL всех подключений внутри блока: with capture_queries() as stats: ..."""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(stats))
+        yield stats
+
+
+# ==============================================================
+# Скользящий отчёт в памяти процесса
+# ==============================================================
+_lock = threading.Lock()
+_report: deque = deque(maxlen=getattr(settings, "SQL_INSTRUMENTATION_REPORT_SIZE", 500))
+
+
+def record(view: str, path: str, stats: QueryStats, total: float) -> None:
+    entry = {
+        "view": view,
+        "path": path,
+        "queries": stats.count,
+        "db_ms": round(stats.duration * 1000, 2),
+        "total_ms": round(total * 1000, 2),
+        "duplicates": stats.duplicates,
+        "slowest_sql": stats.slowest_sql[:500],
+        "slowest_ms": round(stats.slowest_duration * 1000, 2),
+        "n_plus_one": stats.n_plus_one(),
+    }
+    with _lock:
+        _report.append(entry)
+
+
+def get_report() -> dict:
+    """Сводка по view: запросов, среднее/максимум SQL, время в БД, подозрения на N+1."""
+    with _lock:
+        entries = list(_report)
+    views: dict[str, dict] = {}
+    for entry in entries:
+        row = views.setdefault(
+            entry["view"],
+            {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_ms": 0.0,
+                "duplicates": 0,
+                "n_plus_one": {},
+            },
+        )
+        row["requests"] += 1
+        row["queries"] += entry["queries"]
+        row["max_queries"] = max(row["max_queries"], entry["queries"])
+        row["db_ms"] += entry["db_ms"]
+        row["duplicates"] += entry["duplicates"]
+        for shape, n in entry["n_plus_one"].items():
+            row["n_plus_one"][shape] = max(row["n_plus_one"].get(shape, 0), n)
+    for row in views.values():
+        row["avg_queries"] = round(row["queries"] / row["requests"], 1)
+        row["avg_db_ms"] = round(row["db_ms"] / row["requests"], 2)
+        row["db_ms"] = round(row["db_ms"], 2)
+    ranked = sorted(views.items(), key=lambda item: item[1]["db_ms"], reverse=True)
+    return {"requests": len(entries), "views": dict(ranked), "recent": entries[-20:]}
+
+
+def reset_report() -> None:
+    with _lock:
+        _report.clear()
+
+
+# ==============================================================
+# Middleware и страница отчёта
+# ==============================================================
+class QueryInstrumentationMiddleware:
+    """Оборачивает обработку запроса в capture_queries() и публикует итог."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        started = time.perf_counter()
+        with capture_queries() as stats:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else request.path
+        response["Server-Timing"] = (
+            f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries", '
+            f"app;dur={total * 1000:.2f}"
+        )
+        record(view, request.path, stats, total)
+
+        suspects = stats.n_plus_one()
+        if suspects:
+            logger.warning("Подозрение на N+1 во view %s: %s", view, suspects)
+        return response
+
+
+@staff_member_required
+def report_view(request: HttpRequest) -> JsonResponse:
+    """Скользящий отчёт SQL по view (только для staff)."""
+    if request.GET.get("reset"):
+        reset_report()
+    return JsonResponse(get_report(), json_dumps_params={"ensure_ascii": False, "indent": 2})
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     "catalog",
     "users",
     "mailings",  # ✅ приложение рассылок
+    "django_apscheduler",  # хранилище задач планировщика рассылок (run_scheduler)
 ]
 
 # ==========================================================
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
 # ==========================================================
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "config.instrumentation.QueryInstrumentationMiddleware",  # SQL по запросам (SQL_INSTRUMENTATION)
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -114,6 +116,13 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Варианты изображений товаров (Pillow): фоновый пул потоков или синхронно
+IMAGE_VARIANT_WORKERS = env.int("IMAGE_VARIANT_WORKERS", default=2)
+IMAGE_VARIANTS_SYNC = env.bool("IMAGE_VARIANTS_SYNC", default=False)
+
+# Модерация: дополнительный файл запрещённых слов (по слову в строке)
+FORBIDDEN_WORDS_FILE = env("FORBIDDEN_WORDS_FILE", default="")
+
 # ==========================================================
 #  Пользовательская модель
 # ==========================================================
@@ -132,6 +141,30 @@ LOGOUT_REDIRECT_URL = "catalog:home"
 EMAIL_BACKEND = env("EMAIL_BACKEND")
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL")
 
+# Рассылки: писем на одно SMTP-соединение и повторов при обрыве соединения
+MAILING_BATCH_SIZE = env.int("MAILING_BATCH_SIZE", default=100)
+MAILING_SEND_RETRIES = env.int("MAILING_SEND_RETRIES", default=2)
+# Параллельная отправка: потоков с постоянными соединениями; лимит писем/с на SMTP-сервер (0 — без лимита) и всплеск
+MAILING_WORKERS = env.int("MAILING_WORKERS", default=1)
+MAILING_RATE_LIMIT = env.float("MAILING_RATE_LIMIT", default=0)
+MAILING_RATE_BURST = env.int("MAILING_RATE_BURST", default=10)
+# Движок отправки: "threads" — потоки (MAILING_WORKERS), "async" — asyncio/aiosmtplib с MAILING_ASYNC_SESSIONS сессиями
+MAILING_ENGINE = env("MAILING_ENGINE", default="threads")
+MAILING_ASYNC_SESSIONS = env.int("MAILING_ASYNC_SESSIONS", default=50)
+# Получатели читаются из БД порциями по столько строк (память не зависит от размера рассылки)
+MAILING_RECIPIENT_CHUNK = env.int("MAILING_RECIPIENT_CHUNK", default=2000)
+# Список подавления: до стольких адресов — множество в памяти, больше — фильтр Блума с проверкой попаданий в БД
+MAILING_SUPPRESSION_BLOOM_THRESHOLD = env.int("MAILING_SUPPRESSION_BLOOM_THRESHOLD", default=500000)
+# Попытки отправки пишутся пакетами (bulk_create) по столько записей
+MAILING_ATTEMPT_FLUSH_SIZE = env.int("MAILING_ATTEMPT_FLUSH_SIZE", default=500)
+# Попытки старше стольких дней сворачиваются в суточные итоги (compact_attempts)
+MAILING_ATTEMPT_RETENTION_DAYS = env.int("MAILING_ATTEMPT_RETENTION_DAYS", default=90)
+# Задача без признака жизни (heartbeat_at) дольше стольких секунд — обработчик считается упавшим,
+# задача возвращается в очередь. Должно быть больше времени отправки MAILING_ATTEMPT_FLUSH_SIZE писем.
+MAILING_JOB_TIMEOUT = env.int("MAILING_JOB_TIMEOUT", default=900)
+# Период опроса планировщика рассылок (run_scheduler), сек
+MAILING_SCHEDULER_INTERVAL = env.int("MAILING_SCHEDULER_INTERVAL", default=60)
+
 # ==========================================================
 #  Кеширование (Redis или LocMem)
 # ==========================================================
@@ -176,6 +209,13 @@ else:
 
     print("⚠️ Redis отключен — используется локальный кеш")
 
+# ==========================================================
+#  Инструментирование SQL (Server-Timing, отчёт /__sql__/ для staff)
+# ==========================================================
+SQL_INSTRUMENTATION = env.bool("SQL_INSTRUMENTATION", default=DEBUG)
+SQL_INSTRUMENTATION_REPORT_SIZE = env.int("SQL_INSTRUMENTATION_REPORT_SIZE", default=500)
+SQL_N_PLUS_ONE_THRESHOLD = env.int("SQL_N_PLUS_ONE_THRESHOLD", default=5)
+
 # ==========================================================
 #  Служебные настройки
 # ==========================================================
@@ -1,15 +1,19 @@
 # config/urls.py
 """Корневые URL проекта: подключение URL приложения catalog через include."""
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from config.instrumentation import report_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("catalog.urls")),
     path("users/", include(("users.urls", "users"), namespace="users")),
     path("mailings/", include(("mailings.urls", "mailings"), namespace="mailings")),
+    path("__sql__/", report_view, name="sql_report"),  # отчёт инструментирования SQL (staff)
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,202 @@
+"""
+Асинхронный движок отправки (MAILING_ENGINE = "async") на aiosmtplib.
+
+Получатели делятся на пакеты по MAILING_BATCH_SIZE; каждый пакет отправляется
+одной SMTP-сессией (письмо за письмом без переподключения), одновременно открыто
+не больше MAILING_ASYNC_SESSIONS сессий (BoundedSemaphore). В отличие от
+ConcurrentDispatcher не нужен поток на соединение: тысячи ожидающих ответа
+сервера сессий обслуживает один event loop.
+
+Движок говорит с SMTP-сервером напрямую (EMAIL_HOST, EMAIL_PORT, EMAIL_USE_TLS/SSL,
+EMAIL_HOST_USER/PASSWORD, EMAIL_TIMEOUT) — EMAIL_BACKEND не используется. К БД он не
+обращается: send_mailing_now читает получателей и пишет попытки пакетами в своём
+потоке через sync_to_async.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterable, AsyncIterator
+
+import aiosmtplib
+from django.conf import settings
+
+from .dispatch import MessageTemplate, SendResult, TokenBucket, WorkerStats, server_bucket
+
+logger = logging.getLogger(__name__)
+
+# Обрыв или недоступность соединения: переподключиться и повторить письмо
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def smtp_reply(exc: Exception) -> tuple[int, str]:
+    """
+    Код и текст ответа сервера из исключения aiosmtplib; (0, текст ошибки) — сервер не ответил.
+    """
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused) and exc.recipients:
+        exc = exc.recipients[0]
+    if isinstance(exc, aiosmtplib.SMTPResponseException):
+        return exc.code, f"{exc.code} {exc.message}"
+    return 0, str(exc)
+
+
+class AsyncDispatcher:
+    """Отправка пакетами по SMTP-сессии, не больше sessions сессий одновременно."""
+
+    is_async = True
+
+    def __init__(
+        self,
+        sessions: int | None = None,
+        rate: float | None = None,
+        burst: int | None = None,
+        bucket: TokenBucket | None = None,
+        batch_size: int | None = None,
+        retries: int | None = None,
+    ) -> None:
+        self.sessions = sessions or getattr(settings, "MAILING_ASYNC_SESSIONS", 50)
+        self.batch_size = batch_size or getattr(settings, "MAILING_BATCH_SIZE", 100)
+        self.retries = getattr(settings, "MAILING_SEND_RETRIES", 2) if retries is None else retries
+        self.bucket = bucket or server_bucket(rate, burst)
+        self.connections_opened = 0
+        self.stats: list[WorkerStats] = []
+
+    def _client(self) -> aiosmtplib.SMTP:
+        return aiosmtplib.SMTP(
+            hostname=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER or None,
+            password=settings.EMAIL_HOST_PASSWORD or None,
+            use_tls=bool(settings.EMAIL_USE_SSL),
+            start_tls=bool(settings.EMAIL_USE_TLS),
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+
+    @staticmethod
+    async def _close(smtp: aiosmtplib.SMTP | None) -> None:
+        if smtp is None or not smtp.is_connected:
+            return
+        try:
+            await smtp.quit()
+        except Exception:  # соединение уже разорвано
+            smtp.close()
+
+    async def _throttle(self, stats: WorkerStats) -> None:
+        while delay := self.bucket.try_acquire():
+            stats.throttled += delay
+            await asyncio.sleep(delay)
+
+    async def _deliver(
+        self, smtp: aiosmtplib.SMTP | None, template: MessageTemplate, recipient, stats: WorkerStats
+    ) -> tuple[SendResult, aiosmtplib.SMTP | None]:
+        email = getattr(recipient, "email", recipient)
+        message = template.for_recipient(recipient).message().as_bytes(linesep="\r\n")
+        for attempt in range(self.retries + 1):
+            try:
+                if smtp is None:
+                    smtp = self._client()
+                    await smtp.connect()
+                    stats.connections += 1
+                errors, _ = await smtp.sendmail(template.from_email, [email], message)
+                if errors:
+                    reply = errors[email]
+                    return (
+                        SendResult(recipient, False, f"{reply.code} {reply.message}", reply.code),
+                        smtp,
+                    )
+                return SendResult(recipient, True, "OK"), smtp
+            except CONNECTION_ERRORS as e:
+                logger.warning("SMTP-соединение потеряно (%s), переподключение", e)
+                if smtp is not None:
+                    smtp.close()
+                smtp = None
+                if attempt == self.retries:
+                    return SendResult(recipient, False, str(e)), smtp
+            except Exception as e:
+                code, response = smtp_reply(e)
+                return SendResult(recipient, False, response, code), smtp
+
+    async def _session(
+        self,
+        template: MessageTemplate,
+        batch: list,
+        results: asyncio.Queue,
+        semaphore: asyncio.BoundedSemaphore,
+        stats: WorkerStats,
+    ) -> None:
+        async with semaphore:
+            smtp = None
+            try:
+                for recipient in batch:
+                    await self._throttle(stats)
+                    result, smtp = await self._deliver(smtp, template, recipient, stats)
+                    stats.count(result)
+                    results.put_nowait(result)
+            finally:
+                await self._close(smtp)
+
+    async def asend(
+        self, template: MessageTemplate, recipients: AsyncIterable
+    ) -> AsyncIterator[SendResult]:
+        """
+        Результаты отправки по мере готовности (не в порядке получателей).
+        В памяти не больше 2 × sessions пакетов: чтение получателей ждёт,
+        пока сессии не освободятся.
+        """
+        semaphore = asyncio.BoundedSemaphore(self.sessions)
+        results: asyncio.Queue[SendResult] = asyncio.Queue()
+        stats = WorkerStats("async")
+        self.stats = [stats]
+        tasks: set[asyncio.Task] = set()
+        started = time.monotonic()
+
+        def start(batch: list) -> None:
+            tasks.add(
+                asyncio.create_task(self._session(template, batch, results, semaphore, stats))
+            )
+
+        async def wait(timeout: float | None = None) -> None:
+            done, _ = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            tasks.difference_update(done)
+            for task in done:
+                task.result()  # ошибка вне отправки письма — прерываем рассылку
+
+        def ready() -> list[SendResult]:
+            return [results.get_nowait() for _ in range(results.qsize())]
+
+        try:
+            batch = []
+            async for recipient in recipients:
+                batch.append(recipient)
+                if len(batch) < self.batch_size:
+                    continue
+                start(batch)
+                batch = []
+                while len(tasks) >= self.sessions * 2:
+                    await wait()
+                for result in ready():
+                    yield result
+            if batch:
+                start(batch)
+            while tasks:
+                await wait(timeout=0.05)
+                for result in ready():
+                    yield result
+            for result in ready():
+                yield result
+        finally:
+            for task in tasks:  # вызывающий прервал отправку
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            stats.elapsed = time.monotonic() - started
+            self.connections_opened = stats.connections
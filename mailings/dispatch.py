@@ -0,0 +1,479 @@
+"""
+Пакетная отправка писем рассылки.
+
+MIME-сообщение собирается один раз на рассылку (MessageTemplate), для каждого
+получателя заменяются только заголовки To, Date и Message-ID; персонализированные
+тема и тело (mailings.templating) подставляются в копию готового MIME. Одно SMTP-соединение
+обслуживает пакет из MAILING_BATCH_SIZE писем; при обрыве соединение
+переоткрывается и письмо отправляется повторно (до MAILING_SEND_RETRIES раз).
+
+ConcurrentDispatcher отправляет в MAILING_WORKERS потоков с постоянными
+соединениями; общая скорость ограничена ведром токенов (MAILING_RATE_LIMIT
+писем/с, всплеск MAILING_RATE_BURST) на SMTP-сервер. Асинхронный движок
+(MAILING_ENGINE = "async") — в mailings.async_dispatch.
+"""
+
+from __future__ import annotations
+
+import base64
+import copy
+import logging
+import queue
+import smtplib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.message import RFC5322_EMAIL_LINE_LENGTH_LIMIT, make_msgid
+from django.core.mail.utils import DNS_NAME
+
+from .templating import compile_template, recipient_values
+
+logger = logging.getLogger(__name__)
+
+# Ошибки соединения: после них имеет смысл переподключиться и повторить письмо.
+# Отказ сервера по конкретному адресу (SMTPRecipientsRefused и т.п.) — ошибка получателя.
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class PreparedEmail(EmailMessage):
+    """Письмо на основе готового MIME: message() не собирает сообщение заново."""
+
+    def __init__(self, prototype, to: str, **kwargs) -> None:
+        super().__init__(to=[to], **kwargs)
+        self._prototype = prototype
+
+    def message(self):
+        msg = copy.copy(self._prototype)
+        msg._headers = list(self._prototype._headers)  # copy.copy разделяет список заголовков
+        del msg["To"], msg["Date"], msg["Message-ID"]
+        msg["To"] = self.to[0]
+        msg["Date"] = formatdate(localtime=settings.EMAIL_USE_LOCALTIME)
+        msg["Message-ID"] = make_msgid(domain=DNS_NAME)
+        return msg
+
+
+def _encode_header(value: str) -> str:
+    """
+    Тема письма для заголовка: переводы строк убираются (подставленное ФИО не должно
+    добавить заголовок), не-ASCII — encoded-words base64 по 45 байт (RFC 2047).
+    """
+    value = " ".join(value.splitlines())
+    if value.isascii():
+        return value
+    data, words, start = value.encode(), [], 0
+    while start < len(data):
+        end = min(start + 45, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:  # не резать символ UTF-8 посередине
+            end -= 1
+        words.append(f"=?utf-8?b?{base64.b64encode(data[start:end]).decode()}?=")
+        start = end
+    return " ".join(words)
+
+
+def _encode_body(body: str) -> tuple[str, str]:
+    """
+    Тело в виде полезной нагрузки MIME и Content-Transfer-Encoding.
+    Строки длиннее лимита RFC 5322 — base64 (кодируется в C, в отличие от quoted-printable).
+    """
+    if body.isascii() and not any(
+        len(line) > RFC5322_EMAIL_LINE_LENGTH_LIMIT for line in body.splitlines()
+    ):
+        return body, "7bit"
+    data = body.encode()
+    if any(len(line) > RFC5322_EMAIL_LINE_LENGTH_LIMIT for line in data.splitlines()):
+        encoded = base64.b64encode(data).decode("ascii")
+        return "".join(f"{encoded[i : i + 76]}\n" for i in range(0, len(encoded), 76)), "base64"
+    # как email.message.set_payload: байты UTF-8 хранятся в str через surrogateescape
+    return data.decode("ascii", "surrogateescape"), "8bit"
+
+
+class MessageTemplate:
+    """
+    Тема и тело рассылки, собранные в MIME один раз.
+    С плейсхолдерами ({{ full_name }}, {{ email }}) тема и тело рендерятся на получателя;
+    получатели с одинаковым результатом рендера делят один готовый MIME
+    (последние prototype_cache_size вариантов хранятся в LRU).
+    """
+
+    def __init__(
+        self,
+        subject: str,
+        body: str,
+        from_email: str | None = None,
+        prototype_cache_size: int = 1024,
+    ) -> None:
+        self.from_email = from_email or settings.DEFAULT_FROM_EMAIL
+        self.prototype = EmailMessage(
+            subject, body, self.from_email, ["placeholder@localhost"]
+        ).message()
+        self.subject, self.body = compile_template(subject), compile_template(body)
+        self.fields = tuple(dict.fromkeys(self.subject.fields + self.body.fields))
+        self.prototype_cache_size = prototype_cache_size
+        self._prototypes: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()  # шаблон общий для потоков ConcurrentDispatcher
+
+    def _build(self, subject: str, body: str):
+        """MIME с другой темой и телом на основе прототипа (без повторной сборки EmailMessage)."""
+        msg = copy.copy(self.prototype)
+        msg._headers = list(self.prototype._headers)
+        msg.replace_header("Subject", _encode_header(subject))
+        msg._payload, cte = _encode_body(body)
+        msg.replace_header("Content-Transfer-Encoding", cte)
+        return msg
+
+    def prototype_for(self, recipient):
+        if not self.fields:
+            return self.prototype
+        values = recipient_values(recipient)
+        key = tuple(values[name] for name in self.fields)
+        with self._lock:
+            msg = self._prototypes.get(key)
+            if msg is not None:
+                self._prototypes.move_to_end(key)
+                return msg
+        msg = self._build(self.subject.render(values), self.body.render(values))
+        with self._lock:
+            self._prototypes[key] = msg
+            if len(self._prototypes) > self.prototype_cache_size:
+                self._prototypes.popitem(last=False)
+        return msg
+
+    def for_recipient(self, recipient, connection=None) -> PreparedEmail:
+        """recipient — объект с email (и full_name) или строка-адрес."""
+        email = getattr(recipient, "email", recipient)
+        return PreparedEmail(
+            self.prototype_for(recipient), email, from_email=self.from_email, connection=connection
+        )
+
+
+@dataclass
+class SendResult:
+    """Итог отправки одному получателю."""
+
+    recipient: object
+    ok: bool
+    response: str
+    code: int = 0  # код ответа SMTP-сервера при отказе; 0 — ответа не было (обрыв, таймаут)
+
+
+def smtp_reply(exc: Exception) -> tuple[int, str]:
+    """Код и текст ответа SMTP-сервера из исключения; (0, текст ошибки) — сервер не ответил."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused) and exc.recipients:
+        code, message = next(iter(exc.recipients.values()))
+    elif isinstance(exc, smtplib.SMTPResponseException) and not isinstance(exc, CONNECTION_ERRORS):
+        code, message = exc.smtp_code, exc.smtp_error
+    else:
+        return 0, str(exc)
+    if isinstance(message, bytes):
+        message = message.decode(errors="replace")
+    return code, f"{code} {message}"
+
+
+class Sender:
+    """
+    Одно SMTP-соединение: открывается при первом письме, после обрыва
+    переоткрывается, и письмо повторяется (до retries раз).
+    """
+
+    def __init__(self, backend: str | None = None, retries: int = 2) -> None:
+        self.backend = backend
+        self.retries = retries
+        self.connection = None
+        self.connections_opened = 0
+
+    def deliver(self, template: MessageTemplate, recipient) -> SendResult:
+        for attempt in range(self.retries + 1):
+            try:
+                if self.connection is None:
+                    self.connection = get_connection(self.backend, fail_silently=False)
+                    self.connection.open()
+                    self.connections_opened += 1
+                sent = self.connection.send_messages(
+                    [template.for_recipient(recipient, self.connection)]
+                )
+                return SendResult(
+                    recipient, bool(sent), "OK" if sent else "send_messages() вернул 0"
+                )
+            except CONNECTION_ERRORS as e:
+                logger.warning("SMTP-соединение потеряно (%s), переподключение", e)
+                self.close()
+                if attempt == self.retries:
+                    return SendResult(recipient, False, str(e))
+            except Exception as e:
+                code, response = smtp_reply(e)
+                return SendResult(recipient, False, response, code)
+
+    def close(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            self.connection.close()
+        except Exception:  # соединение уже разорвано
+            pass
+        self.connection = None
+
+
+class Dispatcher:
+    """
+    Отправляет письма пакетами по одному SMTP-соединению на пакет.
+    recipients — объекты с атрибутом email (Client) или строки.
+    """
+
+    def __init__(
+        self, batch_size: int | None = None, retries: int | None = None, backend: str | None = None
+    ) -> None:
+        self.batch_size = batch_size or getattr(settings, "MAILING_BATCH_SIZE", 100)
+        self.retries = getattr(settings, "MAILING_SEND_RETRIES", 2) if retries is None else retries
+        self.backend = backend
+        self.connections_opened = 0
+        self.stats: list[WorkerStats] = []
+        # письма, отправленные до прерывания send(), но не отданные вызывающему
+        self.unreported: list[SendResult] = []
+
+    def send(self, template: MessageTemplate, recipients: Iterable) -> Iterator[SendResult]:
+        sender = Sender(self.backend, self.retries)
+        stats = WorkerStats("main")
+        self.stats = [stats]
+        started = time.monotonic()
+        try:
+            for recipient in recipients:
+                if stats.sent + stats.failed and not (stats.sent + stats.failed) % self.batch_size:
+                    sender.close()  # новый пакет — новое соединение
+                result = sender.deliver(template, recipient)
+                stats.count(result)
+                yield result
+        finally:
+            sender.close()
+            stats.connections = self.connections_opened = sender.connections_opened
+            stats.elapsed = time.monotonic() - started
+
+
+# ==============================================================
+# Параллельная отправка с ограничением скорости
+# ==============================================================
+class TokenBucket:
+    """
+    Ограничитель скорости «ведро токенов»: rate писем в секунду, всплеск до burst.
+    Потокобезопасен; rate <= 0 — без ограничения.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Забирает токен без ожидания: 0.0 — токен взят, иначе сколько секунд подождать до следующего.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Забирает один токен, при необходимости ждёт. Возвращает время ожидания, сек."""
+        waited = 0.0
+        while delay := self.try_acquire():
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+
+_buckets: dict[tuple, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def server_bucket(rate: float | None = None, burst: int | None = None) -> TokenBucket:
+    """
+    Общее ведро на SMTP-сервер (EMAIL_HOST:EMAIL_PORT) в пределах процесса:
+    одновременные рассылки делят один лимит ретранслятора.
+    """
+    rate = getattr(settings, "MAILING_RATE_LIMIT", 0) if rate is None else rate
+    burst = getattr(settings, "MAILING_RATE_BURST", 10) if burst is None else burst
+    key = (settings.EMAIL_HOST, settings.EMAIL_PORT, rate, burst)
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(rate, burst)
+        return _buckets[key]
+
+
+@dataclass
+class WorkerStats:
+    """Статистика одного потока отправки."""
+
+    name: str
+    sent: int = 0
+    failed: int = 0
+    connections: int = 0
+    throttled: float = 0.0  # сек ожидания в ограничителе
+    elapsed: float = 0.0
+
+    def count(self, result: SendResult) -> None:
+        if result.ok:
+            self.sent += 1
+        else:
+            self.failed += 1
+
+    def __str__(self) -> str:
+        rate = (self.sent + self.failed) / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.name}: отправлено {self.sent}, ошибок {self.failed}, "
+            f"соединений {self.connections}, "
+            f"ожидание лимита {self.throttled:.2f} с, {rate:.1f} писем/с"
+        )
+
+
+class ConcurrentDispatcher(Dispatcher):
+    """
+    Отправка в workers потоков, у каждого своё постоянное SMTP-соединение
+    (переоткрывается каждые batch_size писем). Общая скорость ограничена TokenBucket.
+    Получатели читаются и результаты отдаются в вызывающем потоке —
+    потоки отправки к БД не обращаются. Если отправка прервана, уже отправленные, но
+    не отданные письма остаются в unreported; непредвиденная ошибка в потоке отправки
+    становится неуспешным результатом для получателя, поток продолжает работу.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        rate: float | None = None,
+        burst: int | None = None,
+        bucket: TokenBucket | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.workers = workers or getattr(settings, "MAILING_WORKERS", 1)
+        self.bucket = bucket or server_bucket(rate, burst)
+
+    def _work(
+        self,
+        template: MessageTemplate,
+        tasks: queue.Queue,
+        results: queue.Queue,
+        stats: WorkerStats,
+        done: threading.Event,
+    ) -> None:
+        sender = Sender(self.backend, self.retries)
+        started = time.monotonic()
+        try:
+            while True:
+                try:
+                    recipient = tasks.get(timeout=0.05)
+                except queue.Empty:
+                    if done.is_set():  # получатели кончились и очередь пуста
+                        break
+                    continue
+                if stats.sent + stats.failed and not (stats.sent + stats.failed) % self.batch_size:
+                    sender.close()
+                try:
+                    stats.throttled += self.bucket.acquire()
+                    result = sender.deliver(template, recipient)
+                except Exception as e:
+                    logger.exception("Поток %s: ошибка отправки", stats.name)
+                    sender.close()
+                    result = SendResult(recipient, False, f"{type(e).__name__}: {e}")
+                stats.count(result)
+                results.put(result)
+        finally:
+            sender.close()
+            stats.connections = sender.connections_opened
+            stats.elapsed = time.monotonic() - started
+
+    def send(self, template: MessageTemplate, recipients: Iterable) -> Iterator[SendResult]:
+        tasks: queue.Queue = queue.Queue(maxsize=self.workers * 4)
+        results: queue.Queue = queue.Queue()
+        done = threading.Event()
+        self.stats = [WorkerStats(f"worker-{i + 1}") for i in range(self.workers)]
+        self.unreported = []
+        finished = False
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(template, tasks, results, stats, done),
+                name=stats.name,
+                daemon=True,
+            )
+            for stats in self.stats
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for recipient in recipients:
+                while True:
+                    try:
+                        tasks.put(recipient, timeout=0.05)
+                        break
+                    except queue.Full:  # потоки заняты — отдаём готовые результаты
+                        if not any(thread.is_alive() for thread in threads):
+                            raise RuntimeError("Все потоки отправки завершились с ошибкой")
+                        yield from self._ready(results)
+                yield from self._ready(results)
+            self._stop(done, threads)
+            yield from self._ready(results)
+            finished = True
+        finally:
+            if not finished:  # отправка прервана: неотправленные задачи отбрасываем
+                while True:
+                    try:
+                        tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                self._stop(done, threads)
+                # отправленное потоками после последней выдачи — вызывающий запишет из unreported
+                self.unreported = list(self._ready(results))
+            self.connections_opened = sum(stats.connections for stats in self.stats)
+
+    @staticmethod
+    def _ready(results: queue.Queue) -> Iterator[SendResult]:
+        while True:
+            try:
+                yield results.get_nowait()
+            except queue.Empty:
+                return
+
+    @staticmethod
+    def _stop(done: threading.Event, threads: list[threading.Thread]) -> None:
+        done.set()
+        for thread in threads:
+            thread.join()
+
+
+def make_dispatcher(
+    workers: int | None = None, rate: float | None = None, engine: str | None = None, **kwargs
+):
+    """
+    Движок отправки по MAILING_ENGINE (или engine): "async" — AsyncDispatcher
+    (workers — число SMTP-сессий), иначе Dispatcher для одного потока или ConcurrentDispatcher.
+    Лимит скорости применяется, только если он задан (rate или MAILING_RATE_LIMIT).
+    """
+    engine = engine or getattr(settings, "MAILING_ENGINE", "threads")
+    rate = getattr(settings, "MAILING_RATE_LIMIT", 0) if rate is None else rate
+    if engine == "async":
+        from .async_dispatch import AsyncDispatcher
+
+        return AsyncDispatcher(sessions=workers, rate=rate, **kwargs)
+    workers = workers or getattr(settings, "MAILING_WORKERS", 1)
+    if workers > 1 or rate > 0:
+        return ConcurrentDispatcher(workers=workers, rate=rate, **kwargs)
+    return Dispatcher(**kwargs)
@@ -11,10 +11,30 @@ class ClientForm(forms.ModelForm):
         fields = ("email", "full_name", "comment")
 
 
+class ClientImportForm(forms.Form):
+    file = forms.FileField(
+        label="CSV-файл", help_text="Колонки: email, full_name, comment (заголовок необязателен)"
+    )
+    mailing = forms.ModelChoiceField(
+        Mailing.objects.none(),
+        required=False,
+        label="Добавить в рассылку",
+        empty_label="— не добавлять —",
+    )
+
+    def __init__(self, *args, mailings=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if mailings is not None:
+            self.fields["mailing"].queryset = mailings
+
+
 class MessageForm(forms.ModelForm):
     class Meta:
         model = Message
         fields = ("subject", "body")
+        help_texts = {
+            "body": "Подстановки: {{ full_name }} — ФИО получателя, {{ email }} — его адрес"
+        }
 
 
 class MailingForm(forms.ModelForm):
@@ -0,0 +1,204 @@
+"""
+Массовый импорт получателей из CSV.
+
+Файл читается потоково, адреса нормализуются (strip + нижний регистр) и проверяются
+validate_email; повторы внутри файла отсекаются множеством уже встреченных адресов.
+Запись — пакетами: один SELECT по lower(email) на пакет отделяет существующих клиентов
+(в том числе сохранённых в другом регистре, вроде Ivan@Test.ru), новые вставляются
+bulk_create(ignore_conflicts=True) (гонка с параллельным импортом не роняет пакет),
+существующие при update=True обновляются bulk_create(update_conflicts) по их сохранённому
+адресу. Если задана рассылка, клиенты владельца пакета привязываются к ней одной вставкой
+в таблицу связи. Счётчики новых и привязанных берутся из БД после вставки: строки,
+пропущенные из-за конфликта, не считаются.
+"""
+
+from __future__ import annotations
+
+import csv
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, TextIO
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import Client, Mailing
+
+FULL_NAME_MAX_LENGTH = Client._meta.get_field("full_name").max_length
+EMAIL_MAX_LENGTH = Client._meta.get_field("email").max_length
+COLUMNS = ("email", "full_name", "comment")
+
+
+def normalize_email(value) -> str | None:
+    """Адрес в каноническом виде или None, если это не email."""
+    email = str(value or "").strip().lower()
+    if not email or len(email) > EMAIL_MAX_LENGTH:
+        return None
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return email
+
+
+def read_clients(fh: TextIO) -> Iterator[dict]:
+    """
+    Строки CSV как словари email/full_name/comment.
+    Заголовок необязателен: если в первой строке нет колонки email, колонки берутся по порядку.
+    """
+    reader = csv.reader(fh)
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [column.strip().lower() for column in first]
+    if "email" in header:
+        columns = header
+    else:
+        columns = COLUMNS
+        yield dict(zip(columns, first))
+    for row in reader:
+        yield dict(zip(columns, row))
+
+
+@dataclass
+class ImportResult:
+    """Итог импорта."""
+
+    seen: int = 0
+    created: int = 0
+    updated: int = 0
+    existing: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    attached: int = 0
+    started: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed or time.monotonic() - self.started
+        return self.seen / max(elapsed, 1e-6)
+
+    @property
+    def written(self) -> int:
+        """Сколько изменений уже в БД (записанные пакеты)."""
+        return self.created + self.updated + self.attached
+
+    def summary(self) -> str:
+        """Записанное в БД: новые, обновлённые, привязанные к рассылке."""
+        line = f"новых: {self.created}, обновлено: {self.updated}"
+        if self.attached:
+            line += f", привязано к рассылке: {self.attached}"
+        return line
+
+    def __str__(self) -> str:
+        line = (
+            f"строк: {self.seen}, новых: {self.created}, обновлено: {self.updated}, "
+            f"уже были: {self.existing}, "
+            f"повторов в файле: {self.duplicates}, отклонено: {self.rejected}"
+        )
+        if self.attached:
+            line += f", привязано к рассылке: {self.attached}"
+        return f"{line}, {self.rate:,.0f} строк/с"
+
+
+class ClientImporter:
+    """
+    Импорт получателей владельца owner пакетами по batch_size.
+    mailing — привязать импортированных (и уже существующих своих) клиентов к рассылке;
+    update — перезаписать ФИО и комментарий у существующих клиентов (только для доверенного импорта:
+    email уникален глобально, клиент может принадлежать другому пользователю).
+    """
+
+    def __init__(
+        self, owner, mailing: Mailing | None = None, batch_size: int = 2000, update: bool = False
+    ) -> None:
+        self.owner = owner
+        self.mailing = mailing
+        self.batch_size = batch_size
+        self.update = update
+        self.result = ImportResult()
+        self._seen_emails: set[str] = set()
+        self._batch: dict[str, Client] = {}
+
+    def run(
+        self,
+        rows: Iterable[dict],
+        progress: Callable[[ImportResult], None] | None = None,
+        progress_every: int = 0,
+    ) -> ImportResult:
+        next_report = progress_every
+        for row in rows:
+            self.add(row)
+            if progress and progress_every and self.result.seen >= next_report:
+                progress(self.result)
+                next_report += progress_every
+        self.flush()
+        self.result.elapsed = time.monotonic() - self.result.started
+        return self.result
+
+    def add(self, row: dict) -> None:
+        self.result.seen += 1
+        email = normalize_email(row.get("email"))
+        if email is None:
+            self.result.rejected += 1
+            return
+        if email in self._seen_emails:
+            self.result.duplicates += 1
+            return
+        self._seen_emails.add(email)
+        self._batch[email] = Client(
+            email=email,
+            full_name=str(row.get("full_name") or "").strip()[:FULL_NAME_MAX_LENGTH],
+            comment=str(row.get("comment") or "").strip(),
+            owner=self.owner,
+        )
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._batch:
+            return
+        emails = list(self._batch)
+        with transaction.atomic():
+            # нормализованный адрес → адрес, как он сохранён у существующего клиента
+            existing = dict(
+                Client.objects.annotate(email_lower=Lower("email"))
+                .filter(email_lower__in=emails)
+                .values_list("email_lower", "email")
+            )
+            new = [client for email, client in self._batch.items() if email not in existing]
+            if new:
+                Client.objects.bulk_create(new, ignore_conflicts=True)
+                self.result.created += Client.objects.filter(
+                    email__in=[client.email for client in new], owner=self.owner
+                ).count()
+            if self.update and existing:
+                for email, stored in existing.items():
+                    self._batch[email].email = stored
+                Client.objects.bulk_create(
+                    [self._batch[email] for email in existing],
+                    update_conflicts=True,
+                    unique_fields=["email"],
+                    update_fields=["full_name", "comment"],
+                )
+                self.result.updated += len(existing)
+            else:
+                self.result.existing += len(existing)
+            if self.mailing is not None:
+                self._attach([existing.get(email, email) for email in emails])
+        self._batch = {}
+
+    def _attach(self, emails: list[str]) -> None:
+        """Привязывает клиентов пакета (только своих) к рассылке одной вставкой в таблицу связи."""
+        through = Mailing.clients.through
+        client_ids = list(
+            Client.objects.filter(email__in=emails, owner=self.owner).values_list("pk", flat=True)
+        )
+        linked = through.objects.filter(mailing_id=self.mailing.pk, client_id__in=client_ids)
+        already = linked.count()
+        links = [through(mailing_id=self.mailing.pk, client_id=pk) for pk in client_ids]
+        through.objects.bulk_create(links, ignore_conflicts=True)
+        self.result.attached += linked.count() - already
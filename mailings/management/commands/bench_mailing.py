@@ -0,0 +1,246 @@
+import gc
+import os
+import sys
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from mailings.async_dispatch import AsyncDispatcher
+from mailings.dispatch import ConcurrentDispatcher, Dispatcher
+from mailings.models import (
+    Attempt,
+    AttemptDailyRollup,
+    Client,
+    Delivery,
+    Mailing,
+    Message,
+    Suppression,
+)
+from mailings.services import send_mailing_now
+from mailings.smtp_sink import SmtpSink
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_OWNER = "bench@localhost"
+BENCH_DOMAIN = "@bench.invalid"
+
+# Режимы отправки: имя -> фабрика движка по опциям команды
+MODES = {
+    "sync": lambda options: Dispatcher(),
+    "threads": lambda options: ConcurrentDispatcher(workers=options["workers"], rate=0),
+    "async": lambda options: AsyncDispatcher(sessions=options["sessions"], rate=0),
+}
+
+
+def peak_rss_mb() -> float | None:
+    """Пиковый RSS процесса за всё время жизни (ru_maxrss), МБ; None — платформа не сообщает."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS — байты, Linux — КБ
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float | None:
+    """Текущий RSS процесса, МБ (Linux, /proc/self/statm); None — недоступно."""
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+class RssSampler:
+    """
+    Прирост RSS за блок with: фоновый поток опрашивает текущий RSS и запоминает пик.
+    ru_maxrss для этого не годится — он монотонен за всю жизнь процесса, и режим,
+    запущенный после более прожорливого, показал бы чужой пик.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.baseline = self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb() or 0)
+
+    def __enter__(self) -> "RssSampler":
+        self.baseline = self.peak = current_rss_mb()
+        if self.baseline is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.baseline is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, current_rss_mb() or 0)
+
+    @property
+    def growth_mb(self) -> float | None:
+        return None if self.baseline is None else self.peak - self.baseline
+
+
+class QueryCounter:
+    """Обёртка connection.execute_wrapper: только счётчик, без хранения SQL."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный замер пути отправки: N синтетических получателей, локальный SMTP-поглотитель,
+    send_mailing_now в каждом режиме. Печатает писем/с, SQL-запросов на письмо, прирост RSS
+    за режим и пиковый RSS процесса за всё время (он общий для всех режимов запуска).
+    """
+
+    help = "Замер пропускной способности рассылки против локального SMTP-поглотителя"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=10000, help="Число получателей")
+        parser.add_argument(
+            "--modes", nargs="+", choices=sorted(MODES), default=["sync", "threads", "async"]
+        )
+        parser.add_argument("--workers", type=int, default=8, help="Потоков в режиме threads")
+        parser.add_argument("--sessions", type=int, default=50, help="SMTP-сессий в режиме async")
+        parser.add_argument(
+            "--latency", type=float, default=0.0, help="Задержка SMTP-сервера на письмо, мс"
+        )
+        parser.add_argument(
+            "--failure-rate", type=float, default=0.0, help="Доля отказов 550 (0..1)"
+        )
+        parser.add_argument(
+            "--smtp-host", default="", help="Внешний SMTP (например, запущенный smtp_sink)"
+        )
+        parser.add_argument("--smtp-port", type=int, default=1025)
+        parser.add_argument("--min-rate", type=float, default=0, help="Ошибка, если писем/с меньше")
+        parser.add_argument(
+            "--max-queries-per-message",
+            type=float,
+            default=0,
+            help="Ошибка, если SQL-запросов на письмо больше",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Не удалять тестовые данные после замера"
+        )
+
+    def handle(self, *args, **options):
+        mailing = self._seed(options["recipients"])
+        sink = None
+        if options["smtp_host"]:
+            host, port = options["smtp_host"], options["smtp_port"]
+        else:
+            sink = SmtpSink(
+                latency=options["latency"] / 1000, failure_rate=options["failure_rate"]
+            ).start()
+            host, port = sink.host, sink.port
+
+        smtp = {
+            "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+            "EMAIL_HOST": host,
+            "EMAIL_PORT": port,
+            "EMAIL_USE_TLS": False,
+            "EMAIL_USE_SSL": False,
+            "EMAIL_HOST_USER": "",
+            "EMAIL_HOST_PASSWORD": "",
+        }
+        self.stdout.write(f"Получателей: {options['recipients']}, SMTP {host}:{port}")
+        failures = []
+        try:
+            with override_settings(**smtp):
+                for mode in options["modes"]:
+                    failures += self._run(mode, mailing, options)
+        finally:
+            if sink is not None:
+                sink.stop()
+                self.stdout.write(f"SMTP-поглотитель: {sink.stats}")
+            if not options["keep"]:
+                # сначала рассылки: Mailing.message — PROTECT
+                Mailing.objects.filter(owner__email=BENCH_OWNER).delete()
+                Suppression.objects.filter(email__endswith=BENCH_DOMAIN).delete()
+                get_user_model().objects.filter(email=BENCH_OWNER).delete()
+        if failures:
+            raise CommandError("; ".join(failures))
+
+    def _seed(self, size: int) -> Mailing:
+        """Рассылка bench@localhost на size получателей (повторный запуск дополняет набор)."""
+        User = get_user_model()
+        owner = User.objects.filter(email=BENCH_OWNER).first()
+        owner = owner or User.objects.create_user(email=BENCH_OWNER)
+        Client.objects.bulk_create(
+            [
+                Client(email=f"bench{i}{BENCH_DOMAIN}", full_name=f"Получатель {i}", owner=owner)
+                for i in range(size)
+            ],
+            batch_size=2000,
+            ignore_conflicts=True,
+        )
+        message, _ = Message.objects.get_or_create(
+            owner=owner,
+            subject="Замер {{ full_name }}",
+            defaults={"body": "Здравствуйте, {{ full_name }}!"},
+        )
+        now = timezone.now()
+        mailing = Mailing.objects.create(message=message, owner=owner, start_at=now, finish_at=now)
+        through = Mailing.clients.through
+        client_ids = (
+            Client.objects.filter(owner=owner).order_by("pk").values_list("pk", flat=True)[:size]
+        )
+        through.objects.bulk_create(
+            [through(mailing_id=mailing.pk, client_id=pk) for pk in client_ids.iterator()],
+            batch_size=2000,
+        )
+        return mailing
+
+    def _run(self, mode: str, mailing: Mailing, options) -> list[str]:
+        # каждый режим начинает с чистого журнала: отправляются все получатели. Отказы 550
+        # поглотителя попадают в список подавления как жёсткие — без очистки следующий режим
+        # пропустил бы этих получателей и замеры стали бы несравнимы
+        Delivery.objects.filter(mailing=mailing).delete()
+        Attempt.objects.filter(mailing=mailing).delete()
+        AttemptDailyRollup.objects.filter(mailing=mailing).delete()
+        Suppression.objects.filter(email__endswith=BENCH_DOMAIN).delete()
+        gc.collect()
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with RssSampler() as rss, connection.execute_wrapper(counter):
+            ok, fail = send_mailing_now(mailing.pk, MODES[mode](options))
+        elapsed = time.perf_counter() - started
+
+        sent = ok + fail
+        rate = sent / max(elapsed, 1e-6)
+        per_message = counter.count / max(sent, 1)
+        growth, lifetime = rss.growth_mb, peak_rss_mb()
+        growth_text = f"{growth:+,.1f} МБ" if growth is not None else "н/д"
+        lifetime_text = f"{lifetime:,.0f} МБ" if lifetime is not None else "н/д"
+        self.stdout.write(
+            f"{mode:>8}: {sent} писем ({fail} ошибок) за {elapsed:.2f} с — {rate:,.0f} писем/с, "
+            f"SQL: {counter.count} ({per_message:.3f} на письмо), прирост RSS: {growth_text}, "
+            f"пик RSS процесса за всё время: {lifetime_text}"
+        )
+        failures = []
+        if options["min_rate"] and rate < options["min_rate"]:
+            failures.append(f"{mode}: {rate:,.0f} писем/с < {options['min_rate']:,.0f}")
+        if options["max_queries_per_message"] and per_message > options["max_queries_per_message"]:
+            failures.append(
+                f"{mode}: {per_message:.3f} SQL на письмо > {options['max_queries_per_message']}"
+            )
+        return failures
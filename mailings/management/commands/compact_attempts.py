@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from mailings.rollups import compact_attempts, retention_cutoff
+
+
+class Command(BaseCommand):
+    """Сворачивает старые попытки рассылок в суточные итоги и удаляет исходные строки."""
+
+    help = "Сжимает журнал попыток: строки старше N дней → AttemptDailyRollup (пакетами)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Хранить построчно за столько дней (MAILING_ATTEMPT_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Строк в одной транзакции удаления"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options["days"])
+        compacted = compact_attempts(options["days"], batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Попыток до {cutoff:%Y-%m-%d} свёрнуто в суточные итоги и удалено: {compacted}"
+            )
+        )
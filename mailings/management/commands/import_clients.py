@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from mailings.importers import ClientImporter, read_clients
+from mailings.models import Mailing
+
+
+class Command(BaseCommand):
+    """
+    Потоковый импорт получателей из CSV.
+    Колонки: email, full_name, comment (заголовок необязателен — тогда по порядку).
+    """
+
+    help = "Импортирует получателей из CSV пакетами, отбрасывая повторы и некорректные адреса"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу .csv")
+        parser.add_argument(
+            "--owner", help="Email владельца клиентов (по умолчанию — владелец --mailing)"
+        )
+        parser.add_argument("--mailing", type=int, help="Привязать клиентов к рассылке с этим id")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Строк в пакете вставки")
+        parser.add_argument(
+            "--update", action="store_true", help="Обновить ФИО/комментарий у существующих"
+        )
+        parser.add_argument(
+            "--progress-every", type=int, default=50000, help="Печатать прогресс каждые N строк"
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if not path.is_file():
+            raise CommandError(f"Файл не найден: {path}")
+        mailing = None
+        if options["mailing"]:
+            mailing = Mailing.objects.filter(pk=options["mailing"]).select_related("owner").first()
+            if mailing is None:
+                raise CommandError(f"Рассылка #{options['mailing']} не найдена")
+        if options["owner"]:
+            owner = get_user_model().objects.filter(email=options["owner"]).first()
+            if owner is None:
+                raise CommandError(f"Пользователь {options['owner']} не найден")
+        elif mailing is not None:
+            owner = mailing.owner
+        else:
+            raise CommandError("Укажите --owner или --mailing")
+
+        importer = ClientImporter(
+            owner, mailing, batch_size=options["batch_size"], update=options["update"]
+        )
+        with path.open(encoding="utf-8-sig", newline="") as fh:
+            result = importer.run(
+                read_clients(fh),
+                progress=lambda r: self.stdout.write(str(r)),
+                progress_every=options["progress_every"],
+            )
+        self.stdout.write(self.style.SUCCESS(f"✅ Готово. {result}"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from mailings import partitioning
+
+
+class Command(BaseCommand):
+    """Секционирование таблицы попыток по месяцам (PostgreSQL)."""
+
+    help = (
+        "Переводит Attempt на месячные секции и создаёт секции на будущие месяцы "
+        "(запускать, например, раз в месяц)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=3, help="На сколько месяцев вперёд создать секции"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Секционирование поддерживается только на PostgreSQL")
+        if not partitioning.is_partitioned():
+            self.stdout.write("Перестраиваем таблицу попыток в секционированную…")
+            partitioning.convert(options["months_ahead"])
+        else:
+            partitioning.ensure_partitions(options["months_ahead"])
+        names = [name for name, _ in partitioning.partitions()]
+        self.stdout.write(self.style.SUCCESS(f"Секций: {len(names)} ({names[0]} … {names[-1]})"))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mailings.queue import claim, requeue_stale, run_job, worker_name
+
+
+class Command(BaseCommand):
+    """Обработчик очереди рассылок: забирает задачи Job из БД и отправляет письма."""
+
+    help = "Запускает обработчик фоновых задач рассылок (можно несколько процессов параллельно)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Выполнить готовые задачи и выйти")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Пауза опроса очереди, сек")
+        parser.add_argument(
+            "--max-jobs", type=int, default=0, help="Выйти после N задач (0 — без ограничения)"
+        )
+
+    def handle(self, *args, **options):
+        name = worker_name()
+        done = 0
+        self.stdout.write(f"Обработчик {name} запущен")
+        try:
+            while not options["max_jobs"] or done < options["max_jobs"]:
+                requeued = requeue_stale()
+                if requeued:
+                    self.stdout.write(f"Возвращено в очередь зависших задач: {requeued}")
+                job = claim(name)
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+                    continue
+                job = run_job(job)
+                done += 1
+                self.stdout.write(
+                    f"Задача #{job.pk} (рассылка #{job.mailing_id}): {job.status}, "
+                    f"успешно {job.ok_count}, ошибок {job.fail_count}"
+                )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(f"Обработчик {name} остановлен, выполнено задач: {done}")
+        )
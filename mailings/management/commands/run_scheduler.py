@@ -0,0 +1,83 @@
+import logging
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django_apscheduler import util
+from django_apscheduler.jobstores import DjangoJobStore
+from django_apscheduler.models import DjangoJobExecution
+
+from mailings.scheduler import tick
+
+logger = logging.getLogger(__name__)
+
+
+@util.close_old_connections
+def dispatch_due_mailings() -> None:
+    """Задача планировщика: ставит наступившие рассылки в очередь, закрывает истёкшие."""
+    enqueued, finished = tick()
+    if enqueued or finished:
+        logger.info("Планировщик: поставлено в очередь %s, завершено %s", enqueued, finished)
+
+
+@util.close_old_connections
+def delete_old_job_executions(max_age: int = 7 * 24 * 60 * 60) -> None:
+    """Удаляет историю запусков задач старше недели."""
+    DjangoJobExecution.objects.delete_old_job_executions(max_age)
+
+
+class Command(BaseCommand):
+    """
+    Планировщик рассылок на APScheduler (хранилище задач — БД через django-apscheduler).
+    Письма отправляет run_mailing_worker, планировщик только ставит задачи в очередь.
+    """
+
+    help = "Запускает планировщик: рассылки отправляются по start_at/finish_at"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Период опроса, сек (MAILING_SCHEDULER_INTERVAL)",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Один проход без запуска планировщика"
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            enqueued, finished = tick()
+            self.stdout.write(
+                self.style.SUCCESS(f"Поставлено в очередь: {enqueued}, завершено: {finished}")
+            )
+            return
+
+        interval = options["interval"] or settings.MAILING_SCHEDULER_INTERVAL
+        scheduler = BlockingScheduler(timezone=timezone.get_default_timezone())
+        scheduler.add_jobstore(DjangoJobStore(), "default")
+        scheduler.add_job(
+            dispatch_due_mailings,
+            trigger=IntervalTrigger(seconds=interval),
+            id="dispatch_due_mailings",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            delete_old_job_executions,
+            trigger=CronTrigger(day_of_week="mon", hour="03", minute="00"),
+            id="delete_old_job_executions",
+            max_instances=1,
+            replace_existing=True,
+        )
+
+        self.stdout.write(f"Планировщик запущен, опрос каждые {interval} с")
+        try:
+            scheduler.start()
+        except KeyboardInterrupt:
+            scheduler.shutdown()
+            self.stdout.write(self.style.SUCCESS("Планировщик остановлен"))
@@ -1,27 +1,57 @@
-from django.contrib.auth.models import Group, Permission
-from django.contrib.contenttypes.models import ContentType
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from mailings.models import Client, Mailing, Message
+from mailings.dispatch import make_dispatcher
+from mailings.models import Mailing
+from mailings.scheduler import due_mailings
+from mailings.services import send_mailing_now
 
 
 class Command(BaseCommand):
-    """Создаёт группу 'Менеджеры' и назначает права просмотра всех сущностей."""
+    """Ручная отправка рассылок из консоли (синхронно, без очереди)."""
 
-    help = "Создаёт группу Менеджеры с нужными правами"
+    help = "Отправляет рассылки по id или все наступившие (--due)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("mailing_ids", nargs="*", type=int, help="id рассылок")
+        parser.add_argument(
+            "--due", action="store_true", help="Отправить все рассылки, у которых наступило время"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Потоков отправки (MAILING_WORKERS) или SMTP-сессий для --engine async",
+        )
+        parser.add_argument(
+            "--resend", action="store_true", help="Отправить и тем, кому уже доставлено"
+        )
+        parser.add_argument(
+            "--rate", type=float, default=None, help="Лимит писем/с (MAILING_RATE_LIMIT)"
+        )
+        parser.add_argument(
+            "--engine",
+            choices=["threads", "async"],
+            default=None,
+            help="Движок отправки (MAILING_ENGINE)",
+        )
 
     def handle(self, *args, **options):
-        group, _ = Group.objects.get_or_create(name="Менеджеры")
-        perms = []
-        for model, codename in [
-            (Client, "view_all_clients"),
-            (Message, "view_all_messages"),
-            (Mailing, "view_all_mailings"),
-            (Mailing, "stop_mailings"),
-        ]:
-            ct = ContentType.objects.get_for_model(model)
-            perm = Permission.objects.get(content_type=ct, codename=codename)
-            perms.append(perm)
+        ids = list(options["mailing_ids"])
+        if options["due"]:
+            ids += list(due_mailings().values_list("pk", flat=True))
+        if not ids:
+            raise CommandError("Укажите id рассылок или --due")
 
-        group.permissions.set(perms)
-        self.stdout.write(self.style.SUCCESS("Группа 'Менеджеры' обновлена"))
+        for mailing_id in ids:
+            if not Mailing.objects.filter(pk=mailing_id).exists():
+                self.stderr.write(f"Рассылка #{mailing_id} не найдена")
+                continue
+            dispatcher = make_dispatcher(
+                options["workers"] or None, options["rate"], options["engine"]
+            )
+            ok, fail = send_mailing_now(mailing_id, dispatcher, resend=options["resend"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Рассылка #{mailing_id}: отправлено {ok}, ошибок {fail}")
+            )
+            for stats in dispatcher.stats:
+                self.stdout.write(f"  {stats}")
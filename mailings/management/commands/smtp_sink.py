@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mailings.smtp_sink import SmtpSink
+
+
+class Command(BaseCommand):
+    """Локальный SMTP-сервер для замеров: принимает и считает письма, не доставляя их."""
+
+    help = "Запускает SMTP-поглотитель (aiosmtpd) с задержкой и внедрением отказов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=1025)
+        parser.add_argument(
+            "--latency", type=float, default=0.0, help="Задержка ответа на письмо, мс"
+        )
+        parser.add_argument("--jitter", type=float, default=0.0, help="Разброс задержки ±, мс")
+        parser.add_argument(
+            "--failure-rate", type=float, default=0.0, help="Доля адресов с отказом 550 (0..1)"
+        )
+        parser.add_argument(
+            "--temp-failure-rate", type=float, default=0.0, help="Доля писем с ответом 451 (0..1)"
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Seed генератора отказов")
+        parser.add_argument(
+            "--report-every", type=float, default=10.0, help="Печатать счётчики каждые N секунд"
+        )
+
+    def handle(self, *args, **options):
+        sink = SmtpSink(
+            options["host"],
+            options["port"],
+            latency=options["latency"] / 1000,
+            jitter=options["jitter"] / 1000,
+            failure_rate=options["failure_rate"],
+            temp_failure_rate=options["temp_failure_rate"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            f"SMTP-поглотитель на {sink.host}:{sink.port} (EMAIL_HOST/EMAIL_PORT, без TLS). "
+            "Ctrl+C — остановить"
+        )
+        with sink:
+            try:
+                while True:
+                    time.sleep(options["report_every"])
+                    self.stdout.write(str(sink.stats))
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(self.style.SUCCESS(f"Остановлен. {sink.stats}"))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mailings.models import Suppression
+from mailings.suppression import suppress_from_attempts
+
+
+class Command(BaseCommand):
+    """Ведение списка подавления: адреса, которым рассылки не отправляются."""
+
+    help = (
+        "Добавляет адреса в список подавления (или удаляет --remove); "
+        "--from-attempts — жёсткие отказы из журнала"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("emails", nargs="*", help="Адреса")
+        parser.add_argument(
+            "--reason",
+            choices=[Suppression.UNSUBSCRIBED, Suppression.MANUAL],
+            default=Suppression.MANUAL,
+            help="Причина подавления",
+        )
+        parser.add_argument("--remove", action="store_true", help="Убрать адреса из списка")
+        parser.add_argument(
+            "--from-attempts",
+            action="store_true",
+            help="Добавить адреса с жёстким отказом из журнала попыток",
+        )
+
+    def handle(self, *args, **options):
+        emails = {email.strip().lower() for email in options["emails"] if email.strip()}
+        if not emails and not options["from_attempts"]:
+            raise CommandError("Укажите адреса или --from-attempts")
+
+        if options["remove"]:
+            removed, _ = Suppression.objects.filter(email__in=emails).delete()
+            self.stdout.write(self.style.SUCCESS(f"Удалено из списка подавления: {removed}"))
+        elif emails:
+            Suppression.objects.bulk_create(
+                [Suppression(email=email, reason=options["reason"]) for email in emails],
+                ignore_conflicts=True,
+            )
+            self.stdout.write(self.style.SUCCESS(f"Добавлено в список подавления: {len(emails)}"))
+        if options["from_attempts"]:
+            found = suppress_from_attempts()
+            self.stdout.write(self.style.SUCCESS(f"Жёстких отказов в журнале попыток: {found}"))
+        self.stdout.write(f"Всего в списке подавления: {Suppression.objects.count()}")
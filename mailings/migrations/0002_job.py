@@ -0,0 +1,118 @@
+# Generated by Django 5.1.11 on 2026-10-18 13:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("В очереди", "В очереди"),
+                            ("Выполняется", "Выполняется"),
+                            ("Выполнена", "Выполнена"),
+                            ("Ошибка", "Ошибка"),
+                        ],
+                        default="В очереди",
+                        max_length=16,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Поставлена в очередь"
+                    ),
+                ),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Не раньше"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Начата"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Завершена"
+                    ),
+                ),
+                (
+                    "worker",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        max_length=128,
+                        verbose_name="Обработчик",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Запусков"),
+                ),
+                (
+                    "ok_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Успешно"),
+                ),
+                (
+                    "fail_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Не успешно"),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, default="", verbose_name="Ошибка"),
+                ),
+                (
+                    "mailing",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="jobs",
+                        to="mailings.mailing",
+                        verbose_name="Рассылка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Задача рассылки",
+                "verbose_name_plural": "Задачи рассылок",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "available_at"],
+                        name="job_status_available_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(
+                            ("status__in", ["В очереди", "Выполняется"])
+                        ),
+                        fields=("mailing",),
+                        name="job_one_active_per_mailing",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.11 on 2026-10-18 13:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailings", "0004_delivery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttemptDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="День")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("Успешно", "Успешно"), ("Не успешно", "Не успешно")],
+                        max_length=16,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="Количество"),
+                ),
+            ],
+            options={
+                "verbose_name": "Итог попыток за день",
+                "verbose_name_plural": "Итоги попыток по дням",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="attempt",
+            index=models.Index(
+                fields=["attempted_at"], name="attempt_attempted_at_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="attemptdailyrollup",
+            name="mailing",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="rollups",
+                to="mailings.mailing",
+                verbose_name="Рассылка",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attemptdailyrollup",
+            index=models.Index(fields=["day"], name="rollup_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="attemptdailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("mailing", "day", "status"),
+                name="rollup_mailing_day_status_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.11 on 2026-10-18 13:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailings", "0005_attempt_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Suppression",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "email",
+                    models.EmailField(
+                        max_length=254, unique=True, verbose_name="Email"
+                    ),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("Отписка", "Отписка"),
+                            ("Жёсткий отказ", "Жёсткий отказ"),
+                            ("Вручную", "Вручную"),
+                        ],
+                        default="Вручную",
+                        max_length=16,
+                        verbose_name="Причина",
+                    ),
+                ),
+                (
+                    "server_response",
+                    models.TextField(
+                        blank=True, default="", verbose_name="Ответ почтового сервера"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Добавлен"),
+                ),
+                (
+                    "mailing",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="suppressions",
+                        to="mailings.mailing",
+                        verbose_name="Рассылка с отказом",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Подавленный адрес",
+                "verbose_name_plural": "Список подавления",
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.11 on 2026-10-18 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailings", "0007_job_heartbeat_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attempt",
+            index=models.Index(
+                fields=["attempted_at", "id"], name="attempt_attempted_id_idx"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="attempt",
+            name="attempt_attempted_at_idx",
+        ),
+    ]
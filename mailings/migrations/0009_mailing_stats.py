@@ -0,0 +1,86 @@
+# Generated by Django 5.1.11 on 2026-10-18 14:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def fill_stats(apps, schema_editor):
+    """Счётчики существующих рассылок: построчные попытки плюс суточные итоги."""
+    Attempt = apps.get_model("mailings", "Attempt")
+    AttemptDailyRollup = apps.get_model("mailings", "AttemptDailyRollup")
+    MailingStats = apps.get_model("mailings", "MailingStats")
+    stats = {}
+    attempts = (
+        Attempt.objects.values("mailing_id")
+        .annotate(
+            ok=Count("pk", filter=Q(status="Успешно")),
+            fail=Count("pk", filter=~Q(status="Успешно")),
+            last=Max("attempted_at"),
+        )
+        .order_by()
+    )
+    for row in attempts:
+        stats[row["mailing_id"]] = MailingStats(
+            mailing_id=row["mailing_id"], ok_count=row["ok"], fail_count=row["fail"], last_attempt_at=row["last"]
+        )
+    rollups = (
+        AttemptDailyRollup.objects.values("mailing_id")
+        .annotate(
+            ok=Sum("count", filter=Q(status="Успешно"), default=0),
+            fail=Sum("count", filter=~Q(status="Успешно"), default=0),
+        )
+        .order_by()
+    )
+    for row in rollups:
+        item = stats.setdefault(row["mailing_id"], MailingStats(mailing_id=row["mailing_id"]))
+        item.ok_count += row["ok"]
+        item.fail_count += row["fail"]
+    MailingStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailings", "0008_attempt_attempted_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MailingStats",
+            fields=[
+                (
+                    "mailing",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="mailings.mailing",
+                        verbose_name="Рассылка",
+                    ),
+                ),
+                (
+                    "ok_count",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Успешно"),
+                ),
+                (
+                    "fail_count",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Не успешно"
+                    ),
+                ),
+                (
+                    "last_attempt_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Последняя попытка"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счётчики рассылки",
+                "verbose_name_plural": "Счётчики рассылок",
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.11 on 2026-10-18 14:36
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("mailings", "0009_mailing_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="client_email_lower_idx",
+            ),
+        ),
+    ]
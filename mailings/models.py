@@ -2,6 +2,8 @@
 
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class Client(models.Model):
@@ -13,7 +15,9 @@ class Client(models.Model):
     email = models.EmailField("Email", unique=True)
     full_name = models.CharField("ФИО", max_length=255)
     comment = models.TextField("Комментарий", blank=True, default="")
-    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="clients")
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="clients"
+    )
 
     class Meta:
         verbose_name = "Получатель"
@@ -21,6 +25,8 @@ class Client(models.Model):
         permissions = [
             ("view_all_clients", "Может просматривать всех клиентов (менеджер)"),
         ]
+        # импорт ищет существующих клиентов без учёта регистра адреса
+        indexes = [models.Index(Lower("email"), name="client_email_lower_idx")]
 
     def __str__(self) -> str:
         return f"{self.full_name} <{self.email}>"
@@ -31,7 +37,9 @@ class Message(models.Model):
 
     subject = models.CharField("Тема письма", max_length=255)
     body = models.TextField("Тело письма")
-    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="messages")
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="messages"
+    )
 
     class Meta:
         verbose_name = "Сообщение"
@@ -56,13 +64,19 @@ class Mailing(models.Model):
     start_at = models.DateTimeField("Дата/время первой отправки")
     finish_at = models.DateTimeField("Дата/время окончания отправки")
     status = models.CharField("Статус", max_length=16, choices=STATUS_CHOICES, default="Создана")
-    message = models.ForeignKey(Message, on_delete=models.PROTECT, related_name="mailings", verbose_name="Сообщение")
+    message = models.ForeignKey(
+        Message, on_delete=models.PROTECT, related_name="mailings", verbose_name="Сообщение"
+    )
     clients = models.ManyToManyField(Client, related_name="mailings", verbose_name="Получатели")
-    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="mailings")
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="mailings"
+    )
 
     class Meta:
         verbose_name = "Рассылка"
         verbose_name_plural = "Рассылки"
+        # планировщик ищет рассылки к отправке диапазоном по этому индексу
+        indexes = [models.Index(fields=["status", "start_at", "finish_at"], name="mailing_due_idx")]
         permissions = [
             ("view_all_mailings", "Может просматривать все рассылки (менеджер)"),
             ("stop_mailings", "Может останавливать чужие рассылки (менеджер)"),
@@ -80,7 +94,17 @@ class Attempt(models.Model):
         ("Не успешно", "Не успешно"),
     )
 
-    mailing = models.ForeignKey(Mailing, on_delete=models.CASCADE, related_name="attempts", verbose_name="Рассылка")
+    mailing = models.ForeignKey(
+        Mailing, on_delete=models.CASCADE, related_name="attempts", verbose_name="Рассылка"
+    )
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="attempts",
+        verbose_name="Получатель",
+    )
     attempted_at = models.DateTimeField("Дата/время попытки", auto_now_add=True)
     status = models.CharField("Статус", max_length=16, choices=STATUS_CHOICES)
     server_response = models.TextField("Ответ почтового сервера", blank=True, default="")
@@ -88,6 +112,179 @@ class Attempt(models.Model):
     class Meta:
         verbose_name = "Попытка рассылки"
         verbose_name_plural = "Попытки рассылки"
+        # (attempted_at, id) — диапазон для отчётов и сжатия и граница курсора списка попыток
+        indexes = [models.Index(fields=["attempted_at", "id"], name="attempt_attempted_id_idx")]
 
     def __str__(self) -> str:
         return f"{self.mailing_id} — {self.status} — {self.attempted_at:%Y-%m-%d %H:%M}"
+
+
+class MailingStats(models.Model):
+    """
+    Итоговые счётчики попыток рассылки. Пополняются при записи каждого пакета
+    попыток (AttemptBuffer), поэтому список рассылок не считает журнал Attempt;
+    сжатие журнала в суточные итоги счётчики не меняет.
+    """
+
+    mailing = models.OneToOneField(
+        Mailing,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Рассылка",
+    )
+    ok_count = models.PositiveBigIntegerField("Успешно", default=0)
+    fail_count = models.PositiveBigIntegerField("Не успешно", default=0)
+    last_attempt_at = models.DateTimeField("Последняя попытка", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Счётчики рассылки"
+        verbose_name_plural = "Счётчики рассылок"
+
+    def __str__(self) -> str:
+        return f"{self.mailing_id}: {self.ok_count} / {self.fail_count}"
+
+
+class AttemptDailyRollup(models.Model):
+    """
+    Число попыток рассылки за день по статусу. Сюда сворачиваются старые
+    строки Attempt (команда compact_attempts); отчёты читают эту таблицу.
+    """
+
+    mailing = models.ForeignKey(
+        Mailing, on_delete=models.CASCADE, related_name="rollups", verbose_name="Рассылка"
+    )
+    day = models.DateField("День")
+    status = models.CharField("Статус", max_length=16, choices=Attempt.STATUS_CHOICES)
+    count = models.PositiveIntegerField("Количество", default=0)
+
+    class Meta:
+        verbose_name = "Итог попыток за день"
+        verbose_name_plural = "Итоги попыток по дням"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["mailing", "day", "status"], name="rollup_mailing_day_status_uniq"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="rollup_day_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.mailing_id} {self.day:%Y-%m-%d} {self.status}: {self.count}"
+
+
+class Delivery(models.Model):
+    """
+    Состояние доставки рассылки конкретному получателю (одна строка на пару).
+    Получатели со статусом «Успешно» при повторном запуске пропускаются.
+    """
+
+    mailing = models.ForeignKey(
+        Mailing, on_delete=models.CASCADE, related_name="deliveries", verbose_name="Рассылка"
+    )
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="deliveries", verbose_name="Получатель"
+    )
+    status = models.CharField("Статус", max_length=16, choices=Attempt.STATUS_CHOICES)
+    server_response = models.TextField("Ответ почтового сервера", blank=True, default="")
+    updated_at = models.DateTimeField("Обновлено", auto_now=True)
+
+    class Meta:
+        verbose_name = "Доставка"
+        verbose_name_plural = "Доставки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["mailing", "client"], name="delivery_mailing_client_uniq"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.mailing_id} → {self.client_id}: {self.status}"
+
+
+class Job(models.Model):
+    """
+    Задача фоновой отправки рассылки (очередь в БД, без внешнего брокера).
+    Выполняется командой run_mailing_worker; у рассылки не больше одной активной задачи.
+    """
+
+    QUEUED = "В очереди"
+    RUNNING = "Выполняется"
+    DONE = "Выполнена"
+    FAILED = "Ошибка"
+    STATUS_CHOICES = (
+        (QUEUED, QUEUED),
+        (RUNNING, RUNNING),
+        (DONE, DONE),
+        (FAILED, FAILED),
+    )
+
+    mailing = models.ForeignKey(
+        Mailing, on_delete=models.CASCADE, related_name="jobs", verbose_name="Рассылка"
+    )
+    status = models.CharField("Статус", max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    created_at = models.DateTimeField("Поставлена в очередь", auto_now_add=True)
+    available_at = models.DateTimeField("Не раньше", default=timezone.now)
+    started_at = models.DateTimeField("Начата", null=True, blank=True)
+    # обновляется обработчиком при каждой записи пакета попыток — по нему ищутся задачи упавших
+    # обработчиков
+    heartbeat_at = models.DateTimeField("Признак жизни", null=True, blank=True)
+    finished_at = models.DateTimeField("Завершена", null=True, blank=True)
+    worker = models.CharField("Обработчик", max_length=128, blank=True, default="")
+    attempts = models.PositiveIntegerField("Запусков", default=0)
+    ok_count = models.PositiveIntegerField("Успешно", default=0)
+    fail_count = models.PositiveIntegerField("Не успешно", default=0)
+    # id получателя, до которого (включительно) все письма обработаны — с него продолжается
+    # прерванная задача
+    checkpoint = models.PositiveBigIntegerField("Контрольная точка", default=0)
+    error = models.TextField("Ошибка", blank=True, default="")
+
+    class Meta:
+        verbose_name = "Задача рассылки"
+        verbose_name_plural = "Задачи рассылок"
+        indexes = [models.Index(fields=["status", "available_at"], name="job_status_available_idx")]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["mailing"],
+                condition=models.Q(status__in=["В очереди", "Выполняется"]),
+                name="job_one_active_per_mailing",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Задача #{self.pk} ({self.mailing_id}) — {self.status}"
+
+
+class Suppression(models.Model):
+    """
+    Адрес, которому рассылки не отправляются: отписка, жёсткий отказ сервера или вручную.
+    Email хранится в нижнем регистре; проверка при отправке — mailings.suppression.
+    """
+
+    UNSUBSCRIBED = "Отписка"
+    HARD_BOUNCE = "Жёсткий отказ"
+    MANUAL = "Вручную"
+    REASON_CHOICES = (
+        (UNSUBSCRIBED, UNSUBSCRIBED),
+        (HARD_BOUNCE, HARD_BOUNCE),
+        (MANUAL, MANUAL),
+    )
+
+    email = models.EmailField("Email", unique=True)
+    reason = models.CharField("Причина", max_length=16, choices=REASON_CHOICES, default=MANUAL)
+    mailing = models.ForeignKey(
+        Mailing,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="suppressions",
+        verbose_name="Рассылка с отказом",
+    )
+    server_response = models.TextField("Ответ почтового сервера", blank=True, default="")
+    created_at = models.DateTimeField("Добавлен", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Подавленный адрес"
+        verbose_name_plural = "Список подавления"
+
+    def __str__(self) -> str:
+        return f"{self.email} — {self.reason}"
@@ -0,0 +1,159 @@
+"""
+Секционирование таблицы попыток Attempt по месяцам (только PostgreSQL).
+
+convert() перестраивает обычную таблицу в секционированную по attempted_at
+(PARTITION BY RANGE) в одной транзакции: переносит строки, индексы и внешние
+ключи, id продолжает ту же нумерацию. Первичный ключ секционированной таблицы
+обязан включать ключ секционирования — в БД это (id, attempted_at), для Django
+первичным ключом остаётся id. Секции называются <таблица>_pYYYYMM (месяцы в UTC),
+строки вне созданных месяцев попадают в <таблица>_default.
+
+Старые месяцы не удаляются построчно: compact_attempts сворачивает секцию
+в суточные итоги и удаляет её целиком (DROP TABLE).
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Attempt
+
+TABLE = Attempt._meta.db_table
+
+
+def _q(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned() -> bool:
+    """Секционирована ли таблица попыток (на других СУБД — всегда False)."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def partitions() -> list[tuple[str, date]]:
+    """Месячные секции таблицы попыток: (имя, первый день месяца), по возрастанию."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    pattern = re.compile(rf"^{re.escape(TABLE)}_p(\d{{4}})(\d{{2}})$")
+    found = [(name, m) for name in names if (m := pattern.match(name))]
+    return sorted((name, date(int(m[1]), int(m[2]), 1)) for name, m in found)
+
+
+def _month_bounds(month: date) -> tuple[datetime, datetime]:
+    """Границы секции месяца в UTC: [начало месяца, начало следующего)."""
+    end = _add_months(month, 1)
+    return (
+        datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc),
+        datetime(end.year, end.month, 1, tzinfo=dt_timezone.utc),
+    )
+
+
+def ensure_partitions(months_ahead: int = 3, since: date | None = None) -> list[str]:
+    """
+    Создаёт недостающие месячные секции от since (по умолчанию текущий месяц) на months_ahead
+    вперёд.
+    """
+    month = (since or timezone.localdate()).replace(day=1)
+    last = _add_months(timezone.localdate().replace(day=1), months_ahead)
+    created = []
+    with connection.cursor() as cursor:
+        while month <= last:
+            name = _partition_name(month)
+            start, end = _month_bounds(month)
+            # Границы — строковые литералы: выражения в FOR VALUES поддерживаются не во всех версиях
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {_q(name)} PARTITION OF {_q(TABLE)} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            created.append(name)
+            month = _add_months(month, 1)
+    return created
+
+
+def expired_partitions(cutoff: datetime) -> list[tuple[str, datetime, datetime]]:
+    """Секции, целиком лежащие раньше cutoff: (имя, начало, конец)."""
+    result = []
+    for name, month in partitions():
+        start, end = _month_bounds(month)
+        if end <= cutoff:
+            result.append((name, start, end))
+    return result
+
+
+def drop_partition(name: str) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {_q(name)}")
+
+
+def convert(months_ahead: int = 3) -> None:
+    """Перестраивает таблицу попыток в секционированную по месяцам (вызывать один раз)."""
+    tmp, seq = f"{TABLE}_partitioned", f"{TABLE}_id_seq"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {_q(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid) FROM pg_index "
+            "WHERE indrelid = to_regclass(%s) AND NOT indisprimary",
+            [TABLE],
+        )
+        index_defs = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT min(attempted_at), coalesce(max(id), 0) FROM {_q(TABLE)}")
+        oldest, max_id = cursor.fetchone()
+
+        # Новая таблица с теми же колонками; identity-колонки на секционированных таблицах
+        # есть не во всех версиях PostgreSQL, поэтому id берётся из обычной последовательности
+        cursor.execute(
+            f"CREATE TABLE {_q(tmp)} (LIKE {_q(TABLE)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (attempted_at)"
+        )
+        cursor.execute(f"CREATE TABLE {_q(TABLE + '_default')} PARTITION OF {_q(tmp)} DEFAULT")
+        cursor.execute(f"ALTER TABLE {_q(TABLE)} RENAME TO {_q(TABLE + '_legacy')}")
+        cursor.execute(f"ALTER TABLE {_q(tmp)} RENAME TO {_q(TABLE)}")
+        ensure_partitions(months_ahead, since=timezone.localdate(oldest) if oldest else None)
+        cursor.execute(f"INSERT INTO {_q(TABLE)} SELECT * FROM {_q(TABLE + '_legacy')}")
+        cursor.execute(f"DROP TABLE {_q(TABLE + '_legacy')}")
+
+        cursor.execute(f"CREATE SEQUENCE {_q(seq)} OWNED BY {_q(TABLE)}.id")
+        cursor.execute("SELECT setval(%s, %s, %s)", [seq, max(max_id, 1), max_id > 0])
+        cursor.execute(f"ALTER TABLE {_q(TABLE)} ALTER COLUMN id SET DEFAULT nextval(%s)", [seq])
+        cursor.execute(
+            f"ALTER TABLE {_q(TABLE)} ADD CONSTRAINT {_q(TABLE + '_pkey')} "
+            "PRIMARY KEY (id, attempted_at)"
+        )
+        # Имена индексов и ключей освободились вместе со старой таблицей — создаём их заново как
+        # были
+        for index_def in index_defs:
+            cursor.execute(index_def)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {_q(TABLE)} ADD CONSTRAINT {_q(name)} {definition}")
@@ -0,0 +1,141 @@
+"""
+Очередь задач отправки рассылок в БД (PostgreSQL или SQLite, без брокера).
+
+Обработчик забирает задачу SELECT ... FOR UPDATE SKIP LOCKED (где БД это
+поддерживает) и переводит её в «Выполняется» условным UPDATE — поэтому
+два обработчика никогда не возьмут одну задачу, в том числе на SQLite.
+
+Выполняющаяся задача после каждого пакета попыток обновляет heartbeat_at; задача без
+признака жизни дольше MAILING_JOB_TIMEOUT возвращается в очередь (requeue_stale).
+Все записи обработчика в задачу условны (worker = свой): если задачу уже перехватили,
+старый обработчик останавливается и не затирает её состояние.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job, Mailing
+from .services import JobLost, send_mailing_now
+
+logger = logging.getLogger(__name__)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def active_job(mailing_id: int) -> Job | None:
+    return Job.objects.filter(mailing_id=mailing_id, status__in=(Job.QUEUED, Job.RUNNING)).first()
+
+
+def enqueue(mailing: Mailing | int, available_at=None) -> tuple[Job, bool]:
+    """
+    Ставит рассылку в очередь. Если у неё уже есть активная задача — возвращает её.
+    Возвращает (задача, создана ли новая).
+    """
+    mailing_id = getattr(mailing, "pk", mailing)
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                mailing_id=mailing_id, available_at=available_at or timezone.now()
+            )
+        return job, True
+    except IntegrityError:  # job_one_active_per_mailing: задача уже в очереди или выполняется
+        job = active_job(mailing_id)
+        if job is None:  # активная задача успела завершиться — пробуем ещё раз
+            return enqueue(mailing_id, available_at)
+        return job, False
+
+
+def claim(worker: str | None = None) -> Job | None:
+    """Забирает следующую готовую задачу и помечает её выполняемой."""
+    now = timezone.now()
+    with transaction.atomic():
+        qs = Job.objects.filter(status=Job.QUEUED, available_at__lte=now).order_by(
+            "available_at", "pk"
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        job = qs.first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            worker=worker or worker_name(),
+            attempts=F("attempts") + 1,
+        )
+    if not claimed:  # задачу перехватил другой обработчик (БД без FOR UPDATE)
+        return None
+    job.refresh_from_db()
+    return job
+
+
+def run_job(job: Job) -> Job:
+    """
+    Выполняет задачу и сохраняет результат (прерванная задача продолжается с job.checkpoint).
+    Результат пишется, только если задача всё ещё за этим обработчиком.
+    """
+    try:
+        ok, fail = send_mailing_now(job.mailing_id, job=job)
+        job.ok_count, job.fail_count = job.ok_count + ok, job.fail_count + fail
+        job.status = Job.DONE
+    except JobLost:
+        logger.warning(
+            "Задача %s перехвачена другим обработчиком, %s останавливается", job.pk, job.worker
+        )
+        job.refresh_from_db()
+        return job
+    except Exception as e:
+        logger.exception("Задача %s завершилась ошибкой", job.pk)
+        job.status, job.error = Job.FAILED, f"{type(e).__name__}: {e}"
+    job.finished_at = timezone.now()
+    saved = Job.objects.filter(pk=job.pk, worker=job.worker).update(
+        status=job.status,
+        ok_count=job.ok_count,
+        fail_count=job.fail_count,
+        error=job.error,
+        finished_at=job.finished_at,
+    )
+    if not saved:
+        logger.warning(
+            "Задача %s перехвачена другим обработчиком, результат %s не записан", job.pk, job.worker
+        )
+        job.refresh_from_db()
+    return job
+
+
+def requeue_stale(timeout: int | None = None) -> int:
+    """
+    Возвращает в очередь выполняющиеся задачи без признака жизни (heartbeat_at) дольше
+    MAILING_JOB_TIMEOUT секунд — обработчик упал или был убит. Долгая, но живая задача
+    не трогается. Возвращает число задач.
+    """
+    timeout = timeout or getattr(settings, "MAILING_JOB_TIMEOUT", 900)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = Job.objects.filter(status=Job.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+    return stale.update(status=Job.QUEUED, worker="")
+
+
+def run_pending(worker: str | None = None, limit: int | None = None) -> int:
+    """Выполняет готовые задачи, пока они есть (не больше limit). Возвращает число выполненных."""
+    done = 0
+    while limit is None or done < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
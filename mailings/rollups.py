@@ -0,0 +1,129 @@
+"""
+Хранение журнала попыток: суточные итоги и сжатие старых строк.
+
+Attempt растёт на строку за каждого получателя при каждом запуске. Строки старше
+MAILING_ATTEMPT_RETENTION_DAYS сворачиваются в AttemptDailyRollup (рассылка, день,
+статус, количество) и удаляются пакетами; отчёты читают итоги плюс ещё не
+свёрнутый «хвост» свежих попыток. На PostgreSQL с секционированием
+(mailings.partitioning) целые месяцы сворачиваются одним запросом и удаляются
+через DROP секции.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import partitioning
+from .models import Attempt, AttemptDailyRollup
+
+
+class ReportRow(NamedTuple):
+    """Строка отчёта: попытки рассылки за день."""
+
+    day: date
+    mailing_id: int
+    ok: int
+    fail: int
+
+
+def retention_cutoff(days: int | None = None, now=None) -> datetime:
+    """Начало дня, с которого попытки хранятся построчно (старшие сворачиваются)."""
+    days = getattr(settings, "MAILING_ATTEMPT_RETENTION_DAYS", 90) if days is None else days
+    today = timezone.localdate(now)
+    return timezone.make_aware(datetime.combine(today - timedelta(days=days), time.min))
+
+
+def _add_to_rollups(attempts) -> int:
+    """Прибавляет попытки из выборки к суточным итогам. Возвращает число свёрнутых строк."""
+    groups = (
+        attempts.annotate(day=TruncDate("attempted_at"))
+        .values("mailing_id", "day", "status")
+        .annotate(n=Count("pk"))
+        .order_by()
+    )
+    total = 0
+    for g in groups:
+        key = {"mailing_id": g["mailing_id"], "day": g["day"], "status": g["status"]}
+        if not AttemptDailyRollup.objects.filter(**key).update(count=F("count") + g["n"]):
+            AttemptDailyRollup.objects.create(count=g["n"], **key)
+        total += g["n"]
+    return total
+
+
+def _compact_partitions(cutoff: datetime) -> int:
+    """Сворачивает и удаляет целые месячные секции, которые закончились до cutoff."""
+    compacted = 0
+    for name, start, end in partitioning.expired_partitions(cutoff):
+        with transaction.atomic():
+            compacted += _add_to_rollups(
+                Attempt.objects.filter(attempted_at__gte=start, attempted_at__lt=end)
+            )
+            partitioning.drop_partition(name)
+    return compacted
+
+
+def compact_attempts(days: int | None = None, batch_size: int = 5000, now=None) -> int:
+    """
+    Сворачивает попытки старше days дней в AttemptDailyRollup и удаляет их.
+    Каждый пакет (итоги + DELETE) — отдельная транзакция, поэтому прерванное
+    сжатие можно просто запустить ещё раз: ничего не посчитается дважды.
+    Возвращает число удалённых строк Attempt.
+    """
+    cutoff = retention_cutoff(days, now)
+    compacted = 0
+    if partitioning.is_partitioned():
+        compacted += _compact_partitions(cutoff)
+
+    old = Attempt.objects.filter(attempted_at__lt=cutoff)
+    while True:
+        with transaction.atomic():
+            ids = list(old.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            # Пакет — старые строки до последнего id: без длинного IN (...) в запросах
+            batch = old.filter(pk__lte=ids[-1])
+            compacted += _add_to_rollups(batch)
+            batch.delete()
+    return compacted
+
+
+def daily_report(mailing_ids, since: date | None = None) -> list[ReportRow]:
+    """
+    Попытки по дням для рассылок mailing_ids (queryset или список id), новые дни первыми.
+    Складывает суточные итоги и ещё не свёрнутые строки Attempt — последние
+    ограничены сроком хранения, поэтому GROUP BY по ним не растёт со временем.
+    """
+    is_ok = Q(status="Успешно")
+    rollups = AttemptDailyRollup.objects.filter(mailing_id__in=mailing_ids)
+    raw = Attempt.objects.filter(mailing_id__in=mailing_ids).annotate(day=TruncDate("attempted_at"))
+    if since:
+        start = timezone.make_aware(datetime.combine(since, time.min))
+        rollups, raw = rollups.filter(day__gte=since), raw.filter(attempted_at__gte=start)
+
+    totals: dict[tuple[date, int], list[int]] = {}
+    sources = (
+        rollups.values("day", "mailing_id").annotate(
+            ok=Sum("count", filter=is_ok, default=0), fail=Sum("count", filter=~is_ok, default=0)
+        ),
+        raw.values("day", "mailing_id").annotate(
+            ok=Count("pk", filter=is_ok), fail=Count("pk", filter=~is_ok)
+        ),
+    )
+    for rows in sources:
+        for row in rows.order_by():
+            counts = totals.setdefault((row["day"], row["mailing_id"]), [0, 0])
+            counts[0] += row["ok"]
+            counts[1] += row["fail"]
+    return [
+        ReportRow(day, mailing_id, ok, fail)
+        for (day, mailing_id), (ok, fail) in sorted(
+            totals.items(), key=lambda item: (item[0][0], -item[0][1]), reverse=True
+        )
+    ]
@@ -0,0 +1,62 @@
+"""
+Планировщик рассылок: находит рассылки, у которых наступило время отправки,
+и ставит их в очередь задач (mailings.queue).
+
+Рассылка «к отправке», если статус «Создана»/«Запущена», start_at <= now < finish_at
+и для текущего окна ещё не создавалось ни одной задачи (Job.created_at >= start_at).
+Всё состояние — в БД, поэтому перезапуск планировщика не приводит к повторной отправке.
+Поиск идёт по составному индексу mailing_due_idx (status, start_at, finish_at).
+"""
+
+from __future__ import annotations
+
+import logging
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Job, Mailing
+from .queue import enqueue
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("Создана", "Запущена")
+
+
+def due_mailings(now=None):
+    """Рассылки, которые пора отправить и которые ещё не отправлялись в текущем окне."""
+    now = now or timezone.now()
+    dispatched = Job.objects.filter(mailing=OuterRef("pk"), created_at__gte=OuterRef("start_at"))
+    return (
+        Mailing.objects.filter(status__in=ACTIVE_STATUSES, start_at__lte=now, finish_at__gt=now)
+        .filter(~Exists(dispatched))
+        .order_by("start_at", "pk")
+    )
+
+
+def finish_expired(now=None) -> int:
+    """Переводит в «Завершена» рассылки, у которых закончилось окно отправки."""
+    now = now or timezone.now()
+    return Mailing.objects.filter(status__in=ACTIVE_STATUSES, finish_at__lte=now).update(
+        status="Завершена"
+    )
+
+
+def dispatch_due(now=None) -> int:
+    """
+    Ставит в очередь все рассылки к отправке и отмечает их запущенными. Возвращает число задач.
+    """
+    enqueued = []
+    for mailing_id in list(due_mailings(now).values_list("pk", flat=True)):
+        job, created = enqueue(mailing_id)
+        if created:
+            enqueued.append(mailing_id)
+            logger.info("Рассылка %s поставлена в очередь (задача %s)", mailing_id, job.pk)
+    Mailing.objects.filter(pk__in=enqueued, status="Создана").update(status="Запущена")
+    return len(enqueued)
+
+
+def tick(now=None) -> tuple[int, int]:
+    """Один проход планировщика: (поставлено задач, завершено рассылок)."""
+    now = now or timezone.now()
+    return dispatch_due(now), finish_expired(now)
@@ -1,41 +1,294 @@
 """Сервисные функции рассылок."""
 
-from email.header import Header
+import logging
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Iterator, NamedTuple
 
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
-from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
-from .models import Attempt, Mailing
+from .dispatch import Dispatcher, MessageTemplate, make_dispatcher
+from .models import Attempt, Delivery, Job, Mailing
+from .stats import record_attempts
+from .suppression import SuppressionList, add_hard_bounces, is_hard_bounce
 
+logger = logging.getLogger(__name__)
 
-def send_mailing_now(mailing_id: int) -> tuple[int, int]:
+
+class JobLost(Exception):
+    """Задачу вернули в очередь и забрал другой обработчик — этот должен прекратить отправку."""
+
+
+class AttemptBuffer:
+    """
+    Копит попытки отправки и пишет их пакетами через bulk_create:
+    каждые MAILING_ATTEMPT_FLUSH_SIZE записей и при выходе из блока with.
+    Вместе с попытками обновляется журнал доставок Delivery (mailing, client) и счётчики
+    рассылки (MailingStats), адреса с жёстким отказом добавляются в список подавления (Suppression);
+    все четыре записи пакета — одна транзакция, счётчики не расходятся с журналами.
+    При падении процесса теряется не больше одного пакета; если отправка прервана
+    исключением, накопленное записывается, а ошибка записи не заменяет исходную.
+    attempted_at (auto_now_add) проставляется в момент записи пакета.
+    """
+
+    def __init__(
+        self,
+        mailing: Mailing,
+        flush_size: int | None = None,
+        on_flush: Callable[[], None] | None = None,
+    ) -> None:
+        self.mailing = mailing
+        self.flush_size = flush_size or getattr(settings, "MAILING_ATTEMPT_FLUSH_SIZE", 500)
+        self.on_flush = on_flush
+        self.pending: list[Attempt] = []
+        self.bounces: list[tuple[str, int, str, int]] = []
+        self.flushed = 0
+
+    def add(
+        self,
+        ok: bool,
+        server_response: str,
+        client_id: int | None = None,
+        email: str = "",
+        code: int = 0,
+    ) -> None:
+        """
+        code — код ответа SMTP-сервера при отказе (0 — ответа не было); по нему ищутся жёсткие
+        отказы.
+        """
+        self.pending.append(
+            Attempt(
+                mailing=self.mailing,
+                client_id=client_id,
+                status="Успешно" if ok else "Не успешно",
+                server_response=server_response,
+            )
+        )
+        if not ok and email and is_hard_bounce(code, server_response):
+            self.bounces.append((email, code, server_response, self.mailing.pk))
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        with transaction.atomic():
+            Attempt.objects.bulk_create(self.pending)
+            Delivery.objects.bulk_create(
+                [
+                    Delivery(
+                        mailing=self.mailing,
+                        client_id=a.client_id,
+                        status=a.status,
+                        server_response=a.server_response,
+                    )
+                    for a in self.pending
+                    if a.client_id
+                ],
+                update_conflicts=True,
+                unique_fields=["mailing", "client"],
+                update_fields=["status", "server_response", "updated_at"],
+            )
+            if self.bounces:
+                add_hard_bounces(self.bounces)
+            ok = sum(a.status == "Успешно" for a in self.pending)
+            record_attempts(
+                self.mailing.pk,
+                ok,
+                len(self.pending) - ok,
+                max(a.attempted_at for a in self.pending),
+            )
+        self.bounces = []
+        self.flushed += len(self.pending)
+        self.pending = []
+        if self.on_flush:
+            self.on_flush()
+
+    def __enter__(self) -> "AttemptBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+            return
+        # Отправка прервана: уже отправленные письма записываем, но наружу уходит исходная ошибка
+        try:
+            self.flush()
+        except Exception:
+            logger.exception(
+                "Рассылка %s: не удалось записать попытки после ошибки отправки", self.mailing.pk
+            )
+
+
+class Recipient(NamedTuple):
+    """Получатель в пути отправки: только нужные поля, без модели Client."""
+
+    pk: int
+    email: str
+    full_name: str
+
+
+def iter_recipients(
+    mailing: Mailing, after: int = 0, chunk_size: int | None = None
+) -> Iterator[Recipient]:
+    """
+    Получатели рассылки, которым ещё не доставлено, по возрастанию id.
+    Читаются keyset-порциями по таблице связи (client_id > последнего) — в памяти
+    одновременно не больше MAILING_RECIPIENT_CHUNK строк при любом размере рассылки.
+    Доставленные отсекаются NOT EXISTS по ключу (mailing, client) журнала доставок —
+    проверка строки порции, а не повторный разбор всего журнала на каждую порцию.
+    """
+    chunk_size = chunk_size or getattr(settings, "MAILING_RECIPIENT_CHUNK", 2000)
+    delivered = Delivery.objects.filter(
+        mailing_id=mailing.pk, client_id=OuterRef("client_id"), status="Успешно"
+    )
+    links = Mailing.clients.through.objects.filter(mailing_id=mailing.pk).filter(~Exists(delivered))
+    while True:
+        chunk = list(
+            links.filter(client_id__gt=after)
+            .order_by("client_id")
+            .values_list("client_id", "client__email", "client__full_name")[:chunk_size]
+        )
+        yield from (Recipient(*row) for row in chunk)
+        if len(chunk) < chunk_size:
+            return
+        after = chunk[-1][0]
+
+
+class Checkpoint:
+    """
+    Наибольший id получателя, до которого (включительно) все письма обработаны.
+    Параллельный движок возвращает результаты не по порядку, поэтому точка
+    сдвигается только по непрерывному префиксу отданных в отправку получателей.
+    """
+
+    def __init__(self, value: int = 0) -> None:
+        self.value = value
+        self._inflight: deque[int] = deque()
+        self._done: set[int] = set()
+
+    def track(self, recipients: Iterable) -> Iterator:
+        for recipient in recipients:
+            self._inflight.append(recipient.pk)
+            yield recipient
+
+    def done(self, pk: int) -> None:
+        self._done.add(pk)
+        while self._inflight and self._inflight[0] in self._done:
+            self.value = self._inflight.popleft()
+            self._done.discard(self.value)
+
+
+async def _aiter_chunks(recipients: Iterator, size: int) -> AsyncIterator:
+    """
+    Получатели для асинхронного движка: порции читаются из БД в потоке вызывающего (sync_to_async).
+    """
+    take = sync_to_async(lambda: list(islice(recipients, size)))
+    while chunk := await take():
+        for recipient in chunk:
+            yield recipient
+
+
+async def _send_async(
+    dispatcher, template: MessageTemplate, recipients: Iterator, record, batch_size: int
+) -> None:
+    """
+    Цикл асинхронной отправки: результаты копятся и записываются пакетами по batch_size
+    через sync_to_async — SMTP-сессии продолжают работать, пока пишется пакет.
+    """
+    pending = []
+    async for result in dispatcher.asend(template, _aiter_chunks(recipients, batch_size)):
+        pending.append(result)
+        if len(pending) >= batch_size:
+            await sync_to_async(record)(pending)
+            pending = []
+    if pending:
+        await sync_to_async(record)(pending)
+
+
+def send_mailing_now(
+    mailing_id: int,
+    dispatcher: Dispatcher | None = None,
+    job: Job | None = None,
+    resend: bool = False,
+) -> tuple[int, int]:
     """
     Отправляет письма по рассылке вручную.
+    Получатели, которым рассылка уже доставлена (Delivery «Успешно»), и адреса из списка
+    подавления (Suppression) пропускаются до отправки;
+    job — задача очереди: продолжить с её контрольной точки и сохранять новую (и признак жизни)
+    после каждого пакета; если задачу забрал другой обработчик — JobLost.
+    resend=True — забыть журнал доставок и отправить всем заново.
+    dispatcher — движок отправки
+    (по умолчанию make_dispatcher(): MAILING_ENGINE, MAILING_WORKERS потоков).
     Возвращает (успешно, неуспешно).
     """
-    mailing = Mailing.objects.select_related("message").prefetch_related("clients").get(pk=mailing_id)
+    mailing = Mailing.objects.select_related("message").get(pk=mailing_id)
+    if resend:
+        Delivery.objects.filter(mailing=mailing).delete()
+
+    checkpoint = Checkpoint(job.checkpoint if job else 0)
+    suppressions = SuppressionList.load()
+    recipients = suppressions.exclude(iter_recipients(mailing, after=checkpoint.value))
+
+    def save_checkpoint() -> None:
+        if job is None:
+            return
+        # контрольная точка и признак жизни пишутся, только пока задача числится за этим
+        # обработчиком
+        owned = Job.objects.filter(pk=job.pk, worker=job.worker)
+        if not owned.update(checkpoint=checkpoint.value, heartbeat_at=timezone.now()):
+            raise JobLost(f"Задача {job.pk} больше не принадлежит обработчику {job.worker}")
+        job.checkpoint = checkpoint.value
 
+    # MIME собирается один раз, SMTP-соединение — одно на пакет (MAILING_BATCH_SIZE)
+    template = MessageTemplate(mailing.message.subject, mailing.message.body)
+    dispatcher = dispatcher or make_dispatcher()
     ok, fail = 0, 0
-    for client in mailing.clients.all():
-        try:
-            sent = send_mail(
-                subject=str(Header(mailing.message.subject, "utf-8")),
-                message=mailing.message.body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[client.email],
-                fail_silently=False,
-            )
-            Attempt.objects.create(
-                mailing=mailing,
-                status="Успешно" if sent else "Не успешно",
-                server_response="OK" if sent else "send_mail() вернул 0",
-            )
-            ok += 1 if sent else 0
-            fail += 0 if sent else 1
-        except Exception as e:
-            Attempt.objects.create(mailing=mailing, status="Не успешно", server_response=str(e))
-            fail += 1
+    with AttemptBuffer(mailing, on_flush=save_checkpoint) as attempts:
+
+        def record(results: Iterable) -> None:
+            nonlocal ok, fail
+            for result in results:
+                attempts.add(
+                    result.ok,
+                    result.response,
+                    result.recipient.pk,
+                    result.recipient.email,
+                    result.code,
+                )
+                checkpoint.done(result.recipient.pk)
+                ok += result.ok
+                fail += not result.ok
+
+        tracked = checkpoint.track(recipients)
+        if getattr(dispatcher, "is_async", False):
+            async_to_sync(_send_async)(dispatcher, template, tracked, record, attempts.flush_size)
+        else:
+            results = dispatcher.send(template, tracked)
+            try:
+                record(results)
+            except BaseException:
+                # остановить потоки отправки и записать письма, ушедшие до прерывания;
+                # ошибка записи не заменяет исходную
+                results.close()
+                try:
+                    record(getattr(dispatcher, "unreported", ()))
+                except Exception:
+                    logger.exception("Рассылка %s: не удалось записать отправленные", mailing_id)
+                raise
+    for stats in dispatcher.stats:
+        logger.info("Рассылка %s, %s", mailing_id, stats)
+    if suppressions.skipped:
+        logger.info(
+            "Рассылка %s: пропущено адресов из списка подавления: %s",
+            mailing_id,
+            suppressions.skipped,
+        )
 
     # Обновим статус по времени
     now = timezone.now()
@@ -0,0 +1,111 @@
+"""
+Локальный SMTP-сервер-«поглотитель» для нагрузочных замеров отправки (aiosmtpd).
+
+Письма не доставляются, только считаются. Можно задать задержку ответа на DATA
+(имитация медленного сервера) и долю отказов: постоянных 550 на RCPT
+(несуществующий адрес) и временных 451 на DATA. Используется командами
+smtp_sink (отдельный процесс) и bench_mailing (в том же процессе).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import socket
+import threading
+from dataclasses import dataclass
+
+from aiosmtpd.controller import Controller
+
+
+@dataclass
+class SinkStats:
+    messages: int = 0
+    recipients: int = 0
+    bytes: int = 0
+    rejected: int = 0
+    temp_failed: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"принято писем: {self.messages} "
+            f"({self.recipients} адресов, {self.bytes / 1024:,.0f} КБ), "
+            f"отказов 550: {self.rejected}, временных 451: {self.temp_failed}"
+        )
+
+
+class SinkHandler:
+    """Обработчик aiosmtpd: задержка latency±jitter секунд и отказы с заданной вероятностью."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        temp_failure_rate: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        self.latency, self.jitter = latency, jitter
+        self.failure_rate, self.temp_failure_rate = failure_rate, temp_failure_rate
+        self.random = random.Random(seed)
+        self.stats = SinkStats()
+        self._lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            with self._lock:
+                self.stats.rejected += 1
+            return "550 5.1.1 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        delay = self.latency + (
+            self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.temp_failure_rate and self.random.random() < self.temp_failure_rate:
+            with self._lock:
+                self.stats.temp_failed += 1
+            return "451 4.3.0 Temporary failure, try again later"
+        with self._lock:
+            self.stats.messages += 1
+            self.stats.recipients += len(envelope.rcpt_tos)
+            self.stats.bytes += len(envelope.content or b"")
+        return "250 OK"
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class SmtpSink:
+    """
+    Запуск сервера в фоновом потоке: with SmtpSink(latency=0.01) as sink: ...
+    port=0 — свободный порт; sink.host/sink.port — куда слать, sink.stats — счётчики.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **handler_options) -> None:
+        self.host, self.port = host, port or free_port(host)
+        self.handler = SinkHandler(**handler_options)
+        self.controller = Controller(self.handler, hostname=self.host, port=self.port)
+
+    @property
+    def stats(self) -> SinkStats:
+        return self.handler.stats
+
+    def start(self) -> "SmtpSink":
+        self.controller.start()
+        return self
+
+    def stop(self) -> None:
+        self.controller.stop()
+
+    def __enter__(self) -> "SmtpSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
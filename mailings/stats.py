@@ -0,0 +1,60 @@
+"""
+Статистика рассылок одним запросом.
+
+Счётчики попыток (успешно, неуспешно, время последней) хранятся в MailingStats и
+пополняются при записи каждого пакета попыток (record_attempts из AttemptBuffer.flush),
+поэтому with_stats() читает их одним LEFT JOIN, а не считает журнал Attempt: стоимость
+списка не растёт с числом попыток. Число получателей — коррелированный подзапрос
+по индексу таблицы связи. Страница списка — один SELECT независимо от числа рассылок.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Mailing, MailingStats
+
+OK = "Успешно"
+
+
+def record_attempts(mailing_id: int, ok: int, fail: int, last_attempt_at: datetime) -> None:
+    """Прибавляет пакет попыток к счётчикам рассылки (строка создаётся при первом пакете)."""
+    counters = {"ok_count": F("ok_count") + ok, "fail_count": F("fail_count") + fail}
+    rows = MailingStats.objects.filter(mailing_id=mailing_id)
+    if rows.update(last_attempt_at=last_attempt_at, **counters):
+        return
+    try:
+        with transaction.atomic():
+            MailingStats.objects.create(
+                mailing_id=mailing_id, ok_count=ok, fail_count=fail, last_attempt_at=last_attempt_at
+            )
+    except IntegrityError:  # строку успели создать параллельно
+        rows.update(last_attempt_at=last_attempt_at, **counters)
+
+
+def with_stats(qs: QuerySet[Mailing] | None = None) -> QuerySet[Mailing]:
+    """
+    Рассылки с аннотациями recipients_count, ok_count, fail_count,
+    last_attempt_at (None, если попыток не было) и success_rate (%, None без попыток).
+    """
+    qs = Mailing.objects.all() if qs is None else qs
+    recipients = (
+        Mailing.clients.through.objects.filter(mailing_id=OuterRef("pk"))
+        .order_by()
+        .values("mailing_id")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return qs.annotate(
+        recipients_count=Coalesce(Subquery(recipients), 0, output_field=IntegerField()),
+        ok_count=Coalesce(F("stats__ok_count"), 0, output_field=IntegerField()),
+        fail_count=Coalesce(F("stats__fail_count"), 0, output_field=IntegerField()),
+        last_attempt_at=F("stats__last_attempt_at"),
+        success_rate=Cast(F("ok_count"), FloatField())
+        * 100
+        / NullIf(F("ok_count") + F("fail_count"), 0, output_field=FloatField()),
+    )
@@ -0,0 +1,178 @@
+"""
+Список подавления: адреса, которым рассылки не отправляются (отписка, жёсткий отказ).
+
+Список загружается из БД один раз на запуск рассылки и проверяется в памяти до любой
+сетевой работы. До MAILING_SUPPRESSION_BLOOM_THRESHOLD адресов — множество строк
+(точная проверка за O(1)); больше — фильтр Блума (~1,8 байта на адрес, ложных
+срабатываний ~0,1 %), попадания которого подтверждаются одним запросом email__in
+на порцию получателей.
+
+Жёсткие отказы — ответ сервера 5xx о постоянной ошибке адреса (расширенный статус
+5.1.x или 5.2.1, либо 550/551/553 без расширенного статуса) — попадают в список
+автоматически при записи попыток (AttemptBuffer). Класс отказа определяется по коду
+ответа из исключения SMTP, а не по поиску цифр в тексте: ошибки соединения и таймауты
+кода не имеют и не подавляются никогда, как и отказы по политике (5.7.x) и временные (4xx).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.conf import settings
+
+from .models import Attempt, Suppression
+
+# Ответ сервера в начале текста попытки: «550 5.1.1 ...» или str(smtplib.SMTPRecipientsRefused)
+REPLY = re.compile(r"([245]\d\d)[ -]")
+REFUSED_REPLY = re.compile(r"\{'[^']*': \(([245]\d\d), b?['\"]")
+ENHANCED_STATUS = re.compile(r"([245])\.(\d{1,3})\.(\d{1,3})\b")
+HARD_BOUNCE_CODES = {550, 551, 553}
+
+
+def is_hard_bounce(code: int, reply: str) -> bool:
+    """
+    Ответ сервера означает, что адрес не существует или закрыт навсегда.
+    code — код SMTP-ответа (0 — ответа не было: обрыв, таймаут, ошибка соединения);
+    reply — текст ответа, расширенный статус берётся только из его начала.
+    """
+    if not 500 <= code <= 599:
+        return False
+    text = reply[3:].lstrip(" -") if reply.startswith(str(code)) else reply
+    enhanced = ENHANCED_STATUS.match(text)
+    if enhanced:
+        cls, subject, detail = enhanced.groups()
+        return cls == "5" and (subject == "1" or (subject, detail) == ("2", "1"))
+    return code in HARD_BOUNCE_CODES
+
+
+def parse_reply(response: str) -> tuple[int, str]:
+    """
+    Код и текст ответа из записанного в журнал server_response; (0, ...) — это не ответ сервера.
+    """
+    match = REPLY.match(response) or REFUSED_REPLY.match(response)
+    if match is None:
+        return 0, response
+    return int(match[1]), response[match.end() :]
+
+
+def add_hard_bounces(bounces: Iterable[tuple[str, int, str, int | None]]) -> int:
+    """
+    Добавляет (email, код ответа, ответ сервера, id рассылки) с жёстким отказом;
+    уже подавленные не трогает.
+    """
+    rows = {
+        email.strip().lower(): Suppression(
+            email=email.strip().lower(),
+            reason=Suppression.HARD_BOUNCE,
+            mailing_id=mailing_id,
+            server_response=response,
+        )
+        for email, code, response, mailing_id in bounces
+        if email and is_hard_bounce(code, response)
+    }
+    Suppression.objects.bulk_create(rows.values(), ignore_conflicts=True)
+    return len(rows)
+
+
+def suppress_from_attempts(batch_size: int = 5000) -> int:
+    """
+    Разбор накопленного журнала попыток: адреса с жёстким отказом → список подавления.
+    Код ответа берётся только из начала server_response — ошибки соединения не классифицируются.
+    """
+    failed = (
+        Attempt.objects.filter(status="Не успешно", client__isnull=False)
+        .values_list("client__email", "server_response", "mailing_id")
+        .iterator(chunk_size=batch_size)
+    )
+    found = 0
+    while batch := list(islice(failed, batch_size)):
+        found += add_hard_bounces(
+            (email, *parse_reply(response), mailing_id) for email, response, mailing_id in batch
+        )
+    return found
+
+
+class BloomFilter:
+    """
+    Фильтр Блума на size элементов: ложноположительные ответы с вероятностью error,
+    ложноотрицательных нет.
+    """
+
+    def __init__(self, size: int, error: float = 0.001) -> None:
+        self.bits = max(8, math.ceil(-size * math.log(error) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / max(size, 1) * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, value: str) -> Iterator[int]:
+        # двойное хеширование: k позиций из двух 64-битных половин одного blake2b
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self.array[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class SuppressionList:
+    """
+    Снимок списка подавления на время запуска рассылки.
+    exclude(recipients) — получатели без подавленных; skipped — сколько пропущено.
+    """
+
+    def __init__(self, emails: set[str] | None = None, bloom: BloomFilter | None = None) -> None:
+        self.emails = emails
+        self.bloom = bloom
+        self.skipped = 0
+
+    @classmethod
+    def load(cls, bloom_threshold: int | None = None) -> "SuppressionList":
+        if bloom_threshold is None:
+            bloom_threshold = getattr(settings, "MAILING_SUPPRESSION_BLOOM_THRESHOLD", 500_000)
+        emails = Suppression.objects.values_list("email", flat=True)
+        size = emails.count()
+        if not size:
+            return cls(emails=set())
+        if size <= bloom_threshold:
+            return cls(emails=set(emails.iterator(chunk_size=10000)))
+        bloom = BloomFilter(size)
+        for email in emails.iterator(chunk_size=10000):
+            bloom.add(email)
+        return cls(bloom=bloom)
+
+    def __bool__(self) -> bool:
+        return self.bloom is not None or bool(self.emails)
+
+    def __contains__(self, email: str) -> bool:
+        return bool(self._suppressed([email.lower()]))
+
+    def _suppressed(self, emails: list[str]) -> set[str]:
+        if self.bloom is None:
+            return {email for email in emails if email in self.emails}
+        candidates = {email for email in emails if email in self.bloom}
+        if not candidates:
+            return candidates
+        return set(Suppression.objects.filter(email__in=candidates).values_list("email", flat=True))
+
+    def exclude(self, recipients: Iterable, chunk_size: int | None = None) -> Iterator:
+        """Получатели (с атрибутом email или строки) без подавленных; порядок сохраняется."""
+        if not self:
+            yield from recipients
+            return
+        chunk_size = chunk_size or getattr(settings, "MAILING_RECIPIENT_CHUNK", 2000)
+        recipients = iter(recipients)
+        while chunk := list(islice(recipients, chunk_size)):
+            emails = [getattr(recipient, "email", recipient).lower() for recipient in chunk]
+            suppressed = self._suppressed(emails)
+            for recipient, email in zip(chunk, emails):
+                if email in suppressed:
+                    self.skipped += 1
+                else:
+                    yield recipient
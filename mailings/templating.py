@@ -0,0 +1,57 @@
+"""
+Подстановка полей получателя в тему и текст рассылки: {{ full_name }}, {{ email }}.
+
+Шаблон разбирается один раз на запуск рассылки и компилируется в строку формата
+(литеральные фигурные скобки экранируются), поэтому рендер на получателя — один
+вызов str.format_map без разбора текста. Неизвестные плейсхолдеры остаются как есть.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Mapping
+
+PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+FIELDS = ("email", "full_name")
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def recipient_values(recipient) -> dict[str, str]:
+    """Значения полей получателя: Client, services.Recipient или просто строка-адрес."""
+    return {
+        "email": getattr(recipient, "email", recipient),
+        "full_name": getattr(recipient, "full_name", "") or "",
+    }
+
+
+class CompiledTemplate:
+    """
+    Скомпилированный шаблон; fields — используемые поля получателя (пусто — текст без подстановок).
+    """
+
+    __slots__ = ("source", "fields", "_render")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parts, fields, pos = [], [], 0
+        for match in PLACEHOLDER.finditer(source):
+            parts.append(_escape(source[pos : match.start()]))
+            if match[1] in FIELDS:
+                parts.append(f"{{{match[1]}}}")
+                fields.append(match[1])
+            else:
+                parts.append(_escape(match[0]))
+            pos = match.end()
+        parts.append(_escape(source[pos:]))
+        self.fields = tuple(dict.fromkeys(fields))
+        self._render = "".join(parts).format_map
+
+    def render(self, values: Mapping[str, str]) -> str:
+        return self._render(values) if self.fields else self.source
+
+
+def compile_template(source: str) -> CompiledTemplate:
+    return CompiledTemplate(source)
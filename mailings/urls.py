@@ -6,6 +6,7 @@ urlpatterns = [
     # Клиенты
     path("clients/", views.ClientListView.as_view(), name="client_list"),
     path("clients/create/", views.ClientCreateView.as_view(), name="client_create"),
+    path("clients/import/", views.ClientImportView.as_view(), name="client_import"),
     path("clients/<int:pk>/edit/", views.ClientUpdateView.as_view(), name="client_edit"),
     path("clients/<int:pk>/delete/", views.ClientDeleteView.as_view(), name="client_delete"),
     # Сообщения
@@ -22,4 +23,5 @@ urlpatterns = [
     path("<int:pk>/run/", views.RunMailingView.as_view(), name="mailing_run"),
     # Попытки
     path("attempts/", views.AttemptListView.as_view(), name="attempt_list"),
+    path("attempts/report/", views.AttemptReportView.as_view(), name="attempt_report"),
 ]
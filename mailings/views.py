@@ -1,16 +1,35 @@
 """Контроллеры CRUD для рассылок/клиентов/сообщений + попытки + ручной запуск."""
 
+import csv
+import io
+from datetime import timedelta
+
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView, View
-
-from .forms import ClientForm, MailingForm, MessageForm
+from django.views.generic import (
+    CreateView,
+    DeleteView,
+    DetailView,
+    FormView,
+    ListView,
+    TemplateView,
+    UpdateView,
+    View,
+)
+
+from catalog.pagination import paginate_keyset
+
+from .forms import ClientForm, ClientImportForm, MailingForm, MessageForm
+from .importers import ClientImporter, read_clients
 from .models import Attempt, Client, Mailing, Message
-from .services import send_mailing_now
+from .queue import enqueue
+from .rollups import daily_report
+from .stats import with_stats
 
 
 # ======== Фильтрация по владельцу ========
@@ -62,6 +81,44 @@ class ClientDeleteView(LoginRequiredMixin, OwnerQuerySetMixin, DeleteView):
     template_name = "mailings/confirm_delete.html"
 
 
+class ClientImportView(LoginRequiredMixin, FormView):
+    """Загрузка получателей из CSV: файл читается потоком, клиенты пишутся пакетами."""
+
+    form_class = ClientImportForm
+    template_name = "mailings/client_import.html"
+    success_url = reverse_lazy("mailings:client_list")
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["mailings"] = Mailing.objects.filter(owner=self.request.user)
+        return kwargs
+
+    def form_valid(self, form):
+        importer = ClientImporter(self.request.user, form.cleaned_data["mailing"])
+        with io.TextIOWrapper(
+            form.cleaned_data["file"].file, encoding="utf-8-sig", newline=""
+        ) as fh:
+            try:
+                result = importer.run(read_clients(fh))
+            except (UnicodeDecodeError, csv.Error) as e:
+                problem = (
+                    "файл должен быть в кодировке UTF-8"
+                    if isinstance(e, UnicodeDecodeError)
+                    else str(e)
+                )
+                form.add_error(
+                    "file", f"Импорт прерван после {importer.result.seen} строк: {problem}"
+                )
+                # пакеты до ошибки уже записаны — сообщаем, что именно
+                if importer.result.written:
+                    messages.warning(
+                        self.request, f"Записано до ошибки: {importer.result.summary()}"
+                    )
+                return self.form_invalid(form)
+        messages.success(self.request, f"Импорт завершён: {result}")
+        return super().form_valid(form)
+
+
 # ======== Сообщения ========
 @method_decorator(cache_page(30), name="dispatch")
 class MessageListView(LoginRequiredMixin, OwnerQuerySetMixin, ListView):
@@ -95,10 +152,23 @@ class MailingListView(LoginRequiredMixin, OwnerQuerySetMixin, ListView):
     view_all_perm = "mailings.view_all_mailings"
     paginate_by = 20
 
+    def get_queryset(self):
+        # статистика — подзапросами в том же SELECT, страница стоит O(1) запросов
+        return with_stats(super().get_queryset()).order_by("-pk")
+
 
 class MailingDetailView(LoginRequiredMixin, OwnerQuerySetMixin, DetailView):
     model = Mailing
 
+    def get_queryset(self):
+        return with_stats(super().get_queryset()).select_related("message")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["jobs"] = self.object.jobs.order_by("-created_at")[:5]
+        context["attempts"] = self.object.attempts.select_related("client").order_by("-pk")[:20]
+        return context
+
 
 class MailingCreateView(LoginRequiredMixin, OwnerQuerySetMixin, CreateView):
     model = Mailing
@@ -129,24 +199,60 @@ class AttemptListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     """
     Список попыток. Даем доступ только авторизованным.
     Менеджеру — все попытки, обычному — только свои через фильтр по Mailing.owner.
+    Курсорная пагинация (?cursor=) по (attempted_at, id): без COUNT(*) и OFFSET
+    по журналу, который растёт на строку за каждое письмо.
     """
 
     model = Attempt
     permission_required = "auth.view_user"
     # любой авторизованный пройдёт, менеджеру можно расширить
-    paginate_by = 50
+    per_page = 50
+
+    def get_context_data(self, **kwargs):
+        page = paginate_keyset(
+            self.object_list, self.request.GET.get("cursor"), self.per_page, "attempted_at"
+        )
+        return super().get_context_data(object_list=page.object_list, page_obj=page, **kwargs)
 
     def get_queryset(self):
-        qs = super().get_queryset().select_related("mailing")
+        qs = super().get_queryset().select_related("mailing", "client")
         user = self.request.user
         if user.has_perm("mailings.view_all_mailings"):
             return qs
         return qs.filter(mailing__owner=user)
 
 
+# Не больше ~10 лет: большее значение переполнило бы timedelta/date
+MAX_REPORT_DAYS = 3660
+
+
+class AttemptReportView(LoginRequiredMixin, TemplateView):
+    """
+    Отчёт по попыткам за последние ?days= дней (по умолчанию 30): успешно/неуспешно по дням.
+    Читает суточные итоги AttemptDailyRollup и ещё не свёрнутые попытки.
+    """
+
+    template_name = "mailings/attempt_report.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            days = min(max(int(self.request.GET.get("days", 30)), 1), MAX_REPORT_DAYS)
+        except ValueError:
+            days = 30
+        mailings = Mailing.objects.all()
+        if not self.request.user.has_perm("mailings.view_all_mailings"):
+            mailings = mailings.filter(owner=self.request.user)
+        context["days"] = days
+        context["rows"] = daily_report(
+            mailings.values("pk"), since=timezone.localdate() - timedelta(days=days - 1)
+        )
+        return context
+
+
 # ======== Ручной запуск рассылки ========
 class RunMailingView(LoginRequiredMixin, OwnerQuerySetMixin, View):
-    """Ручной запуск рассылки."""
+    """Ручной запуск рассылки: ставит задачу в очередь, письма отправляет run_mailing_worker."""
 
     model = Mailing
     view_all_perm = "mailings.view_all_mailings"
@@ -161,6 +267,9 @@ class RunMailingView(LoginRequiredMixin, OwnerQuerySetMixin, View):
 
         mailing = get_object_or_404(qs, pk=pk)
 
-        ok, fail = send_mailing_now(mailing.pk)
-        messages.info(request, f"Отправлено: {ok}, ошибок: {fail}")
+        job, created = enqueue(mailing)
+        if created:
+            messages.info(request, f"Рассылка поставлена в очередь (задача #{job.pk})")
+        else:
+            messages.info(request, f"Рассылка уже в очереди (задача #{job.pk}, {job.status})")
         return redirect("mailings:mailing_detail", pk=pk)
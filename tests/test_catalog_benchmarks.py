@@ -0,0 +1,112 @@
+"""
+Бенчмарки страниц каталога: число SQL-запросов, p50/p95 времени ответа и размер HTML.
+
+Бюджеты — tests/budgets/<страница>.json. Число запросов проверяется всегда
+(новый запрос на карточку или N+1 роняет тест), время — только при
+CATALOG_BENCH_STRICT=1, т.к. зависит от машины; размер HTML — только на наборе,
+под который откалиброван бюджет (dataset_products).
+Размер набора и число прогонов: CATALOG_BENCH_PRODUCTS, CATALOG_BENCH_RUNS.
+Запуск только бенчмарков: pytest -m benchmark -s
+"""
+
+import io
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Product
+
+BUDGETS_DIR = Path(__file__).resolve().parent / "budgets"
+BENCH_PRODUCTS = int(os.environ.get("CATALOG_BENCH_PRODUCTS", 500))
+BENCH_RUNS = int(os.environ.get("CATALOG_BENCH_RUNS", 20))
+STRICT = os.environ.get("CATALOG_BENCH_STRICT") == "1"
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+@pytest.fixture
+def catalog(settings):
+    """Синтетический каталог; у товаров есть владелец, чтобы шаблоны обращались к p.owner."""
+    settings.IMAGE_VARIANTS_SYNC = True
+    call_command(
+        "seed_products",
+        "--products",
+        str(BENCH_PRODUCTS),
+        "--categories",
+        "10",
+        stdout=io.StringIO(),
+    )
+    owner = get_user_model().objects.create_user(email="owner@example.com", password="pass12345")
+    Product.objects.update(owner=owner)
+    cache.clear()
+    return owner
+
+
+def measure(client, url: str) -> dict:
+    """Холодный запрос (пустой кеш) — счётчик запросов; затем BENCH_RUNS прогонов — латентность."""
+    cache.clear()
+    reset_queries()  # журнал запросов ограничен по длине — после сидинга он заполнен
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    query_count = len(queries)  # считать сразу: следующий запрос клиента очистит журнал
+
+    timings = []
+    for _ in range(BENCH_RUNS):
+        started = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "queries": query_count,
+        "bytes": len(response.content),
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 2),
+    }
+
+
+def check_budget(name: str, result: dict, record_property) -> None:
+    """Сверяет замер с tests/budgets/<name>.json; замер пишется в отчёт pytest (record_property)."""
+    budget = json.loads((BUDGETS_DIR / f"{name}.json").read_text(encoding="utf-8"))
+    for key, value in result.items():
+        record_property(f"{name}_{key}", value)
+    print(f"\n[bench] {name}: {result} budget={budget}")
+
+    assert result["queries"] <= budget["max_queries"], f"{name}: {result['queries']} SQL-запросов"
+    if BENCH_PRODUCTS == budget["dataset_products"]:  # размер HTML зависит от объёма каталога
+        assert result["bytes"] <= budget["max_bytes"], f"{name}: {result['bytes']} байт HTML"
+    if STRICT:
+        assert result["p95_ms"] <= budget["p95_ms"], f"{name}: p95 {result['p95_ms']} мс"
+
+
+def test_bench_home(client, catalog, record_property):
+    client.force_login(catalog)
+    check_budget("home", measure(client, "/"), record_property)
+
+
+def test_bench_home_anonymous(client, catalog, record_property):
+    check_budget("home_anonymous", measure(client, "/"), record_property)
+
+
+def test_bench_product_detail(client, catalog, record_property):
+    client.force_login(catalog)
+    product = Product.objects.order_by("-created_at").first()
+    check_budget("product_detail", measure(client, product.get_absolute_url()), record_property)
+
+
+def test_bench_category_products(client, catalog, record_property):
+    slug = Category.objects.order_by("pk").values_list("slug", flat=True).first()
+    check_budget("category_products", measure(client, f"/category/{slug}/"), record_property)
+
+
+def test_bench_contacts(client, catalog, record_property):
+    check_budget("contacts", measure(client, "/contacts/"), record_property)
@@ -0,0 +1,82 @@
+import pytest
+from django.core.cache import cache
+
+from catalog.cache import category_products_key, category_tag, purge_surrogate_keys
+from catalog.models import Category, Product
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_category_listing_invalidated_on_product_edit(client):
+    """Правка товара сразу видна в кешированном списке категории."""
+    cat = Category.objects.create(name="Смартфоны", slug="smartfony")
+    product = Product.objects.create(title="iPhone 14", category=cat, price=100)
+
+    key = category_products_key("smartfony")
+    assert client.get("/category/smartfony/").context["products"] == [product]
+    assert cache.get(key) is not None
+
+    product.price = 90
+    product.save()
+    assert category_products_key("smartfony") != key
+    assert client.get("/category/smartfony/").context["products"][0].price == 90
+
+
+@pytest.mark.django_db
+def test_moving_product_invalidates_both_categories(client):
+    """Перенос товара между категориями сбрасывает обе категории."""
+    old = Category.objects.create(name="Старая", slug="old")
+    new = Category.objects.create(name="Новая", slug="new")
+    product = Product.objects.create(title="Товар", category=old)
+    client.get("/category/old/")
+    client.get("/category/new/")
+
+    product.category = new
+    product.save()
+    assert client.get("/category/old/").context["products"] == []
+    assert client.get("/category/new/").context["products"] == [product]
+
+
+@pytest.mark.django_db
+def test_product_detail_purged_by_surrogate_key(client):
+    """Страница товара кешируется с Surrogate-Key и сбрасывается при правке товара/категории."""
+    cat = Category.objects.create(name="Ноутбуки")
+    product = Product.objects.create(title="ZenBook", category=cat, price=1000)
+    url = f"/product/{product.pk}/"
+
+    response = client.get(url)
+    assert response["Surrogate-Key"] == f"product-{product.pk} category-{cat.pk}"
+
+    Product.objects.filter(pk=product.pk).update(price=1)  # без сигналов — кеш остаётся
+    assert b"1000" in client.get(url).content
+
+    product.refresh_from_db()
+    product.price = 900
+    product.save()
+    assert b"900" in client.get(url).content
+
+    Category.objects.filter(pk=cat.pk).update(name="Ультрабуки")
+    cat.refresh_from_db()
+    cat.save()
+    assert "Ультрабуки" in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_category_tag_purges_every_tagged_page(client):
+    """Сброс тега — смена поколения: устаревают все страницы с тегом, сколько бы их ни было."""
+    cat = Category.objects.create(name="Наушники")
+    products = Product.objects.bulk_create(
+        [Product(title=f"Модель {i}", slug=f"model-{i}", category=cat, price=100) for i in range(3)]
+    )
+    for product in products:
+        client.get(f"/product/{product.pk}/")
+
+    Product.objects.filter(category=cat).update(price=55)  # без сигналов — страницы из кеша
+    assert all(b"55" not in client.get(f"/product/{p.pk}/").content for p in products)
+
+    purge_surrogate_keys(category_tag(cat.pk))
+    assert all(b"55" in client.get(f"/product/{p.pk}/").content for p in products)
@@ -0,0 +1,114 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from catalog.facets import ensure_facets, get_facets, parse_filters, price_bucket, rebuild_facets
+from catalog.models import Category, Product, ProductFacet
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def _counts():
+    return {(f.dimension, f.value): f.count for f in ProductFacet.objects.filter(count__gt=0)}
+
+
+def test_price_bucket():
+    assert price_bucket(0) == "0-100"
+    assert price_bucket(100) == "100-500"
+    assert price_bucket(10**6) == "50000+"
+
+
+@pytest.mark.django_db
+def test_facets_maintained_incrementally():
+    """Счётчики после create/update/delete совпадают с полным пересчётом."""
+    phones = Category.objects.create(name="Смартфоны")
+    laptops = Category.objects.create(name="Ноутбуки")
+    a = Product.objects.create(title="A", category=phones, price=50, status="published")
+    b = Product.objects.create(title="B", category=phones, price=700)
+    Product.objects.create(title="C", category=laptops, price=1500, is_published=False)
+
+    b.category, b.price = laptops, 20000
+    b.save()
+    a.is_published = False
+    a.save()
+    incremental = _counts()
+
+    rebuild_facets()
+    assert (
+        incremental
+        == _counts()
+        == {
+            ("category", str(laptops.pk)): 1,
+            ("status", "draft"): 1,
+            ("price", "10000-50000"): 1,
+            (f"status:{laptops.pk}", "draft"): 1,
+            (f"price:{laptops.pk}", "10000-50000"): 1,
+        }
+    )
+
+
+@pytest.mark.django_db
+def test_filters_and_cached_facets(client):
+    """Фильтры сужают листинг, фасеты отдаются из кеша без запросов."""
+    cat = Category.objects.create(name="Наушники", slug="naushniki")
+    cheap = Product.objects.create(title="Дешёвые", category=cat, price=90)
+    Product.objects.create(title="Дорогие", category=cat, price=900)
+
+    response = client.get("/", {"price_max": "100"})
+    assert list(response.context["products"]) == [cheap]
+    response = client.get("/category/naushniki/", {"price_min": "100"})
+    assert [p.title for p in response.context["products"]] == ["Дорогие"]
+
+    get_facets()
+    with CaptureQueriesContext(connection) as ctx:
+        facets = get_facets()
+    assert len(ctx.captured_queries) == 0
+    assert facets["categories"] == [{"slug": "naushniki", "name": "Наушники", "count": 2}]
+
+
+@pytest.mark.parametrize("value", ["nan", "NaN", "Infinity", "-inf", "sNaN", "abc"])
+def test_non_finite_prices_are_ignored(value):
+    filters = parse_filters({"price_min": value, "price_max": value})
+    assert filters.price_min is None and filters.price_max is None and not filters.active
+
+
+@pytest.mark.django_db
+def test_nan_price_does_not_break_pages(client):
+    Category.objects.create(name="Наушники", slug="naushniki")
+    assert client.get("/", {"price_min": "nan"}).status_code == 200
+    assert client.get("/category/naushniki/", {"price_max": "nan"}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_category_page_facets_are_scoped(client):
+    phones = Category.objects.create(name="Смартфоны", slug="phones")
+    laptops = Category.objects.create(name="Ноутбуки", slug="laptops")
+    Product.objects.create(title="A", category=phones, price=50, status="published")
+    Product.objects.create(title="B", category=laptops, price=700)
+    Product.objects.create(title="C", category=laptops, price=800)
+
+    facets = client.get("/category/laptops/").context["facets"]
+    assert [(s["value"], s["count"]) for s in facets["statuses"]] == [("draft", 2)]
+    assert [(p["label"], p["count"]) for p in facets["prices"]] == [("500-1000", 2)]
+    assert {c["slug"]: c["count"] for c in facets["categories"]} == {"phones": 1, "laptops": 2}
+
+    total = client.get("/").context["facets"]
+    assert sum(s["count"] for s in total["statuses"]) == 3
+
+
+@pytest.mark.django_db
+def test_page_view_never_rebuilds_facets(client):
+    """Пустая таблица фасетов заполняется после migrate (ensure_facets), а не в GET."""
+    cat = Category.objects.create(name="Наушники")
+    Product.objects.create(title="A", category=cat, price=50)
+    ProductFacet.objects.all().delete()
+    cache.clear()
+
+    client.get("/")
+    assert not ProductFacet.objects.exists()
+    assert ensure_facets() and ProductFacet.objects.exists()
+    assert not ensure_facets()  # уже заполнена
@@ -0,0 +1,77 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from PIL import Image
+
+from catalog.models import Category, Product
+
+
+def _png(width: int, height: int, color=(255, 0, 0, 128), name="photo.png") -> SimpleUploadedFile:
+    buffer = BytesIO()
+    Image.new("RGBA", (width, height), color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@pytest.mark.django_db
+def test_variants_generated_after_commit(settings, tmp_path, django_capture_on_commit_callbacks):
+    """После сохранения строятся JPEG/WebP-копии, шаблон отдаёт srcset и lazy loading."""
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANTS_SYNC = True
+    cat = Category.objects.create(name="Фото")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product = Product.objects.create(title="Камера", category=cat, image=_png(2000, 1000))
+
+    product.refresh_from_db()
+    variants = product.image_variants
+    assert variants["source"] == product.image.name
+    with default_storage.open(variants["card"]) as fh:
+        assert Image.open(fh).size == (400, 200)
+    with default_storage.open(variants["detail_webp"]) as fh:
+        assert Image.open(fh).format == "WEBP"
+
+    html = Template('{% load product_images %}{% product_picture p "card" %}').render(
+        Context({"p": product})
+    )
+    assert 'type="image/webp"' in html and "400w" in html and 'loading="lazy"' in html
+
+    # повторное сохранение без смены изображения не запускает генерацию
+    with django_capture_on_commit_callbacks() as callbacks:
+        product.save()
+    assert callbacks == []
+
+
+@pytest.mark.django_db
+def test_variants_do_not_collide_and_old_ones_are_removed(
+    settings, tmp_path, django_capture_on_commit_callbacks
+):
+    """Одинаковые имена загрузок у разных товаров не затирают варианты друг друга."""
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_VARIANTS_SYNC = True
+    cat = Category.objects.create(name="Фото")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        red = Product.objects.create(
+            title="Красный", category=cat, image=_png(800, 400, (255, 0, 0, 255))
+        )
+        blue = Product.objects.create(
+            title="Синий", category=cat, image=_png(800, 400, (0, 0, 255, 255), "photo.jpg")
+        )
+    red.refresh_from_db()
+    blue.refresh_from_db()
+    assert red.image_variants["card"] != blue.image_variants["card"]
+    with default_storage.open(red.image_variants["card"]) as fh:
+        r, g, b = Image.open(fh).convert("RGB").getpixel((10, 10))
+    assert r > 200 and b < 100
+
+    old = [name for key, name in red.image_variants.items() if key != "source"]
+    with django_capture_on_commit_callbacks(execute=True):
+        red.image = _png(800, 400, (0, 255, 0, 255))
+        red.save()
+    red.refresh_from_db()
+    assert red.image_variants["source"] == red.image.name
+    assert not any(default_storage.exists(name) for name in old)
+    assert default_storage.exists(blue.image_variants["card"])
@@ -0,0 +1,163 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from django.db.models.signals import post_delete
+
+from catalog.cache import category_scope, get_generation
+from catalog.models import Category, Product, ProductFacet
+
+
+@pytest.mark.django_db
+def test_import_products_csv(tmp_path):
+    """CSV импортируется пакетами, slug уникальны, битые строки отклоняются."""
+    Category.objects.create(name="Смартфоны")
+    Product.objects.create(title="iPhone 14", category=Category.objects.get())
+    path = tmp_path / "products.csv"
+    path.write_text(
+        "title,category,price,description\n"
+        "iPhone 14,Смартфоны,799.99,Дубль существующего\n"
+        "iPhone 14,Смартфоны,799.99,Дубль внутри файла\n"
+        "Наушники,Аудио,249,\n"
+        ",Аудио,1,без названия\n"
+        "Плохая цена,Аудио,abc,\n",
+        encoding="utf-8",
+    )
+    call_command("import_products", str(path), "--batch-size", "2", verbosity=0)
+
+    assert Product.objects.count() == 4
+    assert Product.objects.filter(title="iPhone 14").values("slug").distinct().count() == 3
+    assert Category.objects.filter(name="Аудио").exists()
+    assert Product.objects.get(title="Наушники").created_at is not None
+
+
+@pytest.mark.django_db
+def test_import_products_jsonl(tmp_path):
+    """JSONL с явными slug и статусом."""
+    path = tmp_path / "products.jsonl"
+    rows = [
+        {
+            "title": "Ноутбук",
+            "category": "Ноутбуки",
+            "price": 1000,
+            "slug": "notebook",
+            "status": "published",
+        },
+        {
+            "title": "Ноутбук 2",
+            "category": "Ноутбуки",
+            "price": 1200,
+            "slug": "notebook",
+            "is_published": "нет",
+        },
+    ]
+    path.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in rows), encoding="utf-8")
+    call_command("import_products", str(path), verbosity=0)
+
+    first, second = Product.objects.order_by("price")
+    assert first.slug == "notebook" and first.status == "published"
+    assert second.slug.startswith("notebook-") and not second.is_published
+
+
+@pytest.mark.django_db
+def test_import_rejects_malformed_rows(tmp_path):
+    """
+    Переполнение цены, цена больше max_digits и строка JSONL не-объект отклоняются, импорт не
+    падает.
+    """
+    path = tmp_path / "products.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"title": "Огромная", "category": "Разное", "price": "1e30"}),
+                json.dumps({"title": "Дорогая", "category": "Разное", "price": "100000000"}),
+                json.dumps({"title": "Бесконечная", "category": "Разное", "price": "Infinity"}),
+                "[1, 2]",
+                "42",
+                json.dumps({"title": "Предельная", "category": "Разное", "price": "99999999.99"}),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    out = io.StringIO()
+    call_command("import_products", str(path), stdout=out)
+
+    assert list(Product.objects.values_list("title", flat=True)) == ["Предельная"]
+    assert "записано: 1, отклонено: 5" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_seed_products_scale_mode():
+    """
+    --products генерирует заданный объём с разбросом дат, повторный запуск с тем же seed
+    воспроизводим.
+    """
+    call_command(
+        "seed_products",
+        "--products",
+        "250",
+        "--categories",
+        "5",
+        "--batch-size",
+        "100",
+        stdout=io.StringIO(),
+    )
+
+    assert Product.objects.count() == 250
+    assert Category.objects.count() == 5
+    assert Product.objects.values("slug").distinct().count() == 250
+    assert Product.objects.dates("created_at", "day").count() > 1
+    titles = list(Product.objects.order_by("slug").values_list("title", flat=True))
+
+    call_command(
+        "seed_products",
+        "--products",
+        "250",
+        "--categories",
+        "5",
+        "--batch-size",
+        "100",
+        stdout=io.StringIO(),
+    )
+    assert list(Product.objects.order_by("slug").values_list("title", flat=True)) == titles
+
+
+@pytest.mark.django_db
+def test_seed_flush_skips_per_row_signals():
+    """
+    Очистка перед генерацией — DELETE на таблицу без сигналов, фасеты и кеши обновляются разом.
+    """
+    call_command(
+        "seed_products",
+        "--products",
+        "120",
+        "--categories",
+        "3",
+        "--batch-size",
+        "50",
+        stdout=io.StringIO(),
+    )
+    slug = Category.objects.values_list("slug", flat=True).first()
+    generation = get_generation(category_scope(slug))
+    deleted = []
+
+    def count_deletes(sender, **kwargs):
+        deleted.append(sender)
+
+    post_delete.connect(count_deletes, sender=Product)
+    post_delete.connect(count_deletes, sender=Category)
+    try:
+        call_command("seed_products", "--products", "40", "--categories", "2", stdout=io.StringIO())
+    finally:
+        post_delete.disconnect(count_deletes, sender=Product)
+        post_delete.disconnect(count_deletes, sender=Category)
+
+    assert deleted == []
+    assert Product.objects.count() == 40
+    assert (
+        ProductFacet.objects.filter(dimension="category").aggregate(total=Sum("count"))["total"]
+        == 40
+    )
+    assert get_generation(category_scope(slug)) != generation
@@ -0,0 +1,53 @@
+import pytest
+from django.core.management import call_command
+
+from catalog.forms import ProductForm
+from catalog.models import Category, ForbiddenWord, Product
+from catalog.moderation import Automaton, Match, get_matcher
+
+
+def test_automaton_reports_all_matches_with_positions():
+    """Находит все (в том числе перекрывающиеся) вхождения с позициями."""
+    automaton = Automaton(["крипта", "криптовалюта", "he", "she", "hers"])
+    assert automaton.find_all("Ushers") == [
+        Match("she", 1, 4),
+        Match("he", 2, 4),
+        Match("hers", 2, 6),
+    ]
+    assert [m.word for m in automaton.find_all("Крипта и КРИПТОВАЛЮТА")] == [
+        "крипта",
+        "криптовалюта",
+    ]
+    assert automaton.first("чистый текст") is None
+
+
+@pytest.mark.django_db
+def test_form_uses_db_word_list():
+    """Слово из ForbiddenWord сразу учитывается формой."""
+    cat = Category.objects.create(name="Разное")
+    data = {"title": "Лучший СПАМ", "category": cat.pk, "price": 1, "description": ""}
+    assert ProductForm(data).is_valid()
+
+    ForbiddenWord.objects.create(word="Спам")
+    form = ProductForm(data)
+    assert not form.is_valid()
+    assert "спам" in form.errors["title"][0]
+    assert "спам" in get_matcher().words
+
+
+@pytest.mark.django_db
+def test_moderate_products_command():
+    """Команда снимает с публикации товары с запрещёнными словами."""
+    cat = Category.objects.create(name="Разное")
+    bad = Product.objects.create(title="Казино онлайн", category=cat)
+    good = Product.objects.create(title="Чайник", category=cat)
+
+    call_command("moderate_products", "--dry-run", verbosity=0)
+    bad.refresh_from_db()
+    assert bad.is_published
+
+    call_command("moderate_products", verbosity=0)
+    bad.refresh_from_db()
+    good.refresh_from_db()
+    assert (bad.is_published, bad.status) == (False, "unpublished")
+    assert good.is_published
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Category, Product
+from catalog.pagination import decode_cursor, encode_cursor, paginate_keyset
+
+
+@pytest.fixture
+def products():
+    cat = Category.objects.create(name="Телефоны")
+    return [Product.objects.create(title=f"Товар {i}", category=cat, price=i) for i in range(7)]
+
+
+@pytest.mark.django_db
+def test_keyset_walks_forward_and_back(products):
+    """Курсоры next/prev проходят ленту без пропусков и повторов."""
+    qs = Product.objects.all()
+    expected = list(qs.order_by("-created_at", "-id"))
+
+    first = paginate_keyset(qs, None, 3)
+    second = paginate_keyset(qs, first.next_cursor, 3)
+    third = paginate_keyset(qs, second.next_cursor, 3)
+    assert list(first) + list(second) + list(third) == expected
+    assert not first.has_previous() and not third.has_next()
+
+    back = paginate_keyset(qs, third.prev_cursor, 3)
+    assert list(back) == list(second)
+    assert back.has_next() and back.has_previous()
+
+
+def test_broken_cursor_is_ignored():
+    """Битый токен трактуется как первая страница."""
+    assert decode_cursor("не-base64!") is None
+    assert decode_cursor(encode_cursor("x", datetime(2025, 1, 1), 1)) is None
+
+
+@pytest.mark.django_db
+def test_home_view_cursor_mode(client, products):
+    """Главная работает в курсорном режиме и не делает COUNT по странице."""
+    Product.objects.filter(pk=products[0].pk).update(is_published=False)
+    response = client.get("/")
+    assert response.status_code == 200
+    page = response.context["page_obj"]
+    assert len(page) == 6 and not page.has_next()
+    assert response.context["paginator"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_condition_bounds_index_range(products):
+    """Граница курсора — created_at <= x (диапазон индекса), а не только OR двух условий."""
+    qs = Product.objects.all()
+    first = paginate_keyset(qs, None, 3)
+    with CaptureQueriesContext(connection) as ctx:
+        paginate_keyset(qs, first.next_cursor, 3)
+    assert '"created_at" <= ' in ctx.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_home_estimate_counts_published_only(client, products):
+    cache.clear()
+    Product.objects.filter(pk__in=[p.pk for p in products[:2]]).update(is_published=False)
+    response = client.get("/")
+    assert response.context["total_products"] == 5
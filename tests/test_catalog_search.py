@@ -0,0 +1,61 @@
+import pytest
+
+from catalog.models import Category, Product
+from catalog.search import reset_index, search_products, stem_ru
+
+
+def test_stem_ru():
+    """Словоформы сводятся к одной основе."""
+    assert stem_ru("смартфоны") == stem_ru("смартфонами") == "смартфон"
+    assert stem_ru("беспроводные") == stem_ru("беспроводных")
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_above_description():
+    """Совпадение в названии важнее совпадения в описании, неопубликованные не находятся."""
+    reset_index()
+    cat = Category.objects.create(name="Аудио")
+    in_desc = Product.objects.create(
+        title="Колонка", description="Работает с беспроводными наушниками", category=cat
+    )
+    in_title = Product.objects.create(title="Беспроводные наушники", category=cat)
+    Product.objects.create(title="Наушники беспроводные", category=cat, is_published=False)
+
+    assert search_products("беспроводной наушник") == [in_title, in_desc]
+
+    in_desc.title = "Наушники беспроводные Pro"
+    in_desc.save()
+    assert search_products("pro наушники") == [in_desc]
+
+
+@pytest.mark.django_db
+def test_search_view(client):
+    """Страница /search/ отдаёт найденные товары."""
+    reset_index()
+    cat = Category.objects.create(name="Ноутбуки")
+    product = Product.objects.create(title="Ноутбук ASUS", category=cat)
+    response = client.get("/search/", {"q": "ноутбуки"})
+    assert response.status_code == 200
+    assert list(response.context["products"]) == [product]
+
+
+@pytest.mark.django_db
+def test_save_reindexes_only_search_fields(monkeypatch):
+    """Правка цены не трогает индекс, правка названия и снятие с публикации — трогают."""
+    reset_index()
+    cat = Category.objects.create(name="Аудио")
+    product = Product.objects.create(title="Наушники", price=100, category=cat)
+    product = Product.objects.get(pk=product.pk)
+    calls = []
+    monkeypatch.setattr("catalog.search.index_products", lambda qs: calls.append(qs))
+
+    product.price = 200
+    product.save()
+    assert calls == []
+
+    product.title = "Наушники Pro"
+    product.save()
+    product.save()
+    product.is_published = False
+    product.save()
+    assert len(calls) == 2
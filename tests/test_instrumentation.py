@@ -0,0 +1,51 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from catalog.models import Category, Product
+from config.instrumentation import capture_queries, normalize_sql, reset_report
+
+
+def test_normalize_sql_strips_values():
+    assert normalize_sql("SELECT * FROM t WHERE id = 5 AND name = 'x' AND pk IN (%s, %s, %s)") == (
+        "SELECT * FROM t WHERE id = %s AND name = %s AND pk IN (...)"
+    )
+
+
+@pytest.mark.django_db
+def test_capture_queries_flags_n_plus_one():
+    """Обращение к owner в цикле без select_related — подозрение на N+1, с ним — нет."""
+    category = Category.objects.create(name="Смартфоны", slug="phones")
+    for i in range(6):
+        owner = get_user_model().objects.create_user(
+            email=f"u{i}@example.com", password="pass12345"
+        )
+        Product.objects.create(title=f"Товар {i}", category=category, owner=owner)
+
+    with capture_queries() as stats:
+        owners = [p.owner.email for p in Product.objects.all()]
+    assert len(owners) == 6 and stats.count == 7
+    assert list(stats.n_plus_one(threshold=5).values()) == [6]
+
+    with capture_queries() as stats:
+        [p.owner.email for p in Product.objects.select_related("owner")]
+        Product.objects.count()
+        Product.objects.count()
+    assert stats.count == 3 and stats.duplicates == 1
+    assert stats.n_plus_one(threshold=5) == {}
+
+
+@pytest.mark.django_db
+def test_middleware_server_timing_and_report(client, settings):
+    settings.SQL_INSTRUMENTATION = True
+    reset_report()
+    response = client.get("/contacts/")
+    assert response["Server-Timing"].startswith("db;dur=")
+    assert '"1 queries"' in response["Server-Timing"]
+
+    staff = get_user_model().objects.create_user(
+        email="staff@example.com", password="pass12345", is_staff=True
+    )
+    client.force_login(staff)
+    report = client.get("/__sql__/").json()
+    assert report["views"]["catalog:contacts"]["requests"] == 1
+    assert report["views"]["catalog:contacts"]["max_queries"] == 1
@@ -0,0 +1,76 @@
+import asyncio
+import random
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from mailings.dispatch import MessageTemplate, TokenBucket, make_dispatcher
+from mailings.models import Attempt, Client, Delivery, Mailing, Message
+from mailings.services import send_mailing_now
+from mailings.smtp_sink import SmtpSink
+
+pytest.importorskip("aiosmtplib")
+
+from mailings.async_dispatch import AsyncDispatcher  # noqa: E402
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+@pytest.fixture
+def smtp_sink(settings):
+    with SmtpSink(latency=0.005) as sink:
+        settings.EMAIL_HOST, settings.EMAIL_PORT = sink.host, sink.port
+        settings.EMAIL_USE_TLS = settings.EMAIL_USE_SSL = False
+        settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+        yield sink
+
+
+def test_make_dispatcher_by_setting(settings):
+    settings.MAILING_ENGINE = "async"
+    settings.MAILING_ASYNC_SESSIONS = 7
+    dispatcher = make_dispatcher()
+    assert isinstance(dispatcher, AsyncDispatcher) and dispatcher.sessions == 7
+    assert not isinstance(make_dispatcher(engine="threads"), AsyncDispatcher)
+
+
+async def _collect(dispatcher, template, recipients):
+    return [result async for result in dispatcher.asend(template, _aiter(recipients))]
+
+
+def test_async_dispatch_sessions_and_batches(smtp_sink):
+    dispatcher = AsyncDispatcher(sessions=4, bucket=TokenBucket(0), batch_size=10)
+    emails = [f"u{i}@test.ru" for i in range(60)]
+    results = asyncio.run(
+        _collect(dispatcher, MessageTemplate("Тема {{ email }}", "Текст"), emails)
+    )
+
+    assert sorted(r.recipient for r in results) == sorted(emails)
+    assert all(r.ok for r in results)
+    assert smtp_sink.stats.messages == 60
+    assert dispatcher.connections_opened == 6  # одна сессия на пакет из 10 писем
+
+
+@pytest.mark.django_db
+def test_send_mailing_now_async_engine(smtp_sink, settings):
+    settings.MAILING_ENGINE = "async"
+    settings.MAILING_BATCH_SIZE = 5
+    smtp_sink.handler.failure_rate, smtp_sink.handler.random = 0.25, random.Random(1)
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет, {{ full_name }}!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user) for i in range(40)]
+    )
+    mailing.clients.add(*Client.objects.all())
+
+    ok, fail = send_mailing_now(mailing.pk)
+    assert ok + fail == 40 and ok == smtp_sink.stats.messages
+    assert fail == smtp_sink.stats.rejected
+    assert Attempt.objects.filter(mailing=mailing, status="Успешно").count() == ok
+    assert Delivery.objects.filter(mailing=mailing, status="Не успешно").count() == fail
+    assert "550" in Attempt.objects.filter(status="Не успешно").first().server_response
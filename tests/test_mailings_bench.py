@@ -0,0 +1,58 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from mailings.dispatch import Dispatcher, MessageTemplate
+from mailings.models import Client, Mailing, Suppression
+from mailings.smtp_sink import SmtpSink
+
+
+def test_sink_injects_failures(settings):
+    with SmtpSink(failure_rate=1.0) as sink:
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        settings.EMAIL_HOST, settings.EMAIL_PORT = sink.host, sink.port
+        settings.EMAIL_USE_TLS = settings.EMAIL_USE_SSL = False
+        settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+        results = list(
+            Dispatcher().send(MessageTemplate("Тема", "Текст"), ["a@test.ru", "b@test.ru"])
+        )
+    assert [r.ok for r in results] == [False, False]
+    assert "550" in results[0].response
+    assert (sink.stats.rejected, sink.stats.messages) == (2, 0)
+
+
+@pytest.mark.django_db
+def test_bench_mailing_reports_and_cleans_up():
+    out = io.StringIO()
+    call_command("bench_mailing", "--recipients", "40", "--workers", "2", stdout=out)
+    report = out.getvalue()
+    assert (
+        "sync: 40 писем (0 ошибок)" in report
+        and "threads: 40 писем" in report
+        and "async: 40 писем" in report
+    )
+    assert "принято писем: 120" in report
+    assert report.count("прирост RSS: ") == 3 and "пик RSS процесса за всё время" in report
+    assert not Client.objects.exists() and not Mailing.objects.exists()
+
+    # отказы 550 поглотителя не подавляют получателей следующих режимов и не остаются после замера
+    out = io.StringIO()
+    call_command(
+        "bench_mailing", "--recipients", "40", "--failure-rate", "0.5", "--workers", "2", stdout=out
+    )
+    report = out.getvalue()
+    assert all(f"{mode}: 40 писем" in report for mode in ("sync", "threads", "async"))
+    assert not Suppression.objects.exists()
+
+    # регрессия по числу запросов на письмо — ошибка команды
+    with pytest.raises(CommandError, match="SQL на письмо"):
+        call_command(
+            "bench_mailing",
+            "--recipients",
+            "10",
+            "--modes",
+            "sync",
+            "--max-queries-per-message",
+            "0.01",
+        )
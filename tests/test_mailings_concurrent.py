@@ -0,0 +1,142 @@
+import socket
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from mailings.dispatch import ConcurrentDispatcher, MessageTemplate, TokenBucket
+from mailings.models import Attempt, Client, Mailing, Message
+from mailings.services import send_mailing_now
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class SinkHandler:
+    """Локальный SMTP-сервер: запоминает получателей принятых писем."""
+
+    def __init__(self) -> None:
+        self.recipients: list[str] = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_sink(settings):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    handler = SinkHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = "127.0.0.1", port
+    settings.EMAIL_USE_TLS = settings.EMAIL_USE_SSL = False
+    settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+    yield handler
+    controller.stop()
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, burst=5)
+    started = time.monotonic()
+    for _ in range(25):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.18  # 20 токенов сверх всплеска при 100/с
+
+
+def test_concurrent_dispatch_to_local_smtp(smtp_sink):
+    dispatcher = ConcurrentDispatcher(workers=4, bucket=TokenBucket(0), batch_size=10)
+    emails = [f"u{i}@test.ru" for i in range(60)]
+    results = list(dispatcher.send(MessageTemplate("Тема", "Текст"), emails))
+
+    assert sorted(r.recipient for r in results) == sorted(emails)
+    assert all(r.ok for r in results)
+    assert sorted(smtp_sink.recipients) == sorted(emails)
+    assert len(dispatcher.stats) == 4
+    assert sum(s.sent for s in dispatcher.stats) == 60
+    assert dispatcher.connections_opened >= 6  # соединение переоткрывается каждые 10 писем
+
+
+@pytest.mark.django_db
+def test_send_mailing_now_concurrent(smtp_sink):
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user) for i in range(12)]
+    )
+    mailing.clients.add(*Client.objects.all())
+
+    dispatcher = ConcurrentDispatcher(workers=3, rate=200, burst=5)
+    assert send_mailing_now(mailing.pk, dispatcher) == (12, 0)
+    assert Attempt.objects.filter(mailing=mailing, status="Успешно").count() == 12
+    assert len(smtp_sink.recipients) == 12
+
+
+class FlakyBucket(TokenBucket):
+    """Ведро без лимита, падающее на n-м токене — непредвиденная ошибка в потоке отправки."""
+
+    def __init__(self, fail_on: int) -> None:
+        super().__init__(0)
+        self.calls, self.fail_on = 0, fail_on
+
+    def acquire(self) -> float:
+        with self._lock:
+            self.calls += 1
+            if self.calls == self.fail_on:
+                raise RuntimeError("bucket broken")
+        return 0.0
+
+
+def test_worker_error_becomes_failed_result(smtp_sink):
+    dispatcher = ConcurrentDispatcher(workers=2, bucket=FlakyBucket(fail_on=3))
+    emails = [f"u{i}@test.ru" for i in range(10)]
+    results = list(dispatcher.send(MessageTemplate("Тема", "Текст"), emails))
+
+    assert sorted(r.recipient for r in results) == sorted(emails)
+    failed = [r for r in results if not r.ok]
+    assert len(failed) == 1 and "bucket broken" in failed[0].response
+    assert len(smtp_sink.recipients) == 9
+
+
+class InterruptedDispatcher(ConcurrentDispatcher):
+    """Чтение получателей падает после after штук — отправка прерывается посреди рассылки."""
+
+    def __init__(self, after: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.after = after
+
+    def send(self, template, recipients):
+        def interrupted():
+            for i, recipient in enumerate(recipients):
+                if i == self.after:
+                    raise RuntimeError("worker killed")
+                yield recipient
+
+        return super().send(template, interrupted())
+
+
+@pytest.mark.django_db
+def test_interrupted_concurrent_send_records_every_sent_message(smtp_sink):
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user) for i in range(40)]
+    )
+    mailing.clients.add(*Client.objects.all())
+
+    dispatcher = InterruptedDispatcher(after=30, workers=4, bucket=TokenBucket(0))
+    with pytest.raises(RuntimeError, match="worker killed"):
+        send_mailing_now(mailing.pk, dispatcher)
+    # каждое ушедшее письмо записано, включая отправленные после последней выдачи результатов
+    assert Attempt.objects.filter(mailing=mailing).count() == len(smtp_sink.recipients)
+    assert not any(
+        thread.is_alive() for thread in threading.enumerate() if thread.name.startswith("worker-")
+    )
@@ -0,0 +1,91 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import DatabaseError
+from django.utils import timezone
+
+from mailings.dispatch import Dispatcher
+from mailings.models import Attempt, Client, Delivery, Job, Mailing, Message
+from mailings.queue import enqueue
+from mailings.services import AttemptBuffer, send_mailing_now
+
+
+class CrashingDispatcher(Dispatcher):
+    """Падает после after писем — имитация убитого процесса посреди рассылки."""
+
+    def __init__(self, after: int) -> None:
+        super().__init__()
+        self.after = after
+
+    def send(self, template, recipients):
+        def crashing():
+            for i, recipient in enumerate(recipients):
+                if i == self.after:
+                    raise RuntimeError("worker killed")
+                yield recipient
+
+        return super().send(template, crashing())
+
+
+@pytest.fixture
+def mailing(db, settings):
+    settings.MAILING_ATTEMPT_FLUSH_SIZE = 2
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user) for i in range(10)]
+    )
+    mailing.clients.add(*Client.objects.all())
+    return mailing
+
+
+def test_rerun_after_crash_sends_only_remaining(mailing):
+    job, _ = enqueue(mailing)
+    with pytest.raises(RuntimeError):
+        send_mailing_now(mailing.pk, CrashingDispatcher(after=5), job=job)
+
+    fifth = Client.objects.order_by("pk")[4]
+    assert Delivery.objects.filter(mailing=mailing, status="Успешно").count() == 5
+    assert Job.objects.get(pk=job.pk).checkpoint == fifth.pk
+
+    job.refresh_from_db()
+    assert send_mailing_now(mailing.pk, job=job) == (5, 0)
+    recipients = [m.to[0] for m in mail.outbox]
+    assert len(recipients) == len(set(recipients)) == 10
+    assert Attempt.objects.filter(mailing=mailing, client__isnull=False).count() == 10
+
+
+def test_rerun_is_idempotent_until_resend(mailing):
+    assert send_mailing_now(mailing.pk) == (10, 0)
+    assert send_mailing_now(mailing.pk) == (0, 0)
+    assert len(mail.outbox) == 10
+
+    assert send_mailing_now(mailing.pk, resend=True) == (10, 0)
+    assert Delivery.objects.filter(mailing=mailing).count() == 10
+
+
+def test_buffer_keeps_original_error_when_flush_fails(mailing, monkeypatch):
+    def broken_bulk_create(*args, **kwargs):
+        raise DatabaseError("connection lost")
+
+    monkeypatch.setattr(Attempt.objects, "bulk_create", broken_bulk_create)
+    with pytest.raises(RuntimeError, match="worker killed"):
+        with AttemptBuffer(mailing) as attempts:
+            attempts.add(True, "OK")
+            raise RuntimeError("worker killed")
+
+
+def test_buffer_flush_is_atomic(mailing, monkeypatch):
+    def broken_record_attempts(*args, **kwargs):
+        raise DatabaseError("connection lost")
+
+    monkeypatch.setattr("mailings.services.record_attempts", broken_record_attempts)
+    client = mailing.clients.first()
+    with pytest.raises(DatabaseError):
+        with AttemptBuffer(mailing) as attempts:
+            attempts.add(True, "OK", client.pk, client.email)
+    # счётчики не записались — журналы откатились вместе с ними
+    assert not Attempt.objects.filter(mailing=mailing).exists()
+    assert not Delivery.objects.filter(mailing=mailing).exists()
@@ -0,0 +1,110 @@
+import smtplib
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+
+from mailings.dispatch import Dispatcher, MessageTemplate
+from mailings.models import Attempt, Client, Mailing, Message
+from mailings.services import send_mailing_now
+
+
+class FlakyBackend(EmailBackend):
+    """locmem-бэкенд, у которого первое соединение обрывается на втором письме."""
+
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        self.generation = FlakyBackend.opened
+        self.sent_here = 0
+        return True
+
+    def send_messages(self, messages):
+        self.sent_here += 1
+        if self.generation == 1 and self.sent_here == 2:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+def test_template_reused_per_recipient():
+    """Один MIME-прототип, у каждого письма свои To и Message-ID."""
+    template = MessageTemplate("Скидки недели", "Привет!")
+    first = template.for_recipient("a@test.ru").message()
+    second = template.for_recipient("b@test.ru").message()
+
+    assert first["To"] == "a@test.ru" and second["To"] == "b@test.ru"
+    assert first["Message-ID"] != second["Message-ID"]
+    assert first["Subject"] == second["Subject"] == template.prototype["Subject"]
+    assert template.prototype["To"] == "placeholder@localhost"
+
+
+def test_dispatcher_one_connection_per_batch():
+    dispatcher = Dispatcher(batch_size=2)
+    results = list(
+        dispatcher.send(MessageTemplate("Тема", "Текст"), [f"u{i}@test.ru" for i in range(5)])
+    )
+
+    assert [r.ok for r in results] == [True] * 5
+    assert dispatcher.connections_opened == 3
+    assert [m.to for m in mail.outbox] == [[f"u{i}@test.ru"] for i in range(5)]
+
+
+def test_dispatcher_reconnects_after_disconnect():
+    FlakyBackend.opened = 0
+    dispatcher = Dispatcher(batch_size=10, backend="tests.test_mailings_dispatch.FlakyBackend")
+    results = list(
+        dispatcher.send(MessageTemplate("Тема", "Текст"), ["a@test.ru", "b@test.ru", "c@test.ru"])
+    )
+
+    assert all(r.ok for r in results)
+    assert dispatcher.connections_opened == 2
+    assert [m.to[0] for m in mail.outbox] == ["a@test.ru", "b@test.ru", "c@test.ru"]
+
+
+@pytest.mark.django_db
+def test_send_mailing_now_records_attempts():
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(
+        message=message,
+        owner=user,
+        start_at=now - timezone.timedelta(hours=1),
+        finish_at=now + timezone.timedelta(hours=1),
+    )
+    mailing.clients.add(
+        *[
+            Client.objects.create(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user)
+            for i in range(3)
+        ]
+    )
+
+    assert send_mailing_now(mailing.pk) == (3, 0)
+    assert Attempt.objects.filter(mailing=mailing, status="Успешно").count() == 3
+    assert len(mail.outbox) == 3
+    mailing.refresh_from_db()
+    assert mailing.status == "Запущена"
+
+
+@pytest.mark.django_db
+def test_attempts_flushed_in_batches(settings, django_assert_max_num_queries):
+    """Попытки пишутся пакетами bulk_create, а не INSERT на каждого получателя."""
+    settings.MAILING_ATTEMPT_FLUSH_SIZE = 4
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user) for i in range(10)]
+    )
+    mailing.clients.add(*Client.objects.all())
+
+    # рассылка + размер списка подавления + получатели, 3 пакета по 3 запроса (попытки, журнал
+    # доставок, счётчики рассылки) и SAVEPOINT/RELEASE транзакции пакета (вне теста — BEGIN/COMMIT
+    # без запросов), создание строки счётчиков при первом пакете (3 запроса), обновление статуса
+    with django_assert_max_num_queries(22):
+        assert send_mailing_now(mailing.pk) == (10, 0)
+    assert Attempt.objects.filter(mailing=mailing).count() == 10
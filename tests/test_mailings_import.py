@@ -0,0 +1,124 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mailings.importers import ClientImporter, read_clients
+from mailings.models import Client, Mailing, Message
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(email="owner@example.com", password="12345")
+
+
+def test_import_dedupes_normalizes_and_rejects(user):
+    other = get_user_model().objects.create_user(email="other@example.com", password="12345")
+    Client.objects.create(email="old@test.ru", full_name="Старый", owner=user)
+    Client.objects.create(email="foreign@test.ru", full_name="Чужой", owner=other)
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    csv_text = (
+        "email,full_name\n"
+        " A@Test.ru ,Анна\n"
+        "a@test.ru,Анна ещё раз\n"
+        "не-адрес,Кто-то\n"
+        "old@test.ru,Новое имя\n"
+        "foreign@test.ru,Чужой\n"
+        "b@test.ru,Борис\n"
+    )
+
+    result = ClientImporter(user, mailing, batch_size=2).run(read_clients(io.StringIO(csv_text)))
+
+    assert (result.seen, result.created, result.existing, result.duplicates, result.rejected) == (
+        6,
+        2,
+        2,
+        1,
+        1,
+    )
+    assert Client.objects.get(email="a@test.ru").full_name == "Анна"
+    assert Client.objects.get(email="old@test.ru").full_name == "Старый"
+    # к рассылке привязываются только свои клиенты
+    assert set(mailing.clients.values_list("email", flat=True)) == {
+        "a@test.ru",
+        "old@test.ru",
+        "b@test.ru",
+    }
+
+
+def test_import_matches_existing_clients_case_insensitively(user):
+    ivan = Client.objects.create(email="Ivan@Test.ru", full_name="Иван", owner=user)
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    rows = [{"email": "ivan@test.ru", "full_name": "Иван Петров"}, {"email": "new@test.ru"}]
+
+    result = ClientImporter(user, mailing, update=True).run(rows)
+
+    assert (result.created, result.updated, result.attached) == (1, 1, 2)
+    assert Client.objects.filter(email__iexact="ivan@test.ru").count() == 1
+    ivan.refresh_from_db()
+    assert ivan.full_name == "Иван Петров"
+
+    # повторный импорт ничего не вставляет и не привязывает заново
+    again = ClientImporter(user, mailing).run(rows)
+    assert (again.created, again.existing, again.attached) == (0, 2, 0)
+
+
+def test_import_queries_are_per_batch(user):
+    rows = [{"email": f"c{i}@test.ru", "full_name": f"Клиент {i}"} for i in range(1000)]
+    with CaptureQueriesContext(connection) as ctx:
+        result = ClientImporter(user, batch_size=500).run(rows)
+    assert result.created == Client.objects.count() == 1000
+    # на пакет: SELECT существующих + INSERT (SQLite дробит INSERT по лимиту параметров), а не
+    # запрос на строку
+    queries = [q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+    assert len(queries) <= 10
+
+
+def test_import_clients_command_updates_existing(tmp_path, user):
+    Client.objects.create(email="old@test.ru", full_name="Старый", owner=user)
+    path = tmp_path / "clients.csv"
+    path.write_text("old@test.ru,Новое имя,vip\nnew@test.ru,Новый,\n", encoding="utf-8")
+
+    out = io.StringIO()
+    call_command("import_clients", str(path), "--owner", user.email, "--update", stdout=out)
+
+    assert "новых: 1, обновлено: 1" in out.getvalue()
+    old = Client.objects.get(email="old@test.ru")
+    assert (old.full_name, old.comment) == ("Новое имя", "vip")
+
+
+def test_upload_view(client, user):
+    client.force_login(user)
+    upload = SimpleUploadedFile(
+        "clients.csv", "email,full_name\nx@test.ru,Икс\n".encode("utf-8-sig")
+    )
+    response = client.post(reverse("mailings:client_import"), {"file": upload})
+    assert response.status_code == 302
+    assert Client.objects.get(email="x@test.ru").owner == user
+
+
+def test_upload_view_reports_partial_import_on_csv_error(client, user):
+    client.force_login(user)
+    rows = "".join(f"u{i}@test.ru,Клиент {i}\n" for i in range(2500))
+    oversized = 'bad@test.ru,"' + "x" * 200_000 + '"\n'  # больше csv.field_size_limit()
+    upload = SimpleUploadedFile(
+        "clients.csv", f"email,full_name\n{rows}{oversized}".encode("utf-8")
+    )
+    response = client.post(reverse("mailings:client_import"), {"file": upload})
+
+    assert response.status_code == 200
+    assert "Импорт прерван после 2500 строк" in response.context["form"].errors["file"][0]
+    assert Client.objects.count() == 2000  # первый пакет записан, второй — нет
+    assert [str(m) for m in response.context["messages"]] == [
+        "Записано до ошибки: новых: 2000, обновлено: 0"
+    ]
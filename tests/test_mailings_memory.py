@@ -0,0 +1,130 @@
+"""
+Память пути отправки не должна зависеть от размера рассылки.
+send_mailing_now на малой и большой рассылке (размер большой — MAILING_BENCH_RECIPIENTS):
+прирост RSS процесса за отправку (пик по замерам /proc/self/statm каждые 2 мс; только Linux)
+и пиковая память Python (tracemalloc) — точная, но без памяти драйвера БД и C-расширений.
+Запуск: pytest -m benchmark -s
+"""
+
+import os
+import threading
+import tracemalloc
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from mailings.models import Client, Mailing, Message
+from mailings.services import iter_recipients, send_mailing_now
+
+LARGE = int(os.environ.get("MAILING_BENCH_RECIPIENTS", 10_000))
+SMALL = 1_000
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_mailing(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.dummy.EmailBackend"
+    settings.MAILING_RECIPIENT_CHUNK = 500
+    settings.MAILING_ATTEMPT_FLUSH_SIZE = 500
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+
+    def make(size: int) -> Mailing:
+        now = timezone.now()
+        mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+        start = Client.objects.count()
+        clients = Client.objects.bulk_create(
+            [
+                Client(
+                    email=f"c{i}@test.ru", full_name=f"Клиент {i}", comment="x" * 500, owner=user
+                )
+                for i in range(start, start + size)
+            ],
+            batch_size=1000,
+        )
+        Mailing.clients.through.objects.bulk_create(
+            [Mailing.clients.through(mailing_id=mailing.pk, client_id=c.pk) for c in clients],
+            batch_size=1000,
+        )
+        return mailing
+
+    return make
+
+
+def peak_kib(func) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def rss_kib() -> int | None:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return None
+
+
+def db_kib() -> int:
+    """
+    Размер тестовой БД SQLite: она в памяти процесса, и её рост (попытки, доставки) попадает в RSS.
+    """
+    if connection.vendor != "sqlite":
+        return 0
+    with connection.cursor() as cursor:
+        pages = cursor.execute("PRAGMA page_count").fetchone()[0]
+        return pages * cursor.execute("PRAGMA page_size").fetchone()[0] // 1024
+
+
+def rss_growth_kib(func) -> int:
+    """
+    Пиковый прирост RSS за время func() без роста самой БД в памяти:
+    фоновый поток опрашивает /proc/self/statm каждые 2 мс.
+    """
+    db_before = db_kib()
+    before = peak = rss_kib()
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not done.wait(0.002):
+            peak = max(peak, rss_kib())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        func()
+    finally:
+        done.set()
+        sampler.join()
+    return max(peak, rss_kib()) - before - (db_kib() - db_before)
+
+
+def test_recipient_stream_memory_is_flat(make_mailing):
+    small, large = make_mailing(SMALL), make_mailing(LARGE)
+    assert sum(1 for _ in iter_recipients(large)) == LARGE
+
+    if rss_kib() is not None:
+        send_mailing_now(small.pk)  # прогрев: импорты, кеши шаблонов, пулы аллокатора
+        small_rss = rss_growth_kib(lambda: send_mailing_now(small.pk, resend=True))
+        large_rss = rss_growth_kib(lambda: send_mailing_now(large.pk))
+        print(
+            f"\n[bench] send_mailing_now RSS growth: "
+            f"{SMALL} → {small_rss} KiB, {LARGE} → {large_rss} KiB"
+        )
+        # допуск на шум аллокатора; загрузка всех получателей сразу — десятки МБ на 100 тыс.
+        assert large_rss < small_rss + 8 * 1024
+
+    small_peak = peak_kib(lambda: send_mailing_now(small.pk, resend=True))
+    large_peak = peak_kib(lambda: send_mailing_now(large.pk, resend=True))
+    print(
+        f"\n[bench] send_mailing_now peak: "
+        f"{SMALL} → {small_peak:.0f} KiB, {LARGE} → {large_peak:.0f} KiB"
+    )
+    assert large_peak < small_peak * 1.5
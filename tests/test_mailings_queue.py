@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from mailings.models import Client, Job, Mailing, Message
+from mailings.queue import claim, enqueue, requeue_stale, run_job, run_pending
+
+
+@pytest.fixture
+def mailing(db):
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(
+        message=message,
+        owner=user,
+        start_at=now - timezone.timedelta(hours=1),
+        finish_at=now + timezone.timedelta(hours=1),
+    )
+    mailing.clients.add(Client.objects.create(email="a@test.ru", full_name="Артём", owner=user))
+    return mailing
+
+
+def test_enqueue_keeps_single_active_job(mailing):
+    job, created = enqueue(mailing)
+    again, created_again = enqueue(mailing)
+    assert created and not created_again and again.pk == job.pk
+
+    assert claim("w1").pk == job.pk
+    assert claim("w2") is None  # задача уже выполняется
+    assert enqueue(mailing)[0].pk == job.pk
+
+
+def test_run_pending_sends_and_finishes_job(mailing):
+    job, _ = enqueue(mailing)
+    assert run_pending("w1") == 1
+
+    job.refresh_from_db()
+    assert (job.status, job.ok_count, job.fail_count, job.attempts) == (Job.DONE, 1, 0, 1)
+    assert len(mail.outbox) == 1
+    assert enqueue(mailing)[1]  # после завершения можно запустить снова
+
+
+def test_run_view_enqueues_without_sending(client, mailing):
+    client.force_login(mailing.owner)
+    response = client.post(f"/mailings/{mailing.pk}/run/", follow=True)
+
+    assert mail.outbox == []
+    assert Job.objects.get(mailing=mailing).status == Job.QUEUED
+    assert "В очереди" in response.content.decode()
+
+    call_command("run_mailing_worker", "--once", stdout=io.StringIO())
+    assert Job.objects.get(mailing=mailing).status == Job.DONE
+    assert len(mail.outbox) == 1
+
+
+def test_requeue_stale_uses_heartbeat(mailing):
+    job, _ = enqueue(mailing)
+    claim("w1")
+    long_ago = timezone.now() - timezone.timedelta(hours=2)
+    Job.objects.filter(pk=job.pk).update(started_at=long_ago)  # долгая, но живая задача
+    assert requeue_stale(timeout=600) == 0
+
+    Job.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)  # обработчик молчит
+    assert requeue_stale(timeout=600) == 1
+    assert Job.objects.get(pk=job.pk).status == Job.QUEUED
+
+
+def test_reclaimed_job_is_not_overwritten(mailing):
+    enqueue(mailing)
+    job = claim("w1")
+    Job.objects.filter(pk=job.pk).update(worker="w2")  # задачу вернули в очередь и забрал w2
+
+    job = run_job(job)
+    assert (job.status, job.worker, job.ok_count) == (Job.RUNNING, "w2", 0)
+    assert Job.objects.get(pk=job.pk).checkpoint == 0
@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mailings import partitioning
+from mailings.models import Attempt, AttemptDailyRollup, Mailing, Message
+from mailings.rollups import compact_attempts, daily_report
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(email="owner@example.com", password="12345")
+
+
+@pytest.fixture
+def mailing(user):
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    return Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+
+
+def add_attempts(mailing, days_ago, ok, fail):
+    """
+    Попытки за указанный день в прошлом (attempted_at — auto_now_add, поэтому сдвигаем UPDATE).
+    """
+    attempts = Attempt.objects.bulk_create(
+        [Attempt(mailing=mailing, status="Успешно") for _ in range(ok)]
+        + [Attempt(mailing=mailing, status="Не успешно") for _ in range(fail)]
+    )
+    when = timezone.now() - timedelta(days=days_ago)
+    Attempt.objects.filter(pk__in=[a.pk for a in attempts]).update(attempted_at=when)
+    return timezone.localdate(when)
+
+
+def test_compact_rolls_up_old_attempts_in_batches(mailing):
+    old_day = add_attempts(mailing, 40, ok=5, fail=2)
+    add_attempts(mailing, 1, ok=3, fail=0)
+    before = daily_report([mailing.pk])
+
+    assert compact_attempts(days=30, batch_size=3) == 7
+    assert Attempt.objects.count() == 3
+    assert dict(AttemptDailyRollup.objects.filter(day=old_day).values_list("status", "count")) == {
+        "Успешно": 5,
+        "Не успешно": 2,
+    }
+    # отчёт не меняется от сжатия, повторный запуск ничего не делает
+    assert daily_report([mailing.pk]) == before
+    assert compact_attempts(days=30) == 0
+
+
+def test_compact_adds_to_existing_rollups(mailing):
+    add_attempts(mailing, 40, ok=2, fail=0)
+    compact_attempts(days=30)
+    add_attempts(mailing, 40, ok=1, fail=1)
+    call_command("compact_attempts", "--days", "30")
+
+    report = daily_report([mailing.pk])
+    assert [(r.ok, r.fail) for r in report] == [(3, 1)]
+    assert AttemptDailyRollup.objects.count() == 2
+
+
+def test_report_view_combines_rollups_and_recent(client, user, mailing):
+    add_attempts(mailing, 10, ok=4, fail=1)
+    add_attempts(mailing, 0, ok=2, fail=0)
+    compact_attempts(days=5)
+    client.force_login(user)
+
+    rows = client.get(reverse("mailings:attempt_report")).context["rows"]
+    assert [(r.ok, r.fail) for r in rows] == [(2, 0), (4, 1)]
+    assert client.get(reverse("mailings:attempt_report"), {"days": 3}).context["rows"] == rows[:1]
+
+
+def test_partition_attempts_requires_postgresql(db, settings):
+    if settings.DATABASES["default"]["ENGINE"].endswith("postgresql"):
+        pytest.skip("проверка для других СУБД")
+    with pytest.raises(CommandError):
+        call_command("partition_attempts")
+
+
+def test_report_view_clamps_days(client, user, mailing):
+    client.force_login(user)
+    response = client.get(reverse("mailings:attempt_report"), {"days": 10**12})
+    assert response.status_code == 200 and response.context["days"] == 3660
+
+
+def test_attempt_list_is_keyset_paginated(client, mailing):
+    add_attempts(mailing, 0, ok=120, fail=0)
+    manager = get_user_model().objects.create_superuser(email="admin@example.com", password="12345")
+    client.force_login(manager)
+    url = reverse("mailings:attempt_list")
+
+    with CaptureQueriesContext(connection) as queries:
+        page = client.get(url).context["page_obj"]
+    assert not any("COUNT(" in q["sql"] for q in queries)
+    seen = [a.pk for a in page]
+    while page.has_next():
+        page = client.get(url, {"cursor": page.next_cursor}).context["page_obj"]
+        seen += [a.pk for a in page]
+    assert seen == sorted(Attempt.objects.values_list("pk", flat=True), reverse=True)
+
+    back = client.get(url, {"cursor": page.prev_cursor}).context["page_obj"]
+    assert [a.pk for a in back] == seen[50:100]
+
+
+@pytest.mark.postgresql
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="секционирование есть только в PostgreSQL"
+)
+def test_partitioning_convert_ensure_and_drop(mailing):
+    add_attempts(mailing, 100, ok=2, fail=1)
+    add_attempts(mailing, 0, ok=3, fail=0)
+    last_id = Attempt.objects.order_by("-pk").values_list("pk", flat=True).first()
+
+    partitioning.convert(months_ahead=1)
+    assert partitioning.is_partitioned()
+    names = [name for name, _ in partitioning.partitions()]
+    old_month = partitioning.partitions()[0][1]
+    assert old_month == (timezone.localdate() - timedelta(days=100)).replace(day=1)
+    assert Attempt.objects.count() == 6
+    # нумерация продолжается
+    assert Attempt.objects.create(mailing=mailing, status="Успешно").pk > last_id
+
+    partitioning.ensure_partitions(months_ahead=1)  # повторный вызов ничего не ломает
+    assert [name for name, _ in partitioning.partitions()] == names
+
+    # срок хранения кончается через день после конца старого месяца — секция истекла целиком
+    days = (timezone.localdate() - partitioning._add_months(old_month, 1)).days - 1
+    assert compact_attempts(days=days) == 3
+    assert names[0] not in [name for name, _ in partitioning.partitions()]
+    assert AttemptDailyRollup.objects.aggregate(total=Sum("count"))["total"] == 3
+    assert Attempt.objects.count() == 4
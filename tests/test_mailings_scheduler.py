@@ -0,0 +1,54 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from mailings.models import Client, Job, Mailing, Message
+from mailings.queue import run_pending
+from mailings.scheduler import due_mailings, tick
+
+
+@pytest.fixture
+def make_mailing(db):
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    client = Client.objects.create(email="a@test.ru", full_name="Артём", owner=user)
+
+    def make(start: timedelta, finish: timedelta, status="Создана") -> Mailing:
+        now = timezone.now()
+        mailing = Mailing.objects.create(
+            message=message, owner=user, start_at=now + start, finish_at=now + finish, status=status
+        )
+        mailing.clients.add(client)
+        return mailing
+
+    return make
+
+
+def test_due_mailings_window(make_mailing):
+    due = make_mailing(timedelta(hours=-1), timedelta(hours=1))
+    make_mailing(timedelta(hours=1), timedelta(hours=2))  # ещё не началась
+    expired = make_mailing(timedelta(hours=-2), timedelta(hours=-1), status="Запущена")
+    make_mailing(timedelta(hours=-1), timedelta(hours=1), status="Завершена")
+
+    assert list(due_mailings()) == [due]
+    assert tick() == (1, 1)
+    expired.refresh_from_db()
+    assert expired.status == "Завершена"
+    assert Mailing.objects.get(pk=due.pk).status == "Запущена"
+
+
+def test_due_mailing_dispatched_once(make_mailing):
+    """Повторные проходы (и перезапуск планировщика) не отправляют рассылку второй раз."""
+    mailing = make_mailing(timedelta(minutes=-5), timedelta(hours=1))
+    assert tick() == (1, 0)
+    assert tick() == (0, 0)  # задача уже в очереди
+    run_pending("w1")
+    call_command("run_scheduler", "--once", stdout=io.StringIO())
+
+    assert Job.objects.filter(mailing=mailing).count() == 1
+    assert len(mail.outbox) == 1
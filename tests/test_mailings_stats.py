@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from mailings.models import Attempt, Client, Mailing, Message
+from mailings.rollups import compact_attempts
+from mailings.services import AttemptBuffer
+from mailings.stats import with_stats
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # список рассылок закеширован cache_page
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(email="owner@example.com", password="12345")
+
+
+def make_mailings(user, n):
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    clients = Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", owner=user) for i in range(3)]
+    )
+    now = timezone.now()
+    mailings = []
+    for _ in range(n):
+        mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+        mailing.clients.add(*clients)
+        with AttemptBuffer(mailing) as attempts:
+            attempts.add(True, "OK")
+            attempts.add(False, "550 Mailbox unavailable")
+        mailings.append(mailing)
+    return mailings
+
+
+def test_with_stats_reads_counters_kept_on_flush(user):
+    mailing, empty = make_mailings(user, 2)
+    with AttemptBuffer(mailing, flush_size=3) as attempts:
+        for _ in range(7):
+            attempts.add(True, "OK")
+    empty.stats.delete()
+
+    # сжатие журнала в суточные итоги счётчики не меняет
+    Attempt.objects.filter(mailing=mailing).update(
+        attempted_at=timezone.now() - timezone.timedelta(days=40)
+    )
+    assert compact_attempts(days=30) == 9
+
+    with CaptureQueriesContext(connection) as ctx:
+        stats = {m.pk: m for m in with_stats()}
+    assert len(ctx.captured_queries) == 1
+    assert "mailings_attempt" not in ctx.captured_queries[0]["sql"]
+    m = stats[mailing.pk]
+    assert (m.recipients_count, m.ok_count, m.fail_count) == (3, 8, 1)
+    assert m.success_rate == pytest.approx(800 / 9)
+    assert m.last_attempt_at is not None
+    e = stats[empty.pk]
+    assert (e.recipients_count, e.ok_count, e.fail_count, e.success_rate, e.last_attempt_at) == (
+        3,
+        0,
+        0,
+        None,
+        None,
+    )
+
+
+@pytest.mark.parametrize("n", [1, 10])
+def test_mailing_list_queries_do_not_depend_on_page_size(client, user, n):
+    make_mailings(user, n)
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse("mailings:mailing_list"))
+    assert response.status_code == 200
+    assert len(response.context["object_list"]) == n
+    # сессия, пользователь, 2 запроса прав (has_perm), COUNT пагинации и один SELECT страницы со
+    # статистикой
+    assert len(ctx.captured_queries) == 6
+
+
+def test_mailing_detail_shows_stats(client, user):
+    (mailing,) = make_mailings(user, 1)
+    client.force_login(user)
+    response = client.get(reverse("mailings:mailing_detail", args=[mailing.pk]))
+    assert response.context["object"].recipients_count == 3
+    assert "успешно 1, ошибок 1 (50,0% успеха)" in response.content.decode()
@@ -0,0 +1,151 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from mailings.dispatch import Dispatcher
+from mailings.models import Attempt, Client, Mailing, Message, Suppression
+from mailings.services import send_mailing_now
+from mailings.smtp_sink import SmtpSink, free_port
+from mailings.suppression import BloomFilter, SuppressionList, is_hard_bounce, parse_reply
+
+
+@pytest.fixture
+def mailing(db):
+    user = get_user_model().objects.create_user(email="owner@example.com", password="12345")
+    message = Message.objects.create(subject="Тест", body="Привет!", owner=user)
+    now = timezone.now()
+    mailing = Mailing.objects.create(message=message, owner=user, start_at=now, finish_at=now)
+    Client.objects.bulk_create(
+        [Client(email=f"c{i}@test.ru", full_name=f"Клиент {i}", owner=user) for i in range(10)]
+    )
+    mailing.clients.add(*Client.objects.all())
+    return mailing
+
+
+@pytest.mark.parametrize(
+    "code, response, hard",
+    [
+        (550, "550 5.1.1 Mailbox unavailable", True),
+        (550, "550 5.2.1 Mailbox disabled", True),
+        (553, "553 Requested action not taken: mailbox name not allowed", True),
+        (554, "554 5.7.1 Message rejected as spam", False),
+        (451, "451 4.3.0 Temporary failure, try again later", False),
+        (421, "421 4.4.2 Connection timed out", False),
+        (0, "Error connecting to 10.5.1.3 on port 25: Connection refused", False),
+        (0, "timed out after 550 ms", False),
+        (0, "Connection unexpectedly closed: 550 5.1.1", False),
+    ],
+)
+def test_is_hard_bounce(code, response, hard):
+    assert is_hard_bounce(code, response) is hard
+
+
+@pytest.mark.parametrize(
+    "response, code",
+    [
+        ("550 5.1.1 Mailbox unavailable", 550),
+        ("{'a@test.ru': (550, b'5.1.1 Mailbox unavailable')}", 550),
+        ("Error connecting to 10.5.1.3 on port 25: Connection refused", 0),
+        ("timed out after 550 ms", 0),
+    ],
+)
+def test_parse_reply_is_anchored(response, code):
+    assert parse_reply(response)[0] == code
+
+
+def test_bloom_filter_has_no_false_negatives():
+    emails = [f"user{i}@test.ru" for i in range(5000)]
+    bloom = BloomFilter(len(emails))
+    for email in emails:
+        bloom.add(email)
+    assert all(email in bloom for email in emails)
+    false_positives = sum(f"other{i}@test.ru" in bloom for i in range(5000))
+    assert false_positives < 25  # ~0,1 %
+
+
+@pytest.mark.django_db
+def test_bloom_mode_confirms_hits_in_db(django_assert_num_queries):
+    Suppression.objects.bulk_create([Suppression(email=f"s{i}@test.ru") for i in range(20)])
+    suppressions = SuppressionList.load(bloom_threshold=5)
+    assert suppressions.bloom is not None and suppressions.emails is None
+
+    recipients = [f"s{i}@test.ru" for i in range(0, 40, 2)]  # половина в списке
+    with django_assert_num_queries(1):  # одно подтверждение на порцию
+        kept = list(suppressions.exclude(recipients, chunk_size=100))
+    assert kept == [f"s{i}@test.ru" for i in range(20, 40, 2)]
+    assert suppressions.skipped == 10
+    assert "S3@test.ru" in suppressions and "x@test.ru" not in suppressions
+
+
+def test_send_skips_suppressed_before_sending(mailing, settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    Suppression.objects.create(email="c1@test.ru", reason=Suppression.UNSUBSCRIBED)
+    Suppression.objects.create(email="c2@test.ru")
+
+    assert send_mailing_now(mailing.pk) == (8, 0)
+    sent_to = {m.to[0] for m in mail.outbox}
+    assert "c1@test.ru" not in sent_to and "c2@test.ru" not in sent_to and len(sent_to) == 8
+    assert not Attempt.objects.filter(client__email__in=["c1@test.ru", "c2@test.ru"]).exists()
+
+
+def test_hard_bounces_feed_suppression_list(mailing, settings):
+    with SmtpSink(failure_rate=1.0) as sink:
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        settings.EMAIL_HOST, settings.EMAIL_PORT = sink.host, sink.port
+        settings.EMAIL_USE_TLS = settings.EMAIL_USE_SSL = False
+        settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+        assert send_mailing_now(mailing.pk, Dispatcher()) == (0, 10)
+        assert (
+            Suppression.objects.filter(reason=Suppression.HARD_BOUNCE, mailing=mailing).count()
+            == 10
+        )
+
+        # повторный запуск не тратит SMTP на мёртвые адреса
+        assert send_mailing_now(mailing.pk, Dispatcher()) == (0, 0)
+    assert sink.stats.rejected == 10
+
+
+def test_connection_errors_never_suppress(mailing, settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = "127.0.0.1", free_port()  # никто не слушает
+    settings.EMAIL_USE_TLS = settings.EMAIL_USE_SSL = False
+    settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+    assert send_mailing_now(mailing.pk, Dispatcher(retries=0)) == (0, 10)
+    assert not Suppression.objects.exists()
+
+
+def test_suppress_command(mailing):
+    responses = {
+        "c5@test.ru": "550 5.1.1 Mailbox unavailable",
+        "c6@test.ru": "421 4.4.2 Timeout",
+        "c7@test.ru": "Error connecting to 10.5.1.3 on port 25: [Errno 111] Connection refused",
+        "c8@test.ru": "timed out after 550 ms",
+    }
+    Attempt.objects.bulk_create(
+        [
+            Attempt(
+                mailing=mailing,
+                client=Client.objects.get(email=email),
+                status="Не успешно",
+                server_response=r,
+            )
+            for email, r in responses.items()
+        ]
+    )
+    out = io.StringIO()
+    call_command(
+        "suppress", "A@Test.ru", "b@test.ru", "--reason", "Отписка", "--from-attempts", stdout=out
+    )
+    assert set(Suppression.objects.values_list("email", flat=True)) == {
+        "a@test.ru",
+        "b@test.ru",
+        "c5@test.ru",
+    }
+    assert "Всего в списке подавления: 3" in out.getvalue()
+
+    call_command("suppress", "a@test.ru", "--remove", stdout=out)
+    assert not Suppression.objects.filter(email="a@test.ru").exists()
@@ -0,0 +1,81 @@
+"""
+Персонализация писем. Микро-бенчмарк рендера: TEMPLATING_BENCH_RECIPIENTS получателей
+(по умолчанию 20 000; для проверки на 100k+ — задать переменную). Запуск: pytest -m benchmark -s
+Пороги скорости проверяются только при TEMPLATING_BENCH_STRICT=1, т.к. зависят от машины.
+"""
+
+import os
+import time
+from email.header import decode_header, make_header
+
+import pytest
+
+from mailings.dispatch import MessageTemplate
+from mailings.services import Recipient
+from mailings.templating import compile_template, recipient_values
+
+BENCH_RECIPIENTS = int(os.environ.get("TEMPLATING_BENCH_RECIPIENTS", 20_000))
+STRICT = os.environ.get("TEMPLATING_BENCH_STRICT") == "1"
+
+
+def test_compiled_template_renders_known_fields_only():
+    template = compile_template("Здравствуйте, {{ full_name }}! {{email}} {{ unknown }} {x} }}")
+    assert template.fields == ("full_name", "email")
+    values = {"full_name": "Анна", "email": "a@test.ru"}
+    assert template.render(values) == "Здравствуйте, Анна! a@test.ru {{ unknown }} {x} }}"
+    assert compile_template("Без полей {}").render(values) == "Без полей {}"
+
+
+def test_personalized_message_and_shared_prototypes():
+    template = MessageTemplate("Для {{ full_name }}", "Привет, {{ full_name }}!\n" + "д" * 1200)
+    anna = template.for_recipient(Recipient(1, "a@test.ru", "Анна")).message()
+    namesake = template.for_recipient(Recipient(2, "b@test.ru", "Анна"))
+    boris = template.for_recipient(Recipient(3, "c@test.ru", "Борис")).message()
+
+    assert (
+        str(make_header(decode_header(anna["Subject"]))) == "Для Анна" and anna["To"] == "a@test.ru"
+    )
+    assert anna.get_payload(decode=True).decode().startswith("Привет, Анна!")
+    assert boris.get_payload(decode=True).decode().startswith("Привет, Борис!")
+    # длинная строка — тело перекодировано (base64), а не отправлено как 8bit
+    assert anna["Content-Transfer-Encoding"] == "base64"
+    # одинаковый рендер — один готовый MIME
+    assert namesake._prototype is template.prototype_for(Recipient(1, "a@test.ru", "Анна"))
+    assert template.prototype_for(Recipient(3, "c@test.ru", "Борис")) is not namesake._prototype
+    # prototype не затронут персонализацией
+    assert "{{ full_name }}" in template.prototype.get_payload(decode=True).decode()
+
+
+def test_static_template_uses_single_prototype():
+    template = MessageTemplate("Тема", "Текст")
+    assert template.fields == ()
+    assert template.for_recipient("a@test.ru")._prototype is template.prototype
+
+
+def per_second(fn, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - started)
+
+
+@pytest.mark.benchmark
+def test_renderer_throughput():
+    recipients = [Recipient(i, f"c{i}@test.ru", f"Клиент {i}") for i in range(BENCH_RECIPIENTS)]
+    body = "Здравствуйте, {{ full_name }}!\n\n" + "Текст письма. " * 40 + "\nВаш адрес: {{ email }}"
+    compiled = compile_template(body)
+    personalized = MessageTemplate("Скидки для {{ full_name }}", body)
+    static = MessageTemplate("Скидки", body.replace("{{", "").replace("}}", ""))
+
+    render_rate = per_second(lambda r: compiled.render(recipient_values(r)), recipients)
+    static_rate = per_second(lambda r: static.for_recipient(r).message(), recipients)
+    personalized_rate = per_second(lambda r: personalized.for_recipient(r).message(), recipients)
+    print(
+        f"\nрендер: {render_rate:,.0f}/с, письмо без подстановок: {static_rate:,.0f}/с, "
+        f"персонализированное письмо: {personalized_rate:,.0f}/с ({BENCH_RECIPIENTS} получателей)"
+    )
+    if STRICT:
+        # рендер на порядки быстрее SMTP; персонализированное письмо — своя копия MIME, не больше
+        # чем в 4 раза дороже
+        assert render_rate > 50_000
+        assert personalized_rate * 4 > static_rate
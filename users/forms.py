@@ -11,10 +11,14 @@ class UserLoginForm(AuthenticationForm):
     """Форма авторизации пользователя (вход по email и паролю)."""
 
     username = forms.EmailField(
-        label="Email", widget=forms.EmailInput(attrs={"class": "form-control", "placeholder": "Введите email"})
+        label="Email",
+        widget=forms.EmailInput(attrs={"class": "form-control", "placeholder": "Введите email"}),
     )
     password = forms.CharField(
-        label="Пароль", widget=forms.PasswordInput(attrs={"class": "form-control", "placeholder": "Введите пароль"})
+        label="Пароль",
+        widget=forms.PasswordInput(
+            attrs={"class": "form-control", "placeholder": "Введите пароль"}
+        ),
     )
 
 
@@ -22,11 +26,16 @@ class UserRegisterForm(forms.ModelForm):
     """Регистрация нового пользователя."""
 
     password = forms.CharField(
-        label="Пароль", widget=forms.PasswordInput(attrs={"class": "form-control", "placeholder": "Введите пароль"})
+        label="Пароль",
+        widget=forms.PasswordInput(
+            attrs={"class": "form-control", "placeholder": "Введите пароль"}
+        ),
     )
     password2 = forms.CharField(
         label="Повторите пароль",
-        widget=forms.PasswordInput(attrs={"class": "form-control", "placeholder": "Повторите пароль"}),
+        widget=forms.PasswordInput(
+            attrs={"class": "form-control", "placeholder": "Повторите пароль"}
+        ),
     )
 
     class Meta:
@@ -34,7 +43,9 @@ class UserRegisterForm(forms.ModelForm):
         fields = ("email", "avatar", "phone", "country")
         widgets = {
             "email": forms.EmailInput(attrs={"class": "form-control", "placeholder": "Ваш email"}),
-            "phone": forms.TextInput(attrs={"class": "form-control", "placeholder": "Номер телефона"}),
+            "phone": forms.TextInput(
+                attrs={"class": "form-control", "placeholder": "Номер телефона"}
+            ),
             "country": forms.TextInput(attrs={"class": "form-control", "placeholder": "Страна"}),
             "avatar": forms.FileInput(attrs={"class": "form-control"}),
         }